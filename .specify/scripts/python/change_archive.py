@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Archive of Recent Changes entries trimmed from agent files
+
+Agent files keep only the newest Recent Changes entries. Entries that fall
+off the list are appended to .specify/memory/recent-changes.jsonl, one JSON
+record per line:
+
+    {"feature": "001-user-auth", "entry": "- 001-user-auth: Added Python 3.11",
+     "source": "CLAUDE.md", "archived": "2025-01-19"}
+
+The archive is append-only. An index of byte offsets per feature is kept in
+.specify/.cache/recent-changes.index.json; it is extended incrementally from
+the last indexed size and rebuilt if the archive was rewritten, so looking
+up a feature reads only that feature's lines.
+
+Usage: python change_archive.py [feature] [--json]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from common import (
+    get_repo_root,
+    log_info,
+)
+
+
+INDEX_VERSION = 1
+
+# "- 001-user-auth: Added ..." -> "001-user-auth"
+_ENTRY_FEATURE_RE = re.compile(r'^- ([^\s:]+):')
+
+
+def entry_feature(entry: str) -> str:
+    """Feature name of a Recent Changes entry, or "" if it has none."""
+    match = _ENTRY_FEATURE_RE.match(entry)
+    return match.group(1) if match else ""
+
+
+class ChangeArchive:
+    """Append-only Recent Changes archive with a per-feature offset index."""
+
+    def __init__(self, repo_root: Path):
+        self.repo_root = repo_root
+        self.path = repo_root / ".specify" / "memory" / "recent-changes.jsonl"
+        self.index_path = repo_root / ".specify" / ".cache" / "recent-changes.index.json"
+        self._lock = threading.Lock()
+        self._size = 0
+        self._features: Dict[str, List[int]] = {}
+        self._loaded = False
+
+    # ── index ──
+
+    def _load_index(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self._size = int(data.get("size", 0))
+                self._features = {k: list(v) for k, v in data.get("features", {}).items()}
+        except (OSError, ValueError, AttributeError, TypeError):
+            self._size, self._features = 0, {}
+
+    def _sync_index(self) -> bool:
+        """Index records appended since the last sync; returns True if the index changed."""
+        self._load_index()
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            size = 0
+
+        if size == self._size:
+            return False
+        if size < self._size:
+            # Archive was truncated or rewritten: rebuild from the start
+            self._size, self._features = 0, {}
+            if size == 0:
+                return True
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._size)
+            offset = self._size
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Partially written record; index it once it is complete
+                    break
+                try:
+                    feature = json.loads(line).get("feature", "")
+                except ValueError:
+                    feature = ""
+                self._features.setdefault(feature, []).append(offset)
+                offset += len(line)
+        self._size = offset
+        return True
+
+    def _save_index(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.index_path.with_name(f".{self.index_path.name}.{os.getpid()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "size": self._size, "features": self._features}, f)
+        os.replace(temp_path, self.index_path)
+
+    def _read_records(self, offsets: List[int]) -> List[Dict]:
+        records: List[Dict] = []
+        if not offsets:
+            return records
+        with open(self.path, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                try:
+                    records.append(json.loads(f.readline()))
+                except ValueError:
+                    continue
+        return records
+
+    # ── public API ──
+
+    def append(self, entries: List[str], source: str = "") -> int:
+        """
+        Archive entries that are not archived yet; returns the number written.
+
+        Entries are de-duplicated by text, so the same entry trimmed from
+        several agent files (or on a retried run) is archived once.
+        """
+        if not entries:
+            return 0
+
+        with self._lock:
+            changed = self._sync_index()
+
+            known = set()
+            for feature in {entry_feature(entry) for entry in entries}:
+                known.update(record.get("entry") for record in
+                             self._read_records(self._features.get(feature, [])))
+
+            today = date.today().isoformat()
+            lines: List[bytes] = []
+            for entry in entries:
+                if entry in known:
+                    continue
+                known.add(entry)
+                record = {"feature": entry_feature(entry), "entry": entry,
+                          "source": source, "archived": today}
+                lines.append(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+
+            if lines:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                # One O_APPEND write keeps concurrent writers from interleaving records
+                fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o666)
+                try:
+                    os.write(fd, b''.join(lines))
+                finally:
+                    os.close(fd)
+                changed = self._sync_index() or changed
+
+            if changed:
+                self._save_index_quietly()
+            return len(lines)
+
+    def features(self) -> List[str]:
+        """Features with archived entries, in archive order."""
+        with self._lock:
+            if self._sync_index():
+                self._save_index_quietly()
+            return [feature for feature in self._features if feature]
+
+    def entries(self, feature: Optional[str] = None) -> List[Dict]:
+        """Archived records of one feature, or of all features in archive order."""
+        with self._lock:
+            if self._sync_index():
+                self._save_index_quietly()
+            if feature is not None:
+                offsets = self._features.get(feature, [])
+            else:
+                offsets = sorted(offset for values in self._features.values() for offset in values)
+            return self._read_records(offsets)
+
+    def _save_index_quietly(self):
+        # The index is a cache and is rebuilt from the archive when missing
+        try:
+            self._save_index()
+        except OSError:
+            pass
+
+
+# ═══════════════════════════════════════════════════════════════
+# Main Execution
+# ═══════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the archive of trimmed Recent Changes entries')
+    parser.add_argument('feature', nargs='?', default=None, help='Only show entries of this feature')
+    parser.add_argument('--json', action='store_true', help='Output in JSON format')
+    args = parser.parse_args()
+
+    archive = ChangeArchive(get_repo_root())
+    records = archive.entries(args.feature)
+
+    if args.json:
+        print(json.dumps(records, ensure_ascii=False))
+        return
+
+    if not records:
+        log_info("No archived changes" + (f" for {args.feature}" if args.feature else ""))
+        return
+    for record in records:
+        print(f"{record.get('archived', '')}  {record.get('entry', '')}  [{record.get('source', '')}]")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
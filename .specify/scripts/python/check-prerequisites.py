@@ -13,6 +13,7 @@ OPTIONS:
   --require-tasks     Require tasks.md to exist (for implementation phase)
   --include-tasks     Include tasks.md in AVAILABLE_DOCS list
   --paths-only        Only output path variables (no validation)
+  --all               Report the workflow stage of every feature directory
   --help, -h          Show help message
 """
 
@@ -26,7 +27,9 @@ from common import (
     check_feature_branch,
     check_file,
     check_dir,
+    get_repo_root,
 )
+from feature_status import format_status_table, load_feature_status
 
 
 def main():
@@ -43,6 +46,9 @@ EXAMPLES:
 
   # Get feature paths only (no validation)
   python check-prerequisites.py --paths-only
+
+  # Stage and missing artifacts of every feature
+  python check-prerequisites.py --all --json
 """
     )
     parser.add_argument('--json', '-j', action='store_true', dest='json_mode',
@@ -53,15 +59,30 @@ EXAMPLES:
                         help='Include tasks.md in AVAILABLE_DOCS list')
     parser.add_argument('--paths-only', action='store_true',
                         help='Only output path variables (no prerequisite validation)')
+    parser.add_argument('--all', action='store_true',
+                        help='Report stage and missing artifacts of every feature directory')
 
     args = parser.parse_args()
 
+    # All-features mode does not depend on the current branch
+    if args.all:
+        repo_root = get_repo_root()
+        records = load_feature_status(repo_root).records()
+        if args.json_mode:
+            print(json.dumps({'SPECS_DIR': str(repo_root / 'specs'), 'FEATURES': records}, ensure_ascii=False))
+        elif records:
+            print("\n".join(format_status_table(records)))
+        else:
+            print("No feature directories found")
+        sys.exit(0)
+
     # Get feature paths and validate branch
     paths = get_feature_paths()
     repo_root = paths['REPO_ROOT']
     current_branch = paths['CURRENT_BRANCH']
     has_git = paths['HAS_GIT'] == 'true'
     feature_dir = Path(paths['FEATURE_DIR'])
+    feature_archive = paths['FEATURE_ARCHIVE']
     feature_spec = paths['FEATURE_SPEC']
     impl_plan = Path(paths['IMPL_PLAN'])
     tasks = Path(paths['TASKS'])
@@ -87,6 +108,8 @@ EXAMPLES:
                 'IMPL_PLAN': str(impl_plan),
                 'TASKS': str(tasks)
             }
+            if feature_archive:
+                result['FEATURE_ARCHIVE'] = feature_archive
             print(json.dumps(result))
         else:
             print(f"REPO_ROOT: {repo_root}")
@@ -95,9 +118,17 @@ EXAMPLES:
             print(f"FEATURE_SPEC: {feature_spec}")
             print(f"IMPL_PLAN: {impl_plan}")
             print(f"TASKS: {tasks}")
+            if feature_archive:
+                print(f"FEATURE_ARCHIVE: {feature_archive}")
         sys.exit(0)
 
     # Validate required directories and files
+    if feature_archive:
+        print(f"ERROR: Feature {feature_dir.name} is archived in {feature_archive}", file=sys.stderr)
+        print(f"Restore it with: python .specify/scripts/python/spec_archive.py restore {feature_dir.name}",
+              file=sys.stderr)
+        sys.exit(1)
+
     if not feature_dir.is_dir():
         print(f"ERROR: Feature directory not found: {feature_dir}", file=sys.stderr)
         print("Run /speckit.specify first to create the feature structure.", file=sys.stderr)
@@ -5,12 +5,21 @@ Common functions and variables for all SpecKit scripts.
 Cross-platform compatible (Windows, macOS, Linux).
 """
 
+import hashlib
+import json
 import os
 import re
 import subprocess
 import sys
+import threading
+import unicodedata
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, NamedTuple, Tuple
+
+
+# Feature branches and spec directories: "NNN-name" with 3 or more digits
+# (001-user-auth ... 999-x, 1000-y); group 1 is the feature number
+FEATURE_PREFIX_RE = re.compile(r'^(\d{3,})-')
 
 
 def get_repo_root() -> Path:
@@ -59,7 +68,7 @@ def get_current_branch() -> str:
         for item in specs_dir.iterdir():
             if item.is_dir():
                 dirname = item.name
-                match = re.match(r'^(\d{3})-', dirname)
+                match = FEATURE_PREFIX_RE.match(dirname)
                 if match:
                     number = int(match.group(1))
                     if number > highest:
@@ -84,6 +93,87 @@ def has_git() -> bool:
         return False
 
 
+# FEATURE_PREFIX_RE for branch names in packed-refs, locally or on any remote
+_PACKED_FEATURE_REF_RE = re.compile(rb'^[0-9a-f]+ refs/(?:heads|remotes/[^/\n]+)/(\d{3,})-', re.M)
+
+
+def get_git_common_dir() -> Optional[Path]:
+    """Return the git directory shared by all worktrees, or None outside a repository."""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--git-common-dir'],
+            capture_output=True, text=True, check=True
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    # Relative to the current directory when inside the main worktree
+    return Path(result.stdout.strip()).resolve()
+
+
+def _highest_from_loose_refs(refs_dir: Path, depth: int) -> int:
+    """Scan loose refs; depth is the number of path levels before the branch name."""
+    highest = 0
+    for dirpath, dirnames, filenames in os.walk(refs_dir):
+        level = len(Path(dirpath).relative_to(refs_dir).parts)
+        if level == depth:
+            for name in filenames:
+                match = FEATURE_PREFIX_RE.match(name)
+                if match:
+                    highest = max(highest, int(match.group(1)))
+            # Branch names below this level are "group/NNN-x", not feature branches
+            dirnames[:] = []
+    return highest
+
+
+def _highest_from_for_each_ref() -> int:
+    try:
+        result = subprocess.run(
+            ['git', 'for-each-ref', '--format=%(refname)',
+             'refs/heads/[0-9][0-9][0-9]*', 'refs/remotes/*/[0-9][0-9][0-9]*'],
+            capture_output=True, text=True, check=True
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return 0
+
+    highest = 0
+    for refname in result.stdout.split('\n'):
+        parts = refname.split('/')
+        name = parts[2] if parts[1:2] == ['heads'] and len(parts) == 3 else (
+            parts[3] if parts[1:2] == ['remotes'] and len(parts) == 4 else "")
+        match = FEATURE_PREFIX_RE.match(name)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest
+
+
+def get_highest_feature_number_from_refs() -> int:
+    """
+    Return the highest NNN of local and remote-tracking feature branches.
+
+    Reads packed-refs (one regex pass over the file) and the loose refs under
+    refs/heads and refs/remotes directly instead of parsing `git branch -a`.
+    Repositories using the reftable backend fall back to
+    `git for-each-ref` with a feature-branch pattern.
+    """
+    git_dir = get_git_common_dir()
+    if git_dir is None:
+        return 0
+    if (git_dir / 'reftable').is_dir():
+        return _highest_from_for_each_ref()
+
+    highest = 0
+    try:
+        with open(git_dir / 'packed-refs', 'rb') as f:
+            for match in _PACKED_FEATURE_REF_RE.finditer(f.read()):
+                highest = max(highest, int(match.group(1)))
+    except OSError:
+        pass
+
+    highest = max(highest, _highest_from_loose_refs(git_dir / 'refs' / 'heads', 0))
+    highest = max(highest, _highest_from_loose_refs(git_dir / 'refs' / 'remotes', 1))
+    return highest
+
+
 def check_feature_branch(branch: str, has_git_repo: bool) -> Tuple[bool, Optional[str]]:
     """
     Check if on a valid feature branch.
@@ -94,7 +184,7 @@ def check_feature_branch(branch: str, has_git_repo: bool) -> Tuple[bool, Optiona
         print("[specify] Warning: Git repository not detected; skipped branch validation", file=sys.stderr)
         return True, None
 
-    if not re.match(r'^\d{3}-', branch):
+    if not FEATURE_PREFIX_RE.match(branch):
         error = f"ERROR: Not on a feature branch. Current branch: {branch}\n"
         error += "Feature branches should be named like: 001-feature-name"
         return False, error
@@ -102,6 +192,88 @@ def check_feature_branch(branch: str, has_git_repo: bool) -> Tuple[bool, Optiona
     return True, None
 
 
+def feature_sort_key(name: str) -> Tuple[int, str]:
+    """Sort key ordering feature names by numeric prefix (999-x before 1000-y)."""
+    match = FEATURE_PREFIX_RE.match(name)
+    return (int(match.group(1)) if match else -1, name)
+
+
+class FeatureRequest(NamedTuple):
+    """One entry of a batch feature manifest."""
+    description: str
+    short_name: str = ""
+
+
+def load_feature_manifest(manifest_file: Path) -> List[FeatureRequest]:
+    """
+    Read a JSONL feature manifest, one feature per line:
+
+        {"description": "Add user authentication", "short_name": "user-auth"}
+
+    A line may also be a plain JSON string (the description). Blank lines are
+    skipped. Raises ValueError naming the first invalid line.
+    """
+    requests: List[FeatureRequest] = []
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{manifest_file}:{line_no}: invalid JSON ({e})")
+            if isinstance(entry, str):
+                entry = {"description": entry}
+            if not isinstance(entry, dict):
+                raise ValueError(f"{manifest_file}:{line_no}: expected an object or a string")
+            description = str(entry.get("description") or "").strip()
+            if not description:
+                raise ValueError(f"{manifest_file}:{line_no}: missing \"description\"")
+            requests.append(FeatureRequest(description, str(entry.get("short_name") or "").strip()))
+    return requests
+
+
+# Task checkboxes in tasks.md: "- [ ] T001 ..." / "- [x] T001 ..."
+_TASK_BOX_RE = re.compile(r'^\s*[-*] \[([ xX])\]', re.M)
+
+
+def count_task_boxes(text: str) -> Tuple[int, int]:
+    """(checked, total) task checkboxes in the text of a tasks.md."""
+    boxes = _TASK_BOX_RE.findall(text)
+    return len(boxes) - boxes.count(' '), len(boxes)
+
+
+# Completed features moved out of specs/ by spec_archive.py
+SPECS_ARCHIVE_DIR = '.archive'
+
+
+def get_highest_archived_number(specs_dir: Path) -> int:
+    """Highest feature number ever archived (archived numbers stay taken)."""
+    try:
+        with open(specs_dir / SPECS_ARCHIVE_DIR / 'index.json', 'r', encoding='utf-8') as f:
+            return int(json.load(f).get("highest", 0))
+    except (OSError, ValueError, AttributeError, TypeError):
+        return 0
+
+
+def find_archived_feature(specs_dir: Path, prefix: str) -> Optional[str]:
+    """Name of the archived feature with this number prefix, if there is exactly one (read-only)."""
+    if not (specs_dir / SPECS_ARCHIVE_DIR).is_dir():
+        return None
+    # Imported here: spec_archive itself imports common
+    from spec_archive import SpecArchive
+    names = SpecArchive(specs_dir).find(prefix)
+    return names[0] if len(names) == 1 else None
+
+
+def get_archived_feature_zip(feature_dir: Path) -> Optional[Path]:
+    """Archive of a feature directory that is not in specs/ but in specs/.archive/, or None."""
+    zip_path = feature_dir.parent / SPECS_ARCHIVE_DIR / f"{feature_dir.name}.zip"
+    if feature_dir.is_dir() or not zip_path.is_file():
+        return None
+    return zip_path
+
+
 def get_feature_dir(repo_root: Path, branch: str) -> Path:
     """Get the feature directory path."""
     return repo_root / 'specs' / branch
@@ -115,7 +287,7 @@ def find_feature_dir_by_prefix(repo_root: Path, branch_name: str) -> Path:
     specs_dir = repo_root / 'specs'
 
     # Extract numeric prefix from branch (e.g., "004" from "004-whatever")
-    match = re.match(r'^(\d{3})-', branch_name)
+    match = FEATURE_PREFIX_RE.match(branch_name)
     if not match:
         # If branch doesn't have numeric prefix, fall back to exact match
         return specs_dir / branch_name
@@ -131,6 +303,13 @@ def find_feature_dir_by_prefix(repo_root: Path, branch_name: str) -> Path:
 
     # Handle results
     if len(matches) == 0:
+        # An archived feature is reported where it would be restored; the
+        # lookup never restores it (see spec_archive.py restore)
+        archived = find_archived_feature(specs_dir, prefix)
+        if archived is not None:
+            print(f"[specify] Feature {archived} is archived in specs/{SPECS_ARCHIVE_DIR}/{archived}.zip",
+                  file=sys.stderr)
+            return specs_dir / archived
         # No match found - return the branch name path (will fail later with clear error)
         return specs_dir / branch_name
     elif len(matches) == 1:
@@ -154,12 +333,15 @@ def get_feature_paths() -> Dict[str, str]:
 
     # Use prefix-based lookup to support multiple branches per spec
     feature_dir = find_feature_dir_by_prefix(repo_root, current_branch)
+    archive_zip = get_archived_feature_zip(feature_dir)
 
     return {
         'REPO_ROOT': str(repo_root),
         'CURRENT_BRANCH': current_branch,
         'HAS_GIT': str(has_git_repo).lower(),
         'FEATURE_DIR': str(feature_dir),
+        # Set when FEATURE_DIR is archived rather than missing
+        'FEATURE_ARCHIVE': str(archive_zip) if archive_zip else '',
         'FEATURE_SPEC': str(feature_dir / 'spec.md'),
         'IMPL_PLAN': str(feature_dir / 'plan.md'),
         'TASKS': str(feature_dir / 'tasks.md'),
@@ -185,6 +367,425 @@ def check_dir(path: str, label: str) -> str:
     return f"  ✗ {label}"
 
 
+# Short names (feature directory / branch name suffixes)
+
+# Words dropped from auto-generated short names
+SHORT_NAME_STOP_WORDS = frozenset({
+    'i', 'a', 'an', 'the', 'to', 'for', 'of', 'in', 'on', 'at', 'by', 'with',
+    'from', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has',
+    'had', 'do', 'does', 'did', 'will', 'would', 'should', 'could', 'can',
+    'may', 'might', 'must', 'shall', 'this', 'that', 'these', 'those', 'my',
+    'your', 'our', 'their', 'want', 'need', 'add', 'get', 'set', 'make', 'use',
+})
+
+# Chinese filler words; CJK text has no spaces, so they split a run into words
+SHORT_NAME_CJK_STOP_WORDS = frozenset({
+    '我们', '我', '你', '需要', '希望', '想要', '添加', '增加', '新增', '实现', '支持',
+    '一个', '一些', '这个', '那个', '功能', '用于', '进行', '可以', '能够', '以及',
+    '和', '与', '及', '或', '的', '地', '得', '了', '在', '对', '把', '给', '让', '为',
+})
+
+# Characters without a transliteration are dropped
+DEFAULT_TRANSLITERATION_FILE = Path(__file__).resolve().parent.parent.parent / 'pinyin-initials.txt'
+
+_CJK_CLASS = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_SHORT_NAME_WORD_RE = re.compile(rf'[a-z0-9]+|[{_CJK_CLASS}]+')
+_SHORT_NAME_CJK_RUN_RE = re.compile(rf'[{_CJK_CLASS}]+')
+_SHORT_NAME_SEPARATOR_RE = re.compile(r'[^a-z0-9]+')
+_COMBINING_MARK_RE = re.compile('[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]+')
+_SHORT_NAME_CJK_STOP_RE = re.compile(
+    '|'.join(sorted(map(re.escape, SHORT_NAME_CJK_STOP_WORDS), key=len, reverse=True)))
+
+
+def load_transliteration_table(table_file: Path) -> Dict[str, str]:
+    """
+    Read a transliteration table: lines of "<latin> <characters>", "#" comments.
+
+    Every character on a line maps to the latin text; later lines override
+    earlier ones, so a table can be extended by appending lines.
+    """
+    table: Dict[str, str] = {}
+    try:
+        with open(table_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('#'):
+                    continue
+                parts = line.split()
+                if len(parts) < 2:
+                    continue
+                latin = parts[0].lower()
+                for chars in parts[1:]:
+                    table.update(dict.fromkeys(chars, latin))
+    except OSError:
+        pass
+    return table
+
+
+class ShortNameEngine:
+    """
+    Turns feature descriptions into kebab-case short names.
+
+    Latin text is lowercased and stripped of accents; CJK runs are split at
+    Chinese stop words and transliterated character by character through a
+    pluggable table (pinyin initials by default, "用户认证" -> "yhrz").
+    """
+
+    def __init__(self, transliteration: Optional[Dict[str, str]] = None,
+                 stop_words: frozenset = SHORT_NAME_STOP_WORDS):
+        self.transliteration = transliteration if transliteration is not None else {}
+        self.stop_words = stop_words
+        self._translate_table = {ord(ch): latin for ch, latin in self.transliteration.items()}
+
+    def _fold(self, text: str) -> str:
+        # "Café" -> "cafe"; CJK characters are unaffected by NFKD
+        if text.isascii():
+            return text.lower()
+        return _COMBINING_MARK_RE.sub('', unicodedata.normalize('NFKD', text)).lower()
+
+    def _transliterate_run(self, run: str) -> str:
+        # Characters missing from the table stay CJK and are removed
+        return _SHORT_NAME_CJK_RUN_RE.sub('', run.translate(self._translate_table))
+
+    def clean(self, name: str) -> str:
+        """Format a name as kebab-case, transliterating CJK runs."""
+        text = self._fold(name)
+        if not text.isascii():
+            text = _SHORT_NAME_CJK_RUN_RE.sub(lambda m: f"-{self._transliterate_run(m.group())}-", text)
+        return _SHORT_NAME_SEPARATOR_RE.sub('-', text).strip('-')
+
+    def words(self, description: str) -> List[str]:
+        """Meaningful words of a description, stop words and short words removed."""
+        words: List[str] = []
+        for word in _SHORT_NAME_WORD_RE.findall(self._fold(description)):
+            if word[0] < '\u0080':
+                if word in self.stop_words:
+                    continue
+                # Keep short words if uppercase in original (likely acronyms)
+                if len(word) >= 3 or word.upper() in description:
+                    words.append(word)
+                continue
+            for piece in _SHORT_NAME_CJK_STOP_RE.split(word):
+                latin = self._transliterate_run(piece)
+                if latin:
+                    words.append(latin)
+        return words
+
+    def generate(self, description: str, max_words: int = 3, allow_four: bool = False) -> str:
+        """
+        Generate a short name from the first meaningful words of a description.
+
+        allow_four keeps all four words when there are exactly four.
+        """
+        words = self.words(description)
+        if words:
+            limit = 4 if allow_four and len(words) == 4 else max_words
+            return '-'.join(words[:limit])
+
+        # Fallback: the cleaned description itself
+        parts = [p for p in self.clean(description).split('-') if p][:max_words]
+        return '-'.join(parts) or 'feature'
+
+
+_short_name_engine: Optional[ShortNameEngine] = None
+
+
+def get_short_name_engine() -> ShortNameEngine:
+    """Shared engine using the default transliteration table (loaded once)."""
+    global _short_name_engine
+    if _short_name_engine is None:
+        _short_name_engine = ShortNameEngine(load_transliteration_table(DEFAULT_TRANSLITERATION_FILE))
+    return _short_name_engine
+
+
+def clean_short_name(name: str) -> str:
+    """Format an explicit short name as kebab-case."""
+    return get_short_name_engine().clean(name)
+
+
+def generate_short_name(description: str, max_words: int = 3, allow_four: bool = False) -> str:
+    """Generate a short name from a feature description."""
+    return get_short_name_engine().generate(description, max_words, allow_four)
+
+
+# Plan document parsing
+
+PLAN_PLACEHOLDER_VALUES = frozenset({"NEEDS CLARIFICATION", "N/A"})
+
+_PLAN_FIELD_RE = re.compile(r'^\*\*([^*\n]+)\*\*:[ \t]*(.+)$')
+_PLAN_HEADING_RE = re.compile(r'^(#{1,6})[ \t]+(.+?)[ \t]*#*[ \t]*$')
+_PLAN_FENCE_RE = re.compile(r'^(`{3,}|~{3,})[ \t]*([^`\s]*)')
+# Lines the field scan looks at: fences (indent, run; indented ones can only
+# close a block) and fields (name, value). Anchored on a literal newline
+# rather than ^ with MULTILINE and guarded by the possible first characters,
+# so the engine skips every other line without trying the alternatives
+_PLAN_SCAN_RE = re.compile(r'\n(?=[ \t`~*])(?:([ \t]*)(`{3,}|~{3,})|\*\*([^*\n]+)\*\*:[ \t]*(.+))')
+
+
+class PlanSection(NamedTuple):
+    """A heading-delimited section of plan.md (line numbers are 0-based, end exclusive)."""
+    level: int
+    title: str
+    start: int
+    end: int
+
+
+class PlanCodeBlock(NamedTuple):
+    """A fenced code block of plan.md."""
+    language: str
+    content: str
+    section: str
+
+
+class PlanDocument:
+    """
+    Structured view of a plan.md file.
+
+    The **Field**: value lines (first occurrence wins, matching the old
+    per-field regex search) are collected when the document is created, by a
+    single regex scan over the field and fence lines. The heading-delimited
+    sections, the fields per section and the fenced code blocks are built on
+    first access, so field lookups do not pay for splitting the whole file
+    into lines. Headings and fields inside code blocks are ignored.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.fields: Dict[str, str] = {}
+        self._lines: Optional[List[str]] = None
+        self._sections: Optional[List[PlanSection]] = None
+        self._section_fields: Optional[Dict[str, Dict[str, str]]] = None
+        self._code_blocks: Optional[List[PlanCodeBlock]] = None
+        self._parse_fields()
+
+    def _parse_fields(self):
+        fence = ""
+        for indent, run, name, value in _PLAN_SCAN_RE.findall('\n' + self.text):
+            if run:
+                if fence:
+                    if run.startswith(fence):
+                        fence = ""
+                elif not indent:
+                    fence = run
+            elif not fence:
+                self.fields.setdefault(name, value.strip())
+
+    def _parse_structure(self):
+        lines = self.text.split('\n')
+        sections: List[PlanSection] = []
+        section_fields: Dict[str, Dict[str, str]] = {}
+        code_blocks: List[PlanCodeBlock] = []
+        open_sections: List[Tuple[int, str, int]] = []
+        current_section = ""
+        fence = ""
+        fence_lang = ""
+        fence_lines: List[str] = []
+
+        for i, line in enumerate(lines):
+            if fence:
+                if line.lstrip().startswith(fence):
+                    code_blocks.append(PlanCodeBlock(fence_lang, '\n'.join(fence_lines), current_section))
+                    fence = ""
+                else:
+                    fence_lines.append(line)
+                continue
+
+            first = line[:1]
+            if first == '`' or first == '~':
+                match = _PLAN_FENCE_RE.match(line)
+                if match:
+                    fence = match.group(1)
+                    fence_lang = match.group(2)
+                    fence_lines = []
+            elif first == '#':
+                match = _PLAN_HEADING_RE.match(line)
+                if match:
+                    level = len(match.group(1))
+                    # Close sections at the same or a deeper level
+                    while open_sections and open_sections[-1][0] >= level:
+                        lvl, title, start = open_sections.pop()
+                        sections.append(PlanSection(lvl, title, start, i))
+                    current_section = match.group(2)
+                    open_sections.append((level, current_section, i))
+            elif first == '*' and line.startswith('**'):
+                match = _PLAN_FIELD_RE.match(line)
+                if match:
+                    section_fields.setdefault(current_section, {}).setdefault(match.group(1), match.group(2).strip())
+
+        # An unterminated fence runs to the end of the file
+        if fence:
+            code_blocks.append(PlanCodeBlock(fence_lang, '\n'.join(fence_lines), current_section))
+
+        for lvl, title, start in open_sections:
+            sections.append(PlanSection(lvl, title, start, len(lines)))
+        sections.sort(key=lambda section: section.start)
+        self._lines, self._sections, self._code_blocks = lines, sections, code_blocks
+        self._section_fields = section_fields
+
+    @property
+    def lines(self) -> List[str]:
+        if self._lines is None:
+            self._parse_structure()
+        return self._lines
+
+    @property
+    def sections(self) -> List[PlanSection]:
+        """Heading-delimited sections in document order."""
+        if self._sections is None:
+            self._parse_structure()
+        return self._sections
+
+    @property
+    def section_fields(self) -> Dict[str, Dict[str, str]]:
+        """Fields per heading title, first occurrence within the section wins."""
+        if self._section_fields is None:
+            self._parse_structure()
+        return self._section_fields
+
+    @property
+    def code_blocks(self) -> List[PlanCodeBlock]:
+        """Fenced code blocks in document order."""
+        if self._code_blocks is None:
+            self._parse_structure()
+        return self._code_blocks
+
+    def field(self, name: str) -> str:
+        """Return a field value, or "" when missing or a placeholder."""
+        value = self.fields.get(name, "")
+        if value in PLAN_PLACEHOLDER_VALUES:
+            return ""
+        return value
+
+    @property
+    def technical_context(self) -> Dict[str, str]:
+        """Fields declared under the Technical Context heading."""
+        return self.section_fields.get("Technical Context", {})
+
+    def section(self, title: str) -> Optional[PlanSection]:
+        """Return the first section with the given heading title."""
+        for section in self.sections:
+            if section.title == title:
+                return section
+        return None
+
+    def section_text(self, title: str) -> str:
+        """Return the body of a section (without its heading line)."""
+        section = self.section(title)
+        if section is None:
+            return ""
+        return '\n'.join(self.lines[section.start + 1:section.end]).strip('\n')
+
+
+# Parsed plans keyed by content hash, shared by every caller in the process
+_plan_cache: Dict[str, PlanDocument] = {}
+_PLAN_CACHE_LIMIT = 256
+
+
+def parse_plan_bytes(data: bytes) -> PlanDocument:
+    """Parse plan.md content, reusing the cached document for identical content."""
+    digest = hashlib.sha256(data).hexdigest()
+    plan = _plan_cache.get(digest)
+    if plan is None:
+        plan = PlanDocument(data.decode('utf-8', errors='replace'))
+        if len(_plan_cache) >= _PLAN_CACHE_LIMIT:
+            _plan_cache.pop(next(iter(_plan_cache)))
+        _plan_cache[digest] = plan
+    return plan
+
+
+def load_plan_document(plan_file: Path) -> Optional[PlanDocument]:
+    """Read and parse a plan.md file; returns None if it cannot be read."""
+    try:
+        data = Path(plan_file).read_bytes()
+    except OSError:
+        return None
+    return parse_plan_bytes(data)
+
+
+# Token estimation
+
+# Pieces that BPE tokenizers typically encode as about one token each: a word
+# (with its leading space), up to 3 digits, a CJK character, a run of newlines
+# or indentation, or a run of punctuation (counted per 2 characters).
+_TOKEN_PIECE_RE = re.compile(
+    r"[A-Za-z]+|\d{1,3}|[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff]|\n+|[ \t]{2,}"
+    r"|[^\sA-Za-z\d\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff]+"
+)
+
+
+def estimate_text_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens a model needs for text.
+
+    Closer to real tokenizers than the bytes/4 rule: English words count as
+    one token plus one per further 10 letters, CJK characters as one token
+    each (bytes/4 under-counts them by ~25%), and markdown punctuation such
+    as "**" or "```" per two characters.
+    """
+    tokens = 0
+    for piece in _TOKEN_PIECE_RE.findall(text):
+        first = piece[0]
+        if 'A' <= first <= 'z' and first.isalpha():
+            tokens += 1 + len(piece) // 10
+        elif first.isdigit() or first in '\n \t' or len(piece) == 1:
+            tokens += 1
+        else:
+            tokens += (len(piece) + 1) // 2
+    return tokens
+
+
+# Template rendering
+
+# [PLACEHOLDER] slots, e.g. [DATE] or [###-feature-name], and $ARGUMENTS
+_TEMPLATE_SLOT_RE = re.compile(r'(\[[^\[\]\n]+\]|\$ARGUMENTS)')
+
+
+class CompiledTemplate:
+    """
+    A template split once into literal text and [PLACEHOLDER] slots.
+
+    segments alternates literal text (even indexes) and slot names (odd
+    indexes, including the brackets). render() fills the slots in a single
+    join; slots without a value are kept verbatim, so markdown such as
+    checkboxes and links passes through unchanged.
+    """
+
+    def __init__(self, text: str):
+        self.segments: List[str] = _TEMPLATE_SLOT_RE.split(text)
+        self.slots = frozenset(self.segments[1::2])
+
+    def render(self, values: Dict[str, str]) -> str:
+        segments = self.segments
+        if not values or self.slots.isdisjoint(values):
+            return ''.join(segments)
+        return ''.join(
+            values.get(segment, segment) if i & 1 else segment
+            for i, segment in enumerate(segments)
+        )
+
+
+# Compiled templates keyed by content hash, shared by every caller in the process
+_template_cache: Dict[str, CompiledTemplate] = {}
+
+
+def compile_template_bytes(data: bytes) -> CompiledTemplate:
+    """Compile template content, reusing the cached template for identical content."""
+    digest = hashlib.sha256(data).hexdigest()
+    template = _template_cache.get(digest)
+    if template is None:
+        template = CompiledTemplate(data.decode('utf-8'))
+        _template_cache[digest] = template
+    return template
+
+
+def load_template(template_file: Path) -> Optional[CompiledTemplate]:
+    """Read and compile a template file; returns None if it cannot be read."""
+    try:
+        data = Path(template_file).read_bytes()
+    except OSError:
+        return None
+    return compile_template_bytes(data)
+
+
 # Color output support
 class Colors:
     """ANSI color codes for terminal output."""
@@ -216,24 +817,33 @@ if not sys.stdout.isatty() or (sys.platform == 'win32' and 'ANSICON' not in os.e
             Colors.disable()
 
 
+# Serializes log lines written from worker threads
+_log_lock = threading.Lock()
+
+
+def _log(line: str):
+    with _log_lock:
+        print(line)
+
+
 def log_info(message: str):
     """Print info message."""
-    print(f"{Colors.BLUE}[INFO]{Colors.NC} {message}")
+    _log(f"{Colors.BLUE}[INFO]{Colors.NC} {message}")
 
 
 def log_success(message: str):
     """Print success message."""
-    print(f"{Colors.GREEN}[OK]{Colors.NC} {message}")
+    _log(f"{Colors.GREEN}[OK]{Colors.NC} {message}")
 
 
 def log_warn(message: str):
     """Print warning message."""
-    print(f"{Colors.YELLOW}[WARN]{Colors.NC} {message}")
+    _log(f"{Colors.YELLOW}[WARN]{Colors.NC} {message}")
 
 
 def log_error(message: str):
     """Print error message."""
-    print(f"{Colors.RED}[ERROR]{Colors.NC} {message}")
+    _log(f"{Colors.RED}[ERROR]{Colors.NC} {message}")
 
 
 if __name__ == '__main__':
@@ -7,23 +7,25 @@ Create a new feature branch and spec directory.
 import argparse
 import json
 import os
-import re
-import shutil
 import subprocess
 import sys
+import time
 from pathlib import Path
-
-from common import get_repo_root, log_warn
-
-
-# Common stop words to filter out
-STOP_WORDS = {
-    'i', 'a', 'an', 'the', 'to', 'for', 'of', 'in', 'on', 'at', 'by', 'with',
-    'from', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has',
-    'had', 'do', 'does', 'did', 'will', 'would', 'should', 'could', 'can',
-    'may', 'might', 'must', 'shall', 'this', 'that', 'these', 'those', 'my',
-    'your', 'our', 'their', 'want', 'need', 'add', 'get', 'set'
-}
+from typing import Dict, List
+
+from common import (
+    FEATURE_PREFIX_RE,
+    FeatureRequest,
+    clean_short_name,
+    generate_short_name,
+    get_highest_feature_number_from_refs,
+    get_repo_root,
+    load_feature_manifest,
+    log_error,
+    log_warn,
+)
+from feature_numbers import FeatureNumberAllocator
+from scaffold import FULL_SCAFFOLD, SPEC_SCAFFOLD, FeatureScaffolder
 
 
 def has_git() -> bool:
@@ -44,7 +46,7 @@ def get_highest_from_specs(specs_dir: Path) -> int:
     if specs_dir.is_dir():
         for item in specs_dir.iterdir():
             if item.is_dir():
-                match = re.match(r'^(\d+)', item.name)
+                match = FEATURE_PREFIX_RE.match(item.name)
                 if match:
                     number = int(match.group(1))
                     if number > highest:
@@ -53,42 +55,113 @@ def get_highest_from_specs(specs_dir: Path) -> int:
 
 
 def get_highest_from_branches() -> int:
-    """Get highest number from git branches."""
-    highest = 0
+    """Get highest number from local and remote-tracking git branches."""
+    return get_highest_feature_number_from_refs()
+
+
+# Remote-tracking refs younger than this are used without fetching
+# (override with the SPECIFY_FETCH_TTL environment variable, in seconds)
+FETCH_TTL_SECONDS = 15 * 60
+
+# Modes of refresh_remote_refs
+FETCH_AUTO = 'auto'
+FETCH_ALWAYS = 'always'
+FETCH_NEVER = 'never'
+
+
+def get_fetch_ttl() -> int:
+    """Return the remote refs TTL in seconds."""
+    try:
+        return int(os.environ.get('SPECIFY_FETCH_TTL', FETCH_TTL_SECONDS))
+    except ValueError:
+        return FETCH_TTL_SECONDS
+
+
+def get_last_fetch_time(repo_root: Path) -> float:
+    """
+    Return when remote refs were last fetched (or a background fetch started).
+
+    FETCH_HEAD is rewritten by every git fetch, including the user's own, so its
+    mtime tells how fresh the remote-tracking refs are.
+    """
+    times = [0.0]
     try:
         result = subprocess.run(
-            ['git', 'branch', '-a'],
+            ['git', 'rev-parse', '--git-path', 'FETCH_HEAD'],
             capture_output=True, text=True, check=True
         )
-        branches = result.stdout.strip()
-        if branches:
-            for line in branches.split('\n'):
-                # Clean branch name: remove leading markers and remote prefixes
-                branch = re.sub(r'^[* ]+', '', line)
-                branch = re.sub(r'^remotes/[^/]+/', '', branch)
-
-                # Extract feature number if branch matches pattern ###-*
-                match = re.match(r'^(\d{3})-', branch)
-                if match:
-                    number = int(match.group(1))
-                    if number > highest:
-                        highest = number
-    except (subprocess.CalledProcessError, FileNotFoundError):
+        times.append(os.path.getmtime(repo_root / result.stdout.strip()))
+    except (subprocess.CalledProcessError, FileNotFoundError, OSError):
         pass
-    return highest
+    try:
+        times.append(os.path.getmtime(get_fetch_stamp(repo_root)))
+    except OSError:
+        pass
+    return max(times)
+
 
+def get_fetch_stamp(repo_root: Path) -> Path:
+    """Marker touched when a background fetch is started."""
+    return repo_root / '.specify' / '.cache' / 'last-fetch-attempt'
 
-def check_existing_branches(specs_dir: Path) -> int:
-    """Check existing branches and return next available number."""
-    # Fetch all remotes to get latest branch info
+
+def has_remotes() -> bool:
+    """Check if the repository has any remote configured."""
     try:
-        subprocess.run(
-            ['git', 'fetch', '--all', '--prune'],
-            capture_output=True, check=False
+        result = subprocess.run(['git', 'remote'], capture_output=True, text=True, check=True)
+        return bool(result.stdout.strip())
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+
+
+def refresh_remote_refs(repo_root: Path, mode: str = FETCH_AUTO) -> None:
+    """
+    Keep remote-tracking refs reasonably fresh without blocking on the network.
+
+    FETCH_ALWAYS fetches all remotes and waits (the old behaviour). FETCH_AUTO
+    uses the cached refs as they are and, when they are older than the TTL,
+    starts a detached background fetch so the next run sees fresh refs.
+    FETCH_NEVER only uses the cached refs.
+    """
+    if mode == FETCH_NEVER or not has_remotes():
+        return
+
+    fetch_cmd = ['git', 'fetch', '--all', '--prune', '--quiet']
+    env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+
+    if mode == FETCH_ALWAYS:
+        try:
+            subprocess.run(fetch_cmd, capture_output=True, check=False, env=env)
+        except FileNotFoundError:
+            pass
+        return
+
+    if time.time() - get_last_fetch_time(repo_root) < get_fetch_ttl():
+        return
+
+    # Record the attempt first, so an offline machine does not retry on every run
+    stamp = get_fetch_stamp(repo_root)
+    try:
+        stamp.parent.mkdir(parents=True, exist_ok=True)
+        stamp.touch()
+    except OSError:
+        pass
+
+    try:
+        subprocess.Popen(
+            fetch_cmd, cwd=repo_root, env=env,
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True,
         )
-    except FileNotFoundError:
+    except OSError:
         pass
 
+
+def get_highest_in_use(specs_dir: Path, fetch_mode: str = FETCH_AUTO) -> int:
+    """Return the highest number used by any branch or spec directory."""
+    # Refresh remote branch info (in the background unless forced)
+    refresh_remote_refs(specs_dir.parent, fetch_mode)
+
     # Get highest number from ALL branches
     highest_branch = get_highest_from_branches()
 
@@ -96,49 +169,214 @@ def check_existing_branches(specs_dir: Path) -> int:
     highest_spec = get_highest_from_specs(specs_dir)
 
     # Take the maximum of both
-    max_num = max(highest_branch, highest_spec)
-
-    # Return next number
-    return max_num + 1
-
-
-def clean_branch_name(name: str) -> str:
-    """Clean and format a branch name."""
-    name = name.lower()
-    name = re.sub(r'[^a-z0-9]', '-', name)
-    name = re.sub(r'-+', '-', name)
-    name = name.strip('-')
-    return name
-
-
-def generate_branch_name(description: str) -> str:
-    """Generate branch name with stop word filtering and length filtering."""
-    # Convert to lowercase and split into words
-    clean_desc = re.sub(r'[^a-z0-9]', ' ', description.lower())
-    words = clean_desc.split()
-
-    # Filter words: remove stop words and words shorter than 3 chars
-    meaningful_words = []
-    for word in words:
-        if not word:
-            continue
-        if word not in STOP_WORDS:
-            if len(word) >= 3:
-                meaningful_words.append(word)
-            elif word.upper() in description:
-                # Keep short words if they appear as uppercase in original (likely acronyms)
-                meaningful_words.append(word)
-
-    # If we have meaningful words, use first 3-4 of them
-    if meaningful_words:
-        max_words = 4 if len(meaningful_words) == 4 else 3
-        result = '-'.join(meaningful_words[:max_words])
-        return result
+    return max(highest_branch, highest_spec)
+
+
+def check_existing_branches(specs_dir: Path, allocator: FeatureNumberAllocator,
+                            fetch_mode: str = FETCH_AUTO, label: str = "") -> int:
+    """Check existing branches and reserve the next available number."""
+    # Reserve the next number, so concurrent creators never share one
+    return allocator.reserve(get_highest_in_use(specs_dir, fetch_mode), label)
+
+
+# GitHub enforces a 244-byte limit on branch names
+MAX_BRANCH_LENGTH = 244
+
+
+def make_branch_name(feature_num: str, branch_suffix: str) -> str:
+    """Join number and suffix, truncating the suffix to the branch name limit."""
+    branch_name = f"{feature_num}-{branch_suffix}"
+    if len(branch_name) > MAX_BRANCH_LENGTH:
+        # Truncate suffix
+        max_suffix_length = MAX_BRANCH_LENGTH - 4  # 3 for number + 1 for hyphen
+        truncated_suffix = branch_suffix[:max_suffix_length].rstrip('-')
+        original_branch_name = branch_name
+        branch_name = f"{feature_num}-{truncated_suffix}"
+
+        log_warn(f"Branch name exceeded GitHub's 244-byte limit")
+        log_warn(f"Original: {original_branch_name} ({len(original_branch_name)} bytes)")
+        log_warn(f"Truncated to: {branch_name} ({len(branch_name)} bytes)")
+    return branch_name
+
+
+def branch_suffix_for(request: FeatureRequest) -> str:
+    """Branch name suffix from an explicit short name or the description."""
+    if request.short_name:
+        return clean_short_name(request.short_name)
+    return generate_short_name(request.description, allow_four=True)
+
+
+def create_spec_file(scaffolder: FeatureScaffolder, specs_dir: Path, branch_name: str,
+                     description: str, full_scaffold: bool = False) -> Path:
+    """
+    Create the feature directory and render the spec template into it.
+
+    With full_scaffold the plan, tasks and checklist templates are rendered
+    in the same pass.
+    """
+    feature_dir = specs_dir / branch_name
+    feature_dir.mkdir(parents=True, exist_ok=True)
+
+    files = FULL_SCAFFOLD if full_scaffold else SPEC_SCAFFOLD
+    scaffolder.scaffold(feature_dir, branch_name, description, files)
+    spec_file = feature_dir / 'spec.md'
+    if not spec_file.exists():
+        spec_file.touch()
+    return spec_file
+
+
+def create_branch_refs(branch_names: List[str]) -> bool:
+    """
+    Create branches at HEAD without checking them out.
+
+    All refs are created in one `git update-ref --stdin` transaction, so either
+    every branch is created or none is.
+    """
+    try:
+        head = subprocess.run(
+            ['git', 'rev-parse', '--verify', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        commands = ''.join(f"create refs/heads/{name} {head}\n" for name in branch_names)
+        subprocess.run(
+            ['git', 'update-ref', '--stdin'],
+            input=commands, capture_output=True, text=True, check=True
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"Error creating branches: {(e.stderr or '').strip() or e}", file=sys.stderr)
+        return False
+    return True
+
+
+def checkout_new_branch(branch_name: str) -> bool:
+    """Create a branch and switch the working tree to it."""
+    try:
+        subprocess.run(
+            ['git', 'checkout', '-b', branch_name],
+            check=True
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"Error creating branch: {e}", file=sys.stderr)
+        return False
+    return True
+
+
+def add_worktree(worktree: Path, branch_name: str) -> bool:
+    """Check out an existing branch into a new linked worktree."""
+    try:
+        worktree.parent.mkdir(parents=True, exist_ok=True)
+        subprocess.run(
+            ['git', 'worktree', 'add', '--quiet', str(worktree), branch_name],
+            capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Error creating worktree {worktree}: {(getattr(e, 'stderr', '') or '').strip() or e}",
+              file=sys.stderr)
+        return False
+    return True
+
+
+def get_worktree_base(repo_root: Path, worktree_dir: str) -> Path:
+    """Directory holding per-feature worktrees (default: <repo>.worktrees next to the repo)."""
+    if worktree_dir:
+        return Path(worktree_dir).resolve()
+    return repo_root.parent / f"{repo_root.name}.worktrees"
+
+
+def feature_result(branch_name: str, spec_file: Path) -> Dict[str, str]:
+    """JSON output record of one created feature."""
+    return {
+        'BRANCH_NAME': branch_name,
+        'SPEC_FILE': str(spec_file),
+        'FEATURE_NUM': branch_name.split('-', 1)[0],
+    }
+
+
+def create_features(args, repo_root: Path, specs_dir: Path, is_git: bool,
+                    branch_names: List[str], descriptions: List[str]) -> List[Dict[str, str]]:
+    """
+    Create the branches and spec directories of the given features.
+
+    By default each branch is checked out in turn. With --no-checkout the
+    branches are only created as refs at HEAD, leaving the working tree and
+    index alone; with --worktree each branch is additionally checked out into
+    its own linked worktree, which then holds the spec. Stops at the first
+    failure and returns the features that were created.
+    """
+    if not branch_names:
+        return []
+
+    created = branch_names
+    if not is_git:
+        skipped = branch_names[0] if len(branch_names) == 1 else f"{len(branch_names)} features"
+        log_warn(f"Git repository not detected; skipped branch creation for {skipped}")
+    elif args.no_checkout or args.worktree:
+        if not create_branch_refs(branch_names):
+            created = []
     else:
-        # Fallback to original logic if no meaningful words found
-        cleaned = clean_branch_name(description)
-        parts = [p for p in cleaned.split('-') if p][:3]
-        return '-'.join(parts)
+        created = []
+        for branch_name in branch_names:
+            if not checkout_new_branch(branch_name):
+                break
+            created.append(branch_name)
+
+    results = []
+    worktree_base = get_worktree_base(repo_root, args.worktree_dir)
+    scaffolder = FeatureScaffolder(repo_root, link_static=args.link_static)
+    for branch_name, description in zip(created, descriptions):
+        feature_specs_dir = specs_dir
+        worktree = None
+        if is_git and args.worktree:
+            worktree = worktree_base / branch_name
+            if not add_worktree(worktree, branch_name):
+                break
+            feature_specs_dir = worktree / 'specs'
+        spec_file = create_spec_file(scaffolder, feature_specs_dir, branch_name, description, args.scaffold)
+        result = feature_result(branch_name, spec_file)
+        if worktree is not None:
+            result['WORKTREE'] = str(worktree)
+        results.append(result)
+    return results
+
+
+def run_batch(args, repo_root: Path, specs_dir: Path, is_git: bool):
+    """
+    Create every feature of a JSONL manifest in one process.
+
+    Git detection and the branch/spec scans run once, the numbers are
+    reserved as one consecutive range, and the results are printed as a
+    single JSON array.
+    """
+    try:
+        requests = load_feature_manifest(Path(args.batch))
+    except (OSError, ValueError) as e:
+        log_error(f"Cannot read feature manifest: {e}")
+        sys.exit(1)
+
+    suffixes = [branch_suffix_for(request) for request in requests]
+
+    allocator = FeatureNumberAllocator(repo_root)
+    if is_git:
+        highest = get_highest_in_use(specs_dir, args.fetch_mode)
+    else:
+        highest = get_highest_from_specs(specs_dir)
+    start = allocator.reserve_range(highest, suffixes)
+    branch_names = [make_branch_name(f"{start + i:03d}", suffix) for i, suffix in enumerate(suffixes)]
+
+    results = create_features(args, repo_root, specs_dir, is_git, branch_names,
+                              [request.description for request in requests])
+
+    for number in range(start + len(results), start + len(branch_names)):
+        allocator.release(number)
+
+    if args.json_mode:
+        print(json.dumps(results))
+    else:
+        for result in results:
+            print(f"{result['BRANCH_NAME']}: {result['SPEC_FILE']}")
+
+    if len(results) < len(branch_names):
+        sys.exit(1)
 
 
 def main():
@@ -149,6 +387,13 @@ def main():
 Examples:
   python create-new-feature.py 'Add user authentication system' --short-name 'user-auth'
   python create-new-feature.py 'Implement OAuth2 integration for API' --number 5
+  python create-new-feature.py 'Add billing export' --fetch   # fetch remotes before numbering
+  python create-new-feature.py 'Add audit log' --no-checkout   # create the branch, stay on HEAD
+  python create-new-feature.py 'Add audit log' --worktree      # ... and check it out in a new worktree
+  python create-new-feature.py --batch features.jsonl --no-checkout --scaffold --json
+
+Batch manifest (JSONL, one feature per line):
+  {"description": "Add user authentication", "short_name": "user-auth"}
 '''
     )
     parser.add_argument('--json', '-j', action='store_true', dest='json_mode',
@@ -157,13 +402,38 @@ Examples:
                         help='Provide a custom short name (2-4 words) for the branch')
     parser.add_argument('--number', '-n', dest='branch_number', type=int, default=0,
                         help='Specify branch number manually (overrides auto-detection)')
+    parser.add_argument('--batch', '-b', metavar='MANIFEST', default='',
+                        help='Create every feature listed in a JSONL manifest')
+    parser.add_argument('--no-checkout', dest='no_checkout', action='store_true',
+                        help='Create the branch at HEAD with git update-ref instead of checking it out '
+                             '(with --batch, all branches in one transaction)')
+    parser.add_argument('--scaffold', action='store_true',
+                        help='Also render the plan, tasks and checklist templates (and templates/scaffold/*)')
+    parser.add_argument('--link-static', dest='link_static', action='store_true',
+                        help='With --scaffold, hard-link files that do not depend on the feature '
+                             'to a shared read-only copy')
+    parser.add_argument('--worktree', '-w', action='store_true',
+                        help='Create the branch without switching and check it out into a new '
+                             'git worktree holding the spec (implies --no-checkout)')
+    parser.add_argument('--worktree-dir', dest='worktree_dir', metavar='DIR', default='',
+                        help='Parent directory of the worktrees (default: <repo>.worktrees next to the repo)')
+    fetch_group = parser.add_mutually_exclusive_group()
+    fetch_group.add_argument('--fetch', dest='fetch_mode', action='store_const', const=FETCH_ALWAYS,
+                             default=FETCH_AUTO,
+                             help='Fetch all remotes before numbering (default: use cached remote refs, '
+                                  'refreshing them in the background when stale)')
+    fetch_group.add_argument('--no-fetch', dest='fetch_mode', action='store_const', const=FETCH_NEVER,
+                             help='Never fetch; number from local and cached remote refs only')
     parser.add_argument('feature_description', nargs='*',
                         help='Feature description')
 
     args = parser.parse_args()
 
     feature_description = ' '.join(args.feature_description)
-    if not feature_description:
+    if args.batch:
+        if feature_description or args.short_name or args.branch_number:
+            parser.error('--batch cannot be combined with a description, --short-name or --number')
+    elif not feature_description:
         parser.print_usage()
         sys.exit(1)
 
@@ -176,78 +446,48 @@ Examples:
     specs_dir = repo_root / 'specs'
     specs_dir.mkdir(parents=True, exist_ok=True)
 
+    if args.batch:
+        run_batch(args, repo_root, specs_dir, is_git)
+        return
+
     # Generate branch name
-    if args.short_name:
-        branch_suffix = clean_branch_name(args.short_name)
-    else:
-        branch_suffix = generate_branch_name(feature_description)
+    branch_suffix = branch_suffix_for(FeatureRequest(feature_description, args.short_name))
 
     # Determine branch number
+    allocator = FeatureNumberAllocator(repo_root)
     if args.branch_number:
         branch_number = args.branch_number
     else:
         if is_git:
-            branch_number = check_existing_branches(specs_dir)
+            branch_number = check_existing_branches(specs_dir, allocator, args.fetch_mode, branch_suffix)
         else:
             highest = get_highest_from_specs(specs_dir)
-            branch_number = highest + 1
+            branch_number = allocator.reserve(highest, branch_suffix)
 
     feature_num = f"{branch_number:03d}"
-    branch_name = f"{feature_num}-{branch_suffix}"
-
-    # GitHub enforces a 244-byte limit on branch names
-    MAX_BRANCH_LENGTH = 244
-    if len(branch_name) > MAX_BRANCH_LENGTH:
-        # Truncate suffix
-        max_suffix_length = MAX_BRANCH_LENGTH - 4  # 3 for number + 1 for hyphen
-        truncated_suffix = branch_suffix[:max_suffix_length].rstrip('-')
-        original_branch_name = branch_name
-        branch_name = f"{feature_num}-{truncated_suffix}"
+    branch_name = make_branch_name(feature_num, branch_suffix)
 
-        log_warn(f"Branch name exceeded GitHub's 244-byte limit")
-        log_warn(f"Original: {original_branch_name} ({len(original_branch_name)} bytes)")
-        log_warn(f"Truncated to: {branch_name} ({len(branch_name)} bytes)")
-
-    # Create git branch if in git repo
-    if is_git:
-        try:
-            subprocess.run(
-                ['git', 'checkout', '-b', branch_name],
-                check=True
-            )
-        except subprocess.CalledProcessError as e:
-            print(f"Error creating branch: {e}", file=sys.stderr)
-            sys.exit(1)
-    else:
-        log_warn(f"Git repository not detected; skipped branch creation for {branch_name}")
-
-    # Create feature directory
-    feature_dir = specs_dir / branch_name
-    feature_dir.mkdir(parents=True, exist_ok=True)
-
-    # Copy spec template
-    template = repo_root / '.specify' / 'templates' / 'spec-template.md'
-    spec_file = feature_dir / 'spec.md'
-    if template.is_file():
-        shutil.copy2(template, spec_file)
-    else:
-        spec_file.touch()
+    # Create the git branch (if in a git repo) and the feature directory with the spec
+    results = create_features(args, repo_root, specs_dir, is_git, [branch_name], [feature_description])
+    if not results:
+        if not args.branch_number:
+            allocator.release(branch_number)
+        sys.exit(1)
+    result = results[0]
+    spec_file = result['SPEC_FILE']
 
     # Set the SPECIFY_FEATURE environment variable
     os.environ['SPECIFY_FEATURE'] = branch_name
 
     # Output results
     if args.json_mode:
-        result = {
-            'BRANCH_NAME': branch_name,
-            'SPEC_FILE': str(spec_file),
-            'FEATURE_NUM': feature_num
-        }
         print(json.dumps(result))
     else:
         print(f"BRANCH_NAME: {branch_name}")
         print(f"SPEC_FILE: {spec_file}")
         print(f"FEATURE_NUM: {feature_num}")
+        if 'WORKTREE' in result:
+            print(f"WORKTREE: {result['WORKTREE']}")
         print(f"SPECIFY_FEATURE environment variable set to: {branch_name}")
 
 
@@ -10,19 +10,13 @@ The directory follows the naming convention: ###-short-name
 import argparse
 import json
 import os
-import re
 import sys
 from pathlib import Path
+from typing import Optional
 
-
-# Stop words to filter out from auto-generated names
-STOP_WORDS = {
-    'i', 'a', 'an', 'the', 'to', 'for', 'of', 'in', 'on', 'at', 'by', 'with',
-    'from', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has',
-    'had', 'do', 'does', 'did', 'will', 'would', 'should', 'could', 'can',
-    'may', 'might', 'must', 'shall', 'this', 'that', 'these', 'those', 'my',
-    'your', 'our', 'their', 'want', 'need', 'add', 'get', 'set', 'make', 'use'
-}
+from common import FEATURE_PREFIX_RE, clean_short_name, generate_short_name, load_feature_manifest
+from feature_numbers import FeatureNumberAllocator
+from scaffold import FeatureScaffolder
 
 
 def get_repo_root() -> Path:
@@ -35,51 +29,83 @@ def get_repo_root() -> Path:
     return cwd
 
 
-def get_next_feature_number(specs_dir: Path) -> int:
-    """Get next available feature number from specs directory."""
+def get_highest_feature_number(specs_dir: Path) -> int:
+    """Get highest feature number from specs directory."""
     highest = 0
     if specs_dir.is_dir():
         for item in specs_dir.iterdir():
             if item.is_dir():
-                match = re.match(r'^(\d+)', item.name)
+                match = FEATURE_PREFIX_RE.match(item.name)
                 if match:
                     number = int(match.group(1))
                     if number > highest:
                         highest = number
-    return highest + 1
+    return highest
+
+
+def create_feature_dir(specs_dir: Path, feature_name: str,
+                       scaffolder: Optional[FeatureScaffolder] = None, description: str = "") -> Path:
+    """
+    Create the feature directory with its files and subdirectories.
+
+    Files are empty unless a scaffolder is given, which renders the spec,
+    plan, tasks and checklist templates first.
+    """
+    feature_dir = specs_dir / feature_name
 
+    # Create directory structure
+    feature_dir.mkdir(parents=True, exist_ok=True)
 
-def clean_name(name: str) -> str:
-    """Clean and format a name to kebab-case."""
-    name = name.lower()
-    name = re.sub(r'[^a-z0-9]', '-', name)
-    name = re.sub(r'-+', '-', name)
-    return name.strip('-')
+    if scaffolder is not None:
+        scaffolder.scaffold(feature_dir, feature_name, description, overwrite=False)
 
+    # Create the remaining files empty
+    (feature_dir / 'spec.md').touch(exist_ok=True)
+    (feature_dir / 'plan.md').touch(exist_ok=True)
+    (feature_dir / 'research.md').touch(exist_ok=True)
 
-def generate_short_name(description: str) -> str:
-    """Generate short name from description, filtering stop words."""
-    clean_desc = re.sub(r'[^a-z0-9]', ' ', description.lower())
-    words = clean_desc.split()
+    # Create subdirectories
+    (feature_dir / 'contracts').mkdir(exist_ok=True)
+    (feature_dir / 'checklists').mkdir(exist_ok=True)
+    return feature_dir
+
+
+def feature_result(feature_dir: Path, feature_num: int) -> dict:
+    """JSON output record of one created feature."""
+    return {
+        'FEATURE_NAME': feature_dir.name,
+        'FEATURE_DIR': str(feature_dir),
+        'SPEC_FILE': str(feature_dir / 'spec.md'),
+        'PLAN_FILE': str(feature_dir / 'plan.md'),
+        'FEATURE_NUM': f"{feature_num:03d}"
+    }
+
+
+def run_batch(args, repo_root: Path, specs_dir: Path):
+    """Create every feature of a JSONL manifest, numbered as one consecutive range."""
+    try:
+        requests = load_feature_manifest(Path(args.batch))
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot read feature manifest: {e}", file=sys.stderr)
+        sys.exit(1)
 
-    meaningful_words = []
-    for word in words:
-        if not word:
-            continue
-        if word not in STOP_WORDS:
-            if len(word) >= 3:
-                meaningful_words.append(word)
-            elif word.upper() in description:
-                # Keep short words if uppercase in original (acronyms)
-                meaningful_words.append(word)
+    short_names = [clean_short_name(r.short_name) if r.short_name else generate_short_name(r.description)
+                   for r in requests]
+    allocator = FeatureNumberAllocator(repo_root)
+    start = allocator.reserve_range(get_highest_feature_number(specs_dir), short_names)
+    scaffolder = FeatureScaffolder(repo_root, link_static=args.link_static) if args.scaffold else None
 
-    if meaningful_words:
-        return '-'.join(meaningful_words[:3])
+    results = []
+    for offset, (short_name, request) in enumerate(zip(short_names, requests)):
+        feature_dir = create_feature_dir(specs_dir, f"{start + offset:03d}-{short_name}",
+                                         scaffolder, request.description)
+        results.append(feature_result(feature_dir, start + offset))
 
-    # Fallback
-    cleaned = clean_name(description)
-    parts = [p for p in cleaned.split('-') if p][:3]
-    return '-'.join(parts)
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False))
+    else:
+        for result in results:
+            print(f"Feature directory: {Path(result['FEATURE_DIR']).relative_to(repo_root)}")
 
 
 def main():
@@ -91,6 +117,11 @@ Examples:
   python create-simple-feature.py 'Add user authentication'
   python create-simple-feature.py 'OAuth2 integration' --short-name oauth2
   python create-simple-feature.py 'Payment fix' --number 5
+  python create-simple-feature.py 'Export reports' --scaffold
+  python create-simple-feature.py --batch features.jsonl --json
+
+Batch manifest (JSONL, one feature per line):
+  {"description": "Add user authentication", "short_name": "user-auth"}
 '''
     )
     parser.add_argument('--json', '-j', action='store_true',
@@ -99,12 +130,22 @@ Examples:
                         help='Custom short name (default: auto-generate)')
     parser.add_argument('--number', '-n', type=int, default=0,
                         help='Feature number (default: auto-increment)')
+    parser.add_argument('--scaffold', action='store_true',
+                        help='Render the spec, plan, tasks and checklist templates instead of empty files')
+    parser.add_argument('--link-static', dest='link_static', action='store_true',
+                        help='With --scaffold, hard-link files that do not depend on the feature '
+                             'to a shared read-only copy')
+    parser.add_argument('--batch', '-b', metavar='MANIFEST', default='',
+                        help='Create every feature listed in a JSONL manifest')
     parser.add_argument('description', nargs='*',
                         help='Feature description')
     args = parser.parse_args()
 
     description = ' '.join(args.description)
-    if not description:
+    if args.batch:
+        if description or args.short_name or args.number:
+            parser.error('--batch cannot be combined with a description, --short-name or --number')
+    elif not description:
         parser.print_usage()
         print("Error: feature description required", file=sys.stderr)
         sys.exit(1)
@@ -113,37 +154,28 @@ Examples:
     specs_dir = repo_root / 'specs'
     specs_dir.mkdir(parents=True, exist_ok=True)
 
+    if args.batch:
+        run_batch(args, repo_root, specs_dir)
+        return
+
     # Generate feature name
-    short_name = clean_name(args.short_name) if args.short_name else generate_short_name(description)
-    feature_num = args.number if args.number else get_next_feature_number(specs_dir)
+    short_name = clean_short_name(args.short_name) if args.short_name else generate_short_name(description)
+    if args.number:
+        feature_num = args.number
+    else:
+        # Reserve the number, so concurrent creators never share one
+        allocator = FeatureNumberAllocator(repo_root)
+        feature_num = allocator.reserve(get_highest_feature_number(specs_dir), short_name)
     feature_name = f"{feature_num:03d}-{short_name}"
-    feature_dir = specs_dir / feature_name
-
-    # Create directory structure
-    feature_dir.mkdir(parents=True, exist_ok=True)
-
-    # Create empty files
-    (feature_dir / 'spec.md').touch(exist_ok=True)
-    (feature_dir / 'plan.md').touch(exist_ok=True)
-    (feature_dir / 'research.md').touch(exist_ok=True)
-
-    # Create subdirectories
-    (feature_dir / 'contracts').mkdir(exist_ok=True)
-    (feature_dir / 'checklists').mkdir(exist_ok=True)
+    scaffolder = FeatureScaffolder(repo_root, link_static=args.link_static) if args.scaffold else None
+    feature_dir = create_feature_dir(specs_dir, feature_name, scaffolder, description)
 
     # Set environment variable for downstream use
     os.environ['SPECIFY_FEATURE'] = feature_name
 
     # Output
     if args.json:
-        result = {
-            'FEATURE_NAME': feature_name,
-            'FEATURE_DIR': str(feature_dir),
-            'SPEC_FILE': str(feature_dir / 'spec.md'),
-            'PLAN_FILE': str(feature_dir / 'plan.md'),
-            'FEATURE_NUM': f"{feature_num:03d}"
-        }
-        print(json.dumps(result, ensure_ascii=False))
+        print(json.dumps(feature_result(feature_dir, feature_num), ensure_ascii=False))
     else:
         print(f"Feature directory: {feature_dir.relative_to(repo_root)}")
         print(f"  spec.md     : {feature_dir / 'spec.md'}")
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Concurrency-safe allocation of feature numbers
+
+Feature creators used to take "highest existing number + 1" and then create
+the directory with exist_ok=True, so two creators running at the same time
+(several agents, parallel CI jobs) could both pick the same number.
+
+A number is now reserved by creating .specify/.cache/feature-numbers/NNN with
+O_CREAT | O_EXCL, which succeeds in exactly one process. The reservation file
+records the owner (pid, host, time). A counter file next to it remembers the
+highest number handed out, so the next allocation starts right above it
+instead of probing every reserved number. The counter is only a hint: if it is
+lost or lags behind, the exclusive create still rejects taken numbers.
+
+A reservation is removed on a later allocation once a spec directory or
+branch with the same or a higher number exists: every allocation starts above
+that floor, so the number can never be handed out again. Reservations left
+by creators that died are never reused either; the gap is harmless, and the
+file goes away once a newer feature exists. The counter is not trusted for
+this, since racing writers can move it backwards.
+
+Usage: python feature_numbers.py [--json]
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from common import (
+    get_highest_archived_number,
+    get_repo_root,
+    log_info,
+)
+
+
+# Materialized reservations are kept this long, so a creator that computed its
+# floor before the feature directory appeared still sees the number as taken
+RESERVATION_GRACE = 10 * 60
+
+_COUNTER_NAME = "next"
+
+
+class FeatureNumberAllocator:
+    """Reserves feature numbers with exclusive-create reservation files."""
+
+    def __init__(self, repo_root: Path):
+        self.repo_root = repo_root
+        self.dir = repo_root / ".specify" / ".cache" / "feature-numbers"
+        self.counter_path = self.dir / _COUNTER_NAME
+        self.host = socket.gethostname()
+
+    # ── counter ──
+
+    def _read_counter(self) -> int:
+        try:
+            return int(self.counter_path.read_text(encoding='utf-8').strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_counter(self, number: int):
+        # Racing writers may briefly move the hint backwards; O_EXCL keeps
+        # allocation correct regardless, the hint only saves probes
+        if number <= self._read_counter():
+            return
+        temp_path = self.dir / f".{_COUNTER_NAME}.{os.getpid()}.tmp"
+        try:
+            temp_path.write_text(f"{number}\n", encoding='utf-8')
+            os.replace(temp_path, self.counter_path)
+        except OSError:
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+
+    # ── reservations ──
+
+    def _reservation_path(self, number: int) -> Path:
+        return self.dir / f"{number:03d}"
+
+    def _try_reserve(self, number: int, label: str) -> bool:
+        try:
+            fd = os.open(self._reservation_path(number), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            return False
+        try:
+            record = {"pid": os.getpid(), "host": self.host, "time": time.time(), "name": label}
+            os.write(fd, json.dumps(record, ensure_ascii=False).encode('utf-8'))
+        finally:
+            os.close(fd)
+        return True
+
+    def _read_reservation(self, path: Path) -> Dict:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+            if isinstance(record, dict):
+                return record
+        except (OSError, ValueError):
+            pass
+        # Unreadable or half-written: judge by the file age alone
+        try:
+            return {"time": path.stat().st_mtime}
+        except OSError:
+            return {}
+
+    def reservations(self) -> List[Dict]:
+        """Current reservation records, lowest number first."""
+        records = []
+        try:
+            names = sorted(os.listdir(self.dir), key=lambda n: (len(n), n))
+        except OSError:
+            return records
+        for name in names:
+            if name.isdigit():
+                record = self._read_reservation(self.dir / name)
+                record["number"] = int(name)
+                records.append(record)
+        return records
+
+    def prune(self, floor: int):
+        """
+        Remove reservations that are no longer needed.
+
+        floor is the highest number already used by a spec directory or
+        branch. Reservations at or below it are done once the grace period
+        has passed. Nothing above it is removed, whether its owner is still
+        running or not: only the floor guarantees the number is not handed
+        out again.
+        """
+        now = time.time()
+        try:
+            names = os.listdir(self.dir)
+        except OSError:
+            return
+        for name in names:
+            if not name.isdigit() or int(name) > floor:
+                continue
+            path = self.dir / name
+            record = self._read_reservation(path)
+            if now - float(record.get("time", now)) > RESERVATION_GRACE:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    # ── public API ──
+
+    def reserve(self, floor: int, label: str = "") -> int:
+        """
+        Reserve and return the next free number above floor.
+
+        floor is the highest number the caller found in use (spec
+        directories, branches). The search starts above both floor and the
+        counter, so it normally succeeds on the first exclusive create.
+        """
+        floor = self._floor(floor)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.prune(floor)
+
+        number = max(floor, self._read_counter()) + 1
+        while not self._try_reserve(number, label):
+            number += 1
+        self._write_counter(number)
+        return number
+
+    def reserve_range(self, floor: int, labels: List[str]) -> int:
+        """
+        Reserve len(labels) consecutive numbers above floor; returns the first.
+
+        If another creator holds a number inside the candidate range, the
+        part already reserved is released and the search restarts above it.
+        """
+        if not labels:
+            return self.peek(floor)
+        floor = self._floor(floor)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.prune(floor)
+
+        start = max(floor, self._read_counter()) + 1
+        while True:
+            taken: List[int] = []
+            for offset, label in enumerate(labels):
+                if not self._try_reserve(start + offset, label):
+                    break
+                taken.append(start + offset)
+            if len(taken) == len(labels):
+                self._write_counter(taken[-1])
+                return start
+            for number in taken:
+                self.release(number)
+            start += len(taken) + 1
+
+    def release(self, number: int):
+        """Drop a reservation whose feature could not be created."""
+        try:
+            self._reservation_path(number).unlink()
+        except OSError:
+            pass
+
+    def peek(self, floor: int = 0) -> int:
+        """Number the next reserve() would try first, without reserving it."""
+        return max(self._floor(floor), self._read_counter()) + 1
+
+    def _floor(self, floor: int) -> int:
+        # Archived features are gone from specs/ but keep their numbers
+        return max(floor, get_highest_archived_number(self.repo_root / "specs"))
+
+
+# ═══════════════════════════════════════════════════════════════
+# Main Execution
+# ═══════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description='Show feature number reservations')
+    parser.add_argument('--json', action='store_true', help='Output in JSON format')
+    args = parser.parse_args()
+
+    allocator = FeatureNumberAllocator(get_repo_root())
+    records = allocator.reservations()
+
+    if args.json:
+        print(json.dumps({"next": allocator.peek(), "reservations": records}, ensure_ascii=False))
+        return
+
+    log_info(f"Next number hint: {allocator.peek():03d}")
+    if not records:
+        log_info("No reservations")
+        return
+    for record in records:
+        when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(float(record.get("time", 0))))
+        print(f"{record['number']:03d}  {when}  pid {record.get('pid', '?')}@{record.get('host', '?')}  "
+              f"{record.get('name', '')}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
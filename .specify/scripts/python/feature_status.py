@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Workflow status of every feature directory
+
+For each specs/<feature>/ the index records which workflow artifacts exist
+(spec, plan, tasks, research, data-model, quickstart, contracts) and how many
+tasks are checked, and derives the workflow stage from that. It backs
+`check-prerequisites.py --all`.
+
+The index is kept in .specify/.cache/feature-status.json and refreshed
+incrementally. A feature directory is only listed again when its mtime
+changed (files added, removed or renamed); the contracts/ directory is
+checked the same way. Files that have a template (spec.md, plan.md,
+tasks.md and scaffold extras) are only re-read when their size or mtime
+changed. An unchanged feature therefore costs a few stat calls, and a changed
+one a single scandir. Large trees are scanned in a thread pool.
+
+A file that is still template output (see scaffold.is_template_stub), such as
+the ones `create-new-feature.py --scaffold` writes, counts as missing, and
+the sample tasks of a stub tasks.md are not counted. The index records the
+templates it was built against and is rebuilt when they change.
+
+Usage: python feature_status.py [--rebuild] [--json] [--workers N]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern
+
+from common import (
+    count_task_boxes,
+    feature_sort_key,
+    get_repo_root,
+    log_info,
+)
+from scaffold import FeatureScaffolder, is_template_stub
+
+
+INDEX_VERSION = 2
+
+# Workflow artifacts in the order the workflow produces them; contracts/ counts
+# as present only when it has at least one entry
+ARTIFACTS = ('spec.md', 'plan.md', 'tasks.md', 'research.md', 'data-model.md', 'quickstart.md', 'contracts/')
+
+_ARTIFACT_FILES = frozenset(name for name in ARTIFACTS if not name.endswith('/'))
+
+# Stage of a feature and the command that moves it forward
+STAGE_COMMANDS: Dict[str, str] = {
+    "new": "/speckit.specify",
+    "specified": "/speckit.plan",
+    "planned": "/speckit.tasks",
+    "tasked": "/speckit.implement",
+    "implementing": "/speckit.implement",
+    "completed": "",
+}
+
+# Feature directories scanned in a thread pool once there are at least this many
+PARALLEL_SCAN_THRESHOLD = 64
+
+MAX_SCAN_WORKERS = 8
+
+
+def get_status_index_path(repo_root: Path) -> Path:
+    """Location of the index file."""
+    return repo_root / ".specify" / ".cache" / "feature-status.json"
+
+
+def feature_stage(available: List[str], done: int, total: int) -> str:
+    """Workflow stage from the available artifacts and the checked/total task counts."""
+    if 'spec.md' not in available:
+        return "new"
+    if 'plan.md' not in available:
+        return "specified"
+    if 'tasks.md' not in available:
+        return "planned"
+    if total == 0 or done == 0:
+        return "tasked"
+    return "completed" if done == total else "implementing"
+
+
+def _stub_signature(stubs: Dict[str, Pattern[str]]) -> str:
+    """Digest of the stub patterns; the index is only valid for the templates it was built with."""
+    digest = hashlib.sha256()
+    for target in sorted(stubs):
+        digest.update(f"{target}\0{stubs[target].pattern}\0".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _scan_feature(path: str, record: Optional[Dict], stubs: Dict[str, Pattern[str]]) -> Optional[Dict]:
+    """
+    Return the up-to-date record of a feature directory.
+
+    stubs are the stub patterns of the artifacts that have a template.
+    Returns the given record object itself when nothing changed, and None if
+    the directory is gone.
+    """
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+    new = dict(record) if record else {}
+    if new.get("mtime_ns") != mtime_ns:
+        # Entries were added, removed or renamed: list the directory once
+        files: List[str] = []
+        contracts_dir = False
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name in _ARTIFACT_FILES and entry.is_file():
+                        files.append(entry.name)
+                    elif entry.name == 'contracts' and entry.is_dir():
+                        contracts_dir = True
+        except OSError:
+            return None
+        new.update(mtime_ns=mtime_ns, files=sorted(files), contracts_dir=contracts_dir)
+
+    contracts_mtime_ns = None
+    if new["contracts_dir"]:
+        contracts = os.path.join(path, 'contracts')
+        try:
+            contracts_mtime_ns = os.stat(contracts).st_mtime_ns
+        except OSError:
+            pass
+        if contracts_mtime_ns is not None and contracts_mtime_ns != new.get("contracts_mtime_ns"):
+            try:
+                with os.scandir(contracts) as entries:
+                    new["contracts"] = next(entries, None) is not None
+            except OSError:
+                contracts_mtime_ns = None
+    new["contracts_mtime_ns"] = contracts_mtime_ns
+    if contracts_mtime_ns is None:
+        new["contracts"] = False
+
+    # Content checks: stub detection for templated files, task counts for tasks.md
+    checked: Dict[str, Dict] = {}
+    for name in new["files"]:
+        if name not in stubs and name != 'tasks.md':
+            continue
+        file_path = os.path.join(path, name)
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        entry = (new.get("checked") or {}).get(name)
+        if not entry or entry.get("mtime_ns") != st.st_mtime_ns or entry.get("size") != st.st_size:
+            try:
+                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                    text = f.read()
+            except OSError:
+                text = ""
+            entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "stub": is_template_stub(text, stubs.get(name))}
+            if name == 'tasks.md':
+                entry["done"], entry["total"] = (0, 0) if entry["stub"] else count_task_boxes(text)
+        checked[name] = entry
+    new["checked"] = checked
+
+    return record if new == record else new
+
+
+# ═══════════════════════════════════════════════════════════════
+# Index
+# ═══════════════════════════════════════════════════════════════
+
+class FeatureStatusIndex:
+    """Artifact and task records of every feature directory, keyed by feature directory name."""
+
+    def __init__(self, repo_root: Path, features: Optional[Dict[str, Dict]] = None, templates: str = ""):
+        self.repo_root = repo_root
+        self.path = get_status_index_path(repo_root)
+        self.features: Dict[str, Dict] = features or {}
+        self.templates = templates
+        self.rescanned = 0
+        self.changed = False
+
+    @classmethod
+    def load(cls, repo_root: Path) -> "FeatureStatusIndex":
+        """Load the index file; a missing, corrupt or outdated file gives an empty index."""
+        path = get_status_index_path(repo_root)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and isinstance(data.get("features"), dict):
+                return cls(repo_root, data["features"], str(data.get("templates", "")))
+        except (OSError, ValueError, AttributeError):
+            pass
+        return cls(repo_root)
+
+    def refresh(self, workers: Optional[int] = None) -> bool:
+        """
+        Bring the index up to date with specs/*/.
+
+        Feature directories are checked in a thread pool (default: CPU
+        count, at most MAX_SCAN_WORKERS) once there are
+        PARALLEL_SCAN_THRESHOLD of them; the stat and scandir calls release
+        the GIL, which pays off on slow or network file systems. workers=1
+        checks them in this thread.
+
+        Returns True if any record was added, changed or removed.
+        """
+        stubs = FeatureScaffolder(self.repo_root).stub_patterns()
+        templates = _stub_signature(stubs)
+        if templates != self.templates:
+            # Stub flags were computed against other templates
+            self.features = {}
+            self.templates = templates
+            self.changed = True
+
+        specs_dir = self.repo_root / "specs"
+        try:
+            with os.scandir(specs_dir) as entries:
+                # Dot directories (.archive) are not features
+                paths = {entry.name: entry.path for entry in entries
+                         if not entry.name.startswith('.') and entry.is_dir()}
+        except OSError:
+            paths = {}
+
+        names = list(paths)
+        scan = lambda chunk: [_scan_feature(paths[name], self.features.get(name), stubs) for name in chunk]
+        workers = min(workers or os.cpu_count() or 1, MAX_SCAN_WORKERS)
+        if len(names) >= PARALLEL_SCAN_THRESHOLD and workers > 1:
+            # One contiguous chunk per thread; a future per feature costs more than its stat calls
+            size = -(-len(names) // workers)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                chunks = executor.map(scan, [names[i:i + size] for i in range(0, len(names), size)])
+                results = [record for chunk in chunks for record in chunk]
+        else:
+            results = scan(names)
+
+        features: Dict[str, Dict] = {}
+        for name, record in zip(names, results):
+            if record is None:
+                continue
+            if record is not self.features.get(name):
+                self.rescanned += 1
+                self.changed = True
+            features[name] = record
+        if len(features) != len(self.features):
+            self.changed = True
+        self.features = features
+        return self.changed
+
+    def save(self) -> bool:
+        """Write the index atomically if it changed; returns True if written."""
+        if not self.changed and self.path.is_file():
+            return False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": INDEX_VERSION, "templates": self.templates, "features": self.features}
+
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".feature-status.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        self.changed = False
+        return True
+
+    def records(self) -> List[Dict]:
+        """Status of every feature in feature-number order."""
+        records = []
+        for name in sorted(self.features, key=feature_sort_key):
+            record = self.features[name]
+            checked = record.get("checked") or {}
+            present = {artifact for artifact in record["files"] if not checked.get(artifact, {}).get("stub")}
+            if record.get("contracts"):
+                present.add('contracts/')
+            available = [artifact for artifact in ARTIFACTS if artifact in present]
+            tasks = checked.get('tasks.md') or {}
+            done, total = tasks.get("done", 0), tasks.get("total", 0)
+            stage = feature_stage(available, done, total)
+            records.append({
+                "feature": name,
+                "stage": stage,
+                "next": STAGE_COMMANDS[stage],
+                "available": available,
+                "missing": [artifact for artifact in ARTIFACTS if artifact not in present],
+                "tasks": {"done": done, "total": total},
+            })
+        return records
+
+
+def load_feature_status(repo_root: Path, workers: Optional[int] = None) -> FeatureStatusIndex:
+    """Load, refresh and persist the status index of a repository."""
+    index = FeatureStatusIndex.load(repo_root)
+    index.refresh(workers)
+    try:
+        index.save()
+    except OSError:
+        # The index is a cache; a read-only checkout still gets the refreshed data
+        pass
+    return index
+
+
+def format_status_table(records: List[Dict]) -> List[str]:
+    """Table lines: feature, stage, task progress and missing artifacts."""
+    width = max([len(record["feature"]) for record in records] + [len("FEATURE")])
+    lines = [f"{'FEATURE':<{width}}  {'STAGE':<12}  {'TASKS':>9}  MISSING"]
+    for record in records:
+        tasks = record["tasks"]
+        progress = f"{tasks['done']}/{tasks['total']}" if tasks["total"] else "-"
+        lines.append(f"{record['feature']:<{width}}  {record['stage']:<12}  {progress:>9}  "
+                     f"{', '.join(record['missing']) or '-'}")
+    return lines
+
+
+# ═══════════════════════════════════════════════════════════════
+# Main Execution
+# ═══════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the workflow status of every feature directory')
+    parser.add_argument('--rebuild', action='store_true', help='Discard the index and rescan every feature')
+    parser.add_argument('--json', action='store_true', help='Output in JSON format')
+    parser.add_argument('--workers', type=int, default=None,
+                        help=f'Threads used to scan features (default: CPU count, at most {MAX_SCAN_WORKERS}; 1 disables the pool)')
+    args = parser.parse_args()
+
+    repo_root = get_repo_root()
+    if args.rebuild:
+        index = FeatureStatusIndex(repo_root)
+        index.refresh(args.workers)
+        index.save()
+    else:
+        index = load_feature_status(repo_root, args.workers)
+    records = index.records()
+
+    if args.json:
+        print(json.dumps(records, ensure_ascii=False))
+        return
+    if not records:
+        log_info("No feature directories found")
+        return
+    for line in format_status_table(records):
+        print(line)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
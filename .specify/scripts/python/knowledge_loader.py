@@ -0,0 +1,984 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+═══════════════════════════════════════════════════════════════
+SpecKit 知识库加载库
+load-knowledge.py 的可导入核心：配置加载、路径索引、文档解析与监视
+═══════════════════════════════════════════════════════════════
+
+本模块中的函数不向 stdout 输出任何内容，结果以字典返回，
+渲染（文本/JSON）由 load-knowledge.py 或调用方负责。
+
+进程内使用示例（替代以子进程运行 load-knowledge.py --json）：
+
+    from knowledge_loader import KnowledgeLoader
+
+    loader = KnowledgeLoader(repo_root)
+    ok, result = loader.load('implement')
+    ok, result = loader.load('checklist', 'security')
+
+KnowledgeLoader 在多次调用间保留配置视图和路径索引缓存，并且可以被多个线程
+同时调用，一个长驻的编排进程即可服务多个并发的 agent 会话。
+"""
+
+import fnmatch
+import glob
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from common import (
+    log_info,
+    log_warn,
+    log_error,
+)
+from yaml_lite import YamlSubsetError, load_yaml_file
+
+
+# ═══════════════════════════════════════════════════════════════
+# 配置加载
+# ═══════════════════════════════════════════════════════════════
+
+def deep_merge(base: Dict, override: Dict) -> Dict:
+    """深度合并两个字典，override 覆盖 base 的值"""
+    result = base.copy()
+    for key, value in override.items():
+        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
+            result[key] = deep_merge(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+def _report(messages: Optional[List[Tuple[str, str]]], level: str, message: str):
+    """输出诊断信息；传入 messages 列表时只收集不打印（库调用无副作用）"""
+    if messages is None:
+        {'info': log_info, 'warn': log_warn, 'error': log_error}[level](message)
+    else:
+        messages.append((level, message))
+
+
+def load_json_file(file_path: Path, messages: Optional[List[Tuple[str, str]]] = None) -> Dict[str, Any]:
+    """加载单个 JSON 文件"""
+    if not file_path.exists():
+        return {}
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except json.JSONDecodeError as e:
+        _report(messages, 'error', f"JSON 解析错误 {file_path}: {e}")
+        return {}
+
+
+def get_config_cache_dir(repo_root: Path) -> Path:
+    """编译后配置的缓存目录"""
+    return repo_root / ".specify" / ".cache"
+
+
+def resolve_config_file(json_path: Path) -> Path:
+    """同名 .yaml 配置存在时优先使用，否则使用 .json"""
+    yaml_path = json_path.with_suffix('.yaml')
+    if yaml_path.is_file():
+        return yaml_path
+    return json_path
+
+
+def load_config_file(
+    file_path: Path,
+    cache_dir: Optional[Path] = None,
+    messages: Optional[List[Tuple[str, str]]] = None
+) -> Dict[str, Any]:
+    """加载单个配置文件（JSON 或 YAML 子集）"""
+    if file_path.suffix not in ('.yaml', '.yml'):
+        return load_json_file(file_path, messages)
+    if not file_path.exists():
+        return {}
+    try:
+        data = load_yaml_file(file_path, cache_dir)
+    except (YamlSubsetError, UnicodeDecodeError) as e:
+        _report(messages, 'error', f"YAML 解析错误 {file_path}: {e}")
+        return {}
+    if not isinstance(data, dict):
+        _report(messages, 'error', f"YAML 配置顶层必须是映射 {file_path}")
+        return {}
+    return data
+
+
+def get_config_paths(repo_root: Path) -> Dict[str, Path]:
+    """各级配置文件路径（.json 形式，同名 .yaml 由 resolve_config_file 处理）"""
+    return {
+        # 1. L0 基础配置 - 企业级标准配置
+        'L0': repo_root / ".knowledge" / "upstream" / "L0-enterprise" / "speckit-config" / "knowledge-config.json",
+        # 2. L1 项目扩展 - 项目级覆盖
+        'L1': repo_root / ".knowledge" / "upstream" / "L1-project" / "speckit-config" / "local-override.json",
+        # 3. 本地覆盖 - 临时调试用
+        'local': repo_root / ".specify" / "local-override.json",
+        # 4. 遗留配置 - 向后兼容
+        'legacy': repo_root / ".specify" / "knowledge-config.json",
+    }
+
+
+def load_json_config(repo_root: Path, messages: Optional[List[Tuple[str, str]]] = None) -> Dict[str, Any]:
+    """
+    加载知识库 JSON 配置 - 三级加载
+
+    加载优先级：
+    1. L0 基础配置 (必须存在)
+    2. L1 项目扩展 (可选)
+    3. 本地覆盖 (可选)
+    4. 遗留配置 (向后兼容)
+
+    Args:
+        repo_root: 仓库根目录
+        messages: 传入列表时收集 (级别, 信息) 而不直接打印
+
+    Returns:
+        合并后的配置字典
+    """
+    config = {}
+    config_source = "unknown"
+    cache_dir = get_config_cache_dir(repo_root)
+
+    config_paths = get_config_paths(repo_root)
+    l0_config_path = resolve_config_file(config_paths['L0'])
+    l1_config_path = resolve_config_file(config_paths['L1'])
+    local_config_path = resolve_config_file(config_paths['local'])
+    legacy_config_path = resolve_config_file(config_paths['legacy'])
+
+    # 尝试加载 L0 配置
+    if l0_config_path.exists():
+        config = load_config_file(l0_config_path, cache_dir, messages)
+        config_source = "L0"
+        if not config:
+            _report(messages, 'error', f"L0 配置文件为空或解析失败: {l0_config_path}")
+            return {}
+    else:
+        # L0 不存在，尝试遗留配置
+        _report(messages, 'warn', "L0 配置不存在，尝试遗留配置")
+        if legacy_config_path.exists():
+            config = load_config_file(legacy_config_path, cache_dir, messages)
+            config_source = "legacy"
+            if not config:
+                _report(messages, 'error', "遗留配置文件为空或解析失败")
+                return {}
+        else:
+            _report(messages, 'error', f"知识库配置文件不存在: {l0_config_path} 或 {legacy_config_path}")
+            return {}
+
+    # 2. 加载 L1 扩展（可选）
+    if l1_config_path.exists():
+        l1_config = load_config_file(l1_config_path, cache_dir, messages)
+        if l1_config:
+            config = deep_merge(config, l1_config)
+            config_source += " + L1"
+
+    # 3. 加载本地覆盖（可选）
+    if local_config_path.exists():
+        local_config = load_config_file(local_config_path, cache_dir, messages)
+        if local_config:
+            config = deep_merge(config, local_config)
+            config_source += " + local"
+
+    # 调试信息
+    if os.environ.get('DEBUG_CONFIG'):
+        _report(messages, 'info', f"配置来源: {config_source}")
+
+    return config
+
+
+def estimate_tokens(file_path: Path) -> int:
+    """计算文件 Token 估算（粗略：1 Token ≈ 4 字符）"""
+    if file_path.is_file():
+        try:
+            chars = file_path.stat().st_size
+            return chars // 4
+        except OSError:
+            return 0
+    return 0
+
+
+# ═══════════════════════════════════════════════════════════════
+# 配置视图
+# ═══════════════════════════════════════════════════════════════
+
+# 知识库层级的默认路径（配置未指定 path 时使用）
+DEFAULT_LEVEL_PATHS = {
+    'L0': '.knowledge/upstream/L0-enterprise',
+    'L1': '.knowledge/upstream/L1-project',
+    'L2': '.knowledge',
+}
+
+_PHASE_KEY_RE = re.compile(r'^phase(\d+)_(.+)$')
+
+
+class KnowledgeConfig:
+    """
+    合并后配置的只读视图
+
+    构建时一次性预计算命令表、checklist 类型表、feature-dev 阶段表及其别名
+    （fd-<name> / feature-dev-phaseN），层级基础路径和命令解析结果按需缓存。
+    所有加载函数共享同一个实例，不再反复遍历原始字典。
+    实例构建后只读，缓存的填充是幂等的，可在多个线程间共享。
+    """
+
+    def __init__(
+        self,
+        repo_root: Path,
+        data: Dict[str, Any],
+        messages: Optional[List[Tuple[str, str]]] = None
+    ):
+        self.repo_root = repo_root
+        self.data = data
+        # 加载配置时产生的诊断信息 (级别, 信息)，由调用方决定是否输出
+        self.messages: List[Tuple[str, str]] = messages or []
+        self.sources: Dict[str, Dict[str, Any]] = data.get('knowledge_sources', {})
+        self.commands: Dict[str, Dict[str, Any]] = data.get('command_knowledge', {})
+
+        checklist_types = self.commands.get('checklist', {}).get('types', {})
+        self.checklist_types: Dict[str, Dict[str, Any]] = {
+            name: {
+                'description': type_config.get('description', f'{name} 检查清单'),
+                'documents': type_config.get('documents', []),
+            }
+            for name, type_config in checklist_types.items()
+        }
+
+        # feature-dev 阶段：phase1_discovery -> fd-discovery / feature-dev-phase1
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.phase_short_names: Dict[str, str] = {}
+        self.aliases: Dict[str, str] = {}
+        for phase_key, phase_config in data.get('feature_dev', {}).items():
+            match = _PHASE_KEY_RE.match(phase_key)
+            if not match or not isinstance(phase_config, dict):
+                continue
+            short_name = f"fd-{match.group(2)}"
+            self.phases[phase_key] = phase_config
+            self.phase_short_names[phase_key] = short_name
+            self.aliases[short_name] = phase_key
+            self.aliases[f"feature-dev-phase{match.group(1)}"] = phase_key
+
+        self._base_paths: Dict[str, Path] = {}
+        self._resolved: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._targets: Optional[List[Tuple[str, Dict[str, Any]]]] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.data)
+
+    def base_path(self, level: str) -> Path:
+        """获取知识库层级的基础路径"""
+        path = self._base_paths.get(level)
+        if path is None:
+            rel_path = self.sources.get(level, {}).get('path', '')
+            if not rel_path:
+                rel_path = DEFAULT_LEVEL_PATHS.get(level, '.knowledge')
+            path = self.repo_root / rel_path
+            self._base_paths[level] = path
+        return path
+
+    def full_path(self, level: str, file_path: str) -> Path:
+        """获取文件完整路径"""
+        return self.base_path(level) / file_path
+
+    def command(self, command: str, checklist_type: str = "") -> Dict[str, Any]:
+        """获取命令的知识库配置（支持 checklist 类型和 feature-dev 阶段别名）"""
+        key = (command, checklist_type if command == 'checklist' else "")
+        resolved = self._resolved.get(key)
+        if resolved is not None:
+            return resolved
+
+        if command == 'checklist' and checklist_type:
+            resolved = self.checklist_types.get(checklist_type) or {
+                'description': f'{checklist_type} 检查清单',
+                'documents': [],
+            }
+        elif command in self.aliases:
+            resolved = self.phases[self.aliases[command]]
+        else:
+            resolved = self.commands.get(command, {})
+
+        self._resolved[key] = resolved
+        return resolved
+
+    @property
+    def targets(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        配置中所有可加载的知识目标
+
+        包括 command_knowledge 中的每个命令、checklist 的每个类型以及 feature_dev 的每个阶段。
+        """
+        if self._targets is None:
+            targets: List[Tuple[str, Dict[str, Any]]] = []
+            for cmd, cfg in self.commands.items():
+                targets.append((cmd, cfg))
+                if cmd == 'checklist':
+                    for type_name, type_config in self.checklist_types.items():
+                        targets.append((f"checklist --type {type_name}", type_config))
+            for phase_key, phase_config in self.phases.items():
+                targets.append((self.phase_short_names[phase_key], phase_config))
+            self._targets = targets
+        return self._targets
+
+
+# 按仓库缓存的配置视图：(配置文件签名, 实例)
+_knowledge_configs: Dict[str, Tuple[Tuple, KnowledgeConfig]] = {}
+_knowledge_configs_lock = threading.Lock()
+
+
+def _config_signature(repo_root: Path) -> Tuple:
+    """所有候选配置文件的 (mtime, size)，任何一个变化都会使缓存失效"""
+    signature = []
+    for json_path in get_config_paths(repo_root).values():
+        for path in (json_path, json_path.with_suffix('.yaml')):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append(None)
+    return tuple(signature)
+
+
+def load_knowledge_config(repo_root: Path) -> KnowledgeConfig:
+    """
+    加载合并后的配置视图；配置文件未变化时复用已构建的实例
+
+    加载过程中的诊断信息保存在 KnowledgeConfig.messages 中，不会打印。
+    """
+    key = str(repo_root)
+    signature = _config_signature(repo_root)
+    with _knowledge_configs_lock:
+        cached = _knowledge_configs.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        messages: List[Tuple[str, str]] = []
+        data = load_json_config(repo_root, messages)
+        knowledge_config = KnowledgeConfig(repo_root, data, messages)
+        _knowledge_configs[key] = (signature, knowledge_config)
+        return knowledge_config
+
+
+# ═══════════════════════════════════════════════════════════════
+# 路径索引
+# ═══════════════════════════════════════════════════════════════
+
+class PathIndex:
+    """
+    共享的 stat 缓存与路径索引
+
+    每个目录只 scandir 一次，文件存在性、大小和 glob 匹配都从目录列表中解析，
+    同一次运行内多个命令引用同一文档时不会重复访问文件系统。
+
+    查询可以在多个线程间并发进行（缓存填充是幂等的）；
+    记录模式（start_recording/stop_recording）只供单线程的 KnowledgeWatcher 使用。
+    """
+
+    def __init__(self):
+        # 目录 -> {文件名: (是否文件, 是否目录, 字节数)}，目录不存在时为 None
+        self._listings: Dict[str, Optional[Dict[str, Tuple[bool, bool, int]]]] = {}
+        self._globs: Dict[str, List[Path]] = {}
+        # 记录模式下收集访问过的目录（用于 watch 的依赖跟踪）
+        self._recording: Optional[Set[str]] = None
+
+    @property
+    def directories(self) -> List[str]:
+        """已缓存列表的目录"""
+        return list(self._listings)
+
+    def start_recording(self):
+        self._recording = set()
+
+    def stop_recording(self) -> Set[str]:
+        recorded = self._recording or set()
+        self._recording = None
+        return recorded
+
+    def invalidate(self, directory: str):
+        """目录内容变化后丢弃其列表；glob 结果可能依赖任意目录，整体清空"""
+        self._listings.pop(directory, None)
+        self._globs.clear()
+
+    def listing(self, directory: Path) -> Optional[Dict[str, Tuple[bool, bool, int]]]:
+        """返回目录列表（缓存），目录不存在时返回 None"""
+        key = str(directory)
+        if self._recording is not None:
+            self._recording.add(key)
+        if key in self._listings:
+            return self._listings[key]
+
+        entries: Optional[Dict[str, Tuple[bool, bool, int]]] = None
+        try:
+            with os.scandir(key) as it:
+                entries = {}
+                for entry in it:
+                    try:
+                        is_file = entry.is_file()
+                        is_dir = not is_file and entry.is_dir()
+                        size = entry.stat().st_size if is_file else 0
+                    except OSError:
+                        continue
+                    entries[entry.name] = (is_file, is_dir, size)
+        except OSError:
+            entries = None
+
+        self._listings[key] = entries
+        return entries
+
+    def _lookup(self, path: Path) -> Optional[Tuple[bool, bool, int]]:
+        entries = self.listing(path.parent)
+        if entries is None:
+            return None
+        return entries.get(path.name)
+
+    def is_file(self, path: Path) -> bool:
+        info = self._lookup(path)
+        return bool(info and info[0])
+
+    def is_dir(self, path: Path) -> bool:
+        info = self._lookup(path)
+        return bool(info and info[1])
+
+    def size(self, path: Path) -> int:
+        info = self._lookup(path)
+        return info[2] if info and info[0] else 0
+
+    def tokens(self, path: Path) -> int:
+        """与 estimate_tokens 相同的估算规则，但使用缓存的文件大小"""
+        return self.size(path) // 4
+
+    def glob(self, base_path: Path, pattern: str) -> List[Path]:
+        """在 base_path 下按 pattern 匹配文件（结果有序并缓存）"""
+        key = f"{base_path}\0{pattern}"
+        if key in self._globs and self._recording is None:
+            return self._globs[key]
+
+        found: Set[Path] = set()
+        parts = Path(pattern).parts
+        if parts:
+            self._glob_parts(base_path, parts, 0, found)
+        matches = sorted(found)
+        self._globs[key] = matches
+        return matches
+
+    def _glob_parts(self, directory: Path, parts: Tuple[str, ...], i: int, matches: Set[Path]):
+        """
+        匹配 parts[i:]，结果加入 matches
+
+        ** 也通过 listing 逐级展开（与 glob 一样匹配零个或多个目录并跳过隐藏项），
+        因此记录模式下会记下递归经过的每个目录，新建的子目录同样能被 watch 发现。
+        """
+        entries = self.listing(directory)
+        if not entries:
+            return
+        part = parts[i]
+        last = i == len(parts) - 1
+
+        if part == '**':
+            if last:
+                matches.update(directory / name for name, (is_file, _, _) in entries.items()
+                               if is_file and not name.startswith('.'))
+            else:
+                self._glob_parts(directory, parts, i + 1, matches)
+            for name, (_, is_dir, _) in entries.items():
+                if is_dir and not name.startswith('.'):
+                    self._glob_parts(directory / name, parts, i, matches)
+            return
+
+        if glob.has_magic(part):
+            names = [n for n in entries if fnmatch.fnmatchcase(n, part)
+                     and (part.startswith('.') or not n.startswith('.'))]
+        else:
+            names = [part] if part in entries else []
+        for name in names:
+            is_file, is_dir, _ = entries[name]
+            if last and is_file:
+                matches.add(directory / name)
+            elif not last and is_dir:
+                self._glob_parts(directory / name, parts, i + 1, matches)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 文档解析
+# ═══════════════════════════════════════════════════════════════
+
+def resolve_document(
+    config: KnowledgeConfig,
+    doc: Dict[str, Any],
+    index: PathIndex
+) -> Optional[Dict[str, Any]]:
+    """
+    使用共享索引解析单个文档条目
+
+    Returns:
+        解析结果；动态文档（无 glob）返回 None
+    """
+    level = doc.get('level', 'L2')
+    doc_path = doc.get('path', '')
+    glob_pattern = doc.get('glob_pattern')
+
+    if doc.get('dynamic', False) and not glob_pattern:
+        return None
+
+    base_path = config.base_path(level)
+
+    if glob_pattern or '*' in doc_path:
+        matches = index.glob(base_path, glob_pattern or doc_path)
+        return {
+            "level": level,
+            "path": glob_pattern or doc_path,
+            "glob": True,
+            "matches": [str(m) for m in matches],
+            "exists": bool(matches),
+            "tokens": sum(index.tokens(m) for m in matches),
+        }
+
+    full_path = base_path / doc_path
+    exists = index.is_file(full_path)
+    return {
+        "level": level,
+        "path": doc_path,
+        "glob": False,
+        "matches": [str(full_path)] if exists else [],
+        "exists": exists,
+        "tokens": index.tokens(full_path) if exists else 0,
+    }
+
+
+def resolve_command_knowledge(
+    config: KnowledgeConfig,
+    command: str,
+    checklist_type: str = "",
+    index: Optional[PathIndex] = None
+) -> Tuple[bool, Dict[str, Any]]:
+    """
+    解析命令所需的知识库文档（无输出）
+
+    Returns:
+        (是否成功, 结果字典)；结果结构与 load-knowledge.py --json 的输出一致
+    """
+    if not config:
+        return False, {"error": "KNOW-004", "error_message": "知识库配置文件不存在或解析失败"}
+
+    cmd_config = config.command(command, checklist_type)
+    if not cmd_config:
+        return False, {"error": "UNKNOWN_COMMAND", "error_message": f"未知命令: {command}"}
+
+    if index is None:
+        index = PathIndex()
+
+    documents: List[dict] = []
+    has_error = False
+    has_critical_error = False
+    total_tokens = 0
+    all_constraints: List[Dict[str, Any]] = []
+
+    cmd_description = cmd_config.get('description', command)
+    doc_list = cmd_config.get('documents', [])
+
+    # 收集所有约束
+    for doc in doc_list:
+        if doc.get('constraints'):
+            all_constraints.append({
+                'description': doc.get('description', doc.get('path')),
+                'level': doc.get('level'),
+                'critical': doc.get('critical', False),
+                'constraints': doc.get('constraints', [])
+            })
+
+    for doc in doc_list:
+        entry = resolve_document(config, doc, index)
+        if entry is None:
+            # 跳过动态加载的文档（需要运行时上下文）
+            continue
+
+        level = entry["level"]
+        required = doc.get('required', False)
+        critical = doc.get('critical', False)
+        description = doc.get('description', '')
+
+        if entry["glob"]:
+            base_path = config.base_path(level)
+            for matched_file in entry["matches"]:
+                matched_path = Path(matched_file)
+                tokens = index.tokens(matched_path)
+                total_tokens += tokens
+
+                try:
+                    rel_path = matched_path.relative_to(base_path)
+                except ValueError:
+                    rel_path = matched_path.name
+
+                documents.append({
+                    "level": level,
+                    "path": str(rel_path),
+                    "full_path": matched_file,
+                    "description": description,
+                    "status": "exists",
+                    "required": required,
+                    "critical": critical,
+                    "tokens": tokens,
+                    "glob": True
+                })
+            continue
+
+        doc_path = doc.get('path', '')
+        full_path = config.full_path(level, doc_path)
+        tokens = entry["tokens"]
+        total_tokens += tokens
+
+        if not entry["exists"] and level == "L0" and required:
+            has_error = True
+            if critical:
+                has_critical_error = True
+
+        documents.append({
+            "level": level,
+            "path": doc_path,
+            "full_path": str(full_path),
+            "description": description,
+            "status": "exists" if entry["exists"] else "missing",
+            "required": required,
+            "critical": critical,
+            "tokens": tokens,
+            "glob": False
+        })
+
+    result = {
+        "command": command,
+        "description": cmd_description,
+        "status": "error" if has_error else "success",
+        "has_critical_error": has_critical_error,
+        "documents": documents,
+        "constraints": all_constraints,
+        "total_tokens": total_tokens,
+        "doc_count": len(documents),
+        "paths": {
+            "required": [d["full_path"] for d in documents if d["required"] and d["status"] == "exists"],
+            "optional": [d["full_path"] for d in documents if not d["required"] and d["status"] == "exists"],
+            "missing": [d["full_path"] for d in documents if d["status"] == "missing"]
+        }
+    }
+
+    if has_error:
+        result["error_code"] = "KNOW-001"
+        result["error_message"] = "L0 知识库文档缺失，流程被阻止"
+
+    return not has_error, result
+
+
+def read_document_content(doc: Dict[str, Any], max_chars: int = 8000) -> str:
+    """读取文档内容，超过 max_chars（约 max_chars/4 tokens）时截断"""
+    content = Path(doc["full_path"]).read_text(encoding='utf-8')
+    if len(content) > max_chars:
+        content = content[:max_chars] + "\n\n... [内容已截断] ..."
+    return content
+
+
+def validate_references(config: KnowledgeConfig, index: PathIndex) -> Dict[str, Any]:
+    """
+    解析配置中引用的全部知识库文档，返回每个命令的缺失报告
+
+    缺失的 L0 必需文档视为错误（与加载命令时的阻止规则一致），
+    L1 必需文档为警告，其余为提示。glob 未匹配到文件最多记为警告。
+    """
+    report: Dict[str, Dict[str, Any]] = {}
+    total_errors = 0
+    total_critical = 0
+    total_docs = 0
+
+    for label, cmd_config in config.targets:
+        missing: List[Dict[str, Any]] = []
+        resolved = 0
+
+        for doc in cmd_config.get('documents', []):
+            entry = resolve_document(config, doc, index)
+            if entry is None:
+                continue
+            resolved += 1
+            if entry["exists"]:
+                continue
+
+            level = entry["level"]
+            required = doc.get('required', False)
+            critical = doc.get('critical', False)
+            if level == "L0" and required and not entry["glob"]:
+                severity = "error"
+            elif level in ("L0", "L1") and required:
+                severity = "warn"
+            else:
+                severity = "info"
+
+            missing.append({
+                "level": level,
+                "path": entry["path"],
+                "required": required,
+                "critical": critical and severity == "error",
+                "severity": severity,
+                "description": doc.get('description', ''),
+            })
+
+        errors = sum(1 for m in missing if m["severity"] == "error")
+        critical_count = sum(1 for m in missing if m["critical"])
+        total_errors += errors
+        total_critical += critical_count
+        total_docs += resolved
+
+        report[label] = {
+            "documents": resolved,
+            "missing": missing,
+            "errors": errors,
+            "critical": critical_count,
+            "status": "error" if errors else "ok",
+        }
+
+    return {
+        "status": "success" if total_errors == 0 else "error",
+        "commands": report,
+        "total_documents": total_docs,
+        "total_errors": total_errors,
+        "total_critical": total_critical,
+    }
+
+
+def build_command_manifest(
+    config: KnowledgeConfig,
+    cmd_config: Dict[str, Any],
+    index: PathIndex
+) -> Dict[str, Any]:
+    """根据共享索引计算单个命令的文档清单与 token 估算"""
+    documents: List[Dict[str, Any]] = []
+    missing: List[str] = []
+    has_error = False
+
+    for doc in cmd_config.get('documents', []):
+        entry = resolve_document(config, doc, index)
+        if entry is None:
+            continue
+        required = doc.get('required', False)
+        for match in entry["matches"]:
+            documents.append({
+                "level": entry["level"],
+                "full_path": match,
+                "description": doc.get('description', ''),
+                "required": required,
+                "critical": doc.get('critical', False),
+                "tokens": index.tokens(Path(match)),
+            })
+        if not entry["exists"]:
+            missing.append(entry["path"])
+            if entry["level"] == "L0" and required and not entry["glob"]:
+                has_error = True
+
+    return {
+        "description": cmd_config.get('description', ''),
+        "status": "error" if has_error else "success",
+        "documents": documents,
+        "missing": missing,
+        "total_tokens": sum(d["tokens"] for d in documents),
+    }
+
+
+# ═══════════════════════════════════════════════════════════════
+# 进程内 API
+# ═══════════════════════════════════════════════════════════════
+
+class KnowledgeLoader:
+    """
+    进程内知识库加载 API
+
+    - 不向 stdout 输出，结果以字典返回
+    - 配置视图在配置文件未变化时复用，PathIndex 在 index_ttl 秒内复用，
+      超时后下一次调用换用新索引，以反映知识库文件的变化
+    - 线程安全：索引替换在锁内完成，查询只读取不可变的快照
+    """
+
+    def __init__(self, repo_root: Path, index_ttl: float = 2.0):
+        self.repo_root = Path(repo_root)
+        self.index_ttl = index_ttl
+        self._lock = threading.Lock()
+        self._config: Optional[KnowledgeConfig] = None
+        self._index: Optional[PathIndex] = None
+        self._index_built = 0.0
+
+    def _snapshot(self) -> Tuple[KnowledgeConfig, PathIndex]:
+        config = load_knowledge_config(self.repo_root)
+        with self._lock:
+            now = time.monotonic()
+            if (self._index is None or config is not self._config
+                    or now - self._index_built > self.index_ttl):
+                self._config = config
+                self._index = PathIndex()
+                self._index_built = now
+            return config, self._index
+
+    @property
+    def config(self) -> KnowledgeConfig:
+        return self._snapshot()[0]
+
+    def load(self, command: str, checklist_type: str = "") -> Tuple[bool, Dict[str, Any]]:
+        """解析命令所需的知识库文档，等价于 load-knowledge.py <command> --json"""
+        config, index = self._snapshot()
+        return resolve_command_knowledge(config, command, checklist_type, index)
+
+    def validate(self) -> Dict[str, Any]:
+        """等价于 load-knowledge.py validate --deep --json（不含耗时）"""
+        config, index = self._snapshot()
+        return validate_references(config, index)
+
+    def invalidate(self):
+        """丢弃路径索引，下一次调用重新扫描"""
+        with self._lock:
+            self._index = None
+
+
+_loaders: Dict[str, KnowledgeLoader] = {}
+_loaders_lock = threading.Lock()
+
+
+def get_loader(repo_root: Path) -> KnowledgeLoader:
+    """获取仓库共享的 KnowledgeLoader 实例"""
+    key = str(repo_root)
+    with _loaders_lock:
+        loader = _loaders.get(key)
+        if loader is None:
+            loader = KnowledgeLoader(repo_root)
+            _loaders[key] = loader
+        return loader
+
+
+def load_knowledge(repo_root: Path, command: str, checklist_type: str = "") -> Tuple[bool, Dict[str, Any]]:
+    """便捷入口：使用共享的 KnowledgeLoader 解析命令知识库"""
+    return get_loader(repo_root).load(command, checklist_type)
+
+
+# ═══════════════════════════════════════════════════════════════
+# 监视
+# ═══════════════════════════════════════════════════════════════
+
+class KnowledgeWatcher:
+    """
+    轮询式知识库监视器
+
+    维护共享的 PathIndex 和每个命令的预计算清单。每轮只 stat 已索引的目录、
+    清单引用的文件和配置文件（比较 mtime/inode/size），变化时只失效对应目录，
+    并只重算依赖这些目录的命令。结果写入 JSON 文件，客户端按命令名直接读取。
+    """
+
+    def __init__(self, repo_root: Path, output_path: Optional[Path] = None):
+        self.repo_root = repo_root
+        self.output_path = output_path or get_config_cache_dir(repo_root) / "knowledge-manifests.json"
+        self.index = PathIndex()
+        self.config: Optional[KnowledgeConfig] = None
+        self.manifests: Dict[str, Dict[str, Any]] = {}
+        self._targets: Dict[str, Dict[str, Any]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        self._snapshot: Dict[str, Optional[Tuple[int, int, int]]] = {}
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+    def _config_files(self) -> List[str]:
+        files = []
+        for json_path in get_config_paths(self.repo_root).values():
+            files.append(str(json_path))
+            files.append(str(json_path.with_suffix('.yaml')))
+        return files
+
+    def _watched_paths(self) -> Set[str]:
+        paths = set(self._config_files())
+        paths.update(self.index.directories)
+        for manifest in self.manifests.values():
+            paths.update(d["full_path"] for d in manifest["documents"])
+        return paths
+
+    def _take_snapshot(self):
+        self._snapshot = {path: self._stat(path) for path in self._watched_paths()}
+
+    def _compute(self, labels: Set[str]):
+        for label in [name for name in self._targets if name in labels]:
+            for deps in self._dependents.values():
+                deps.discard(label)
+
+            self.index.start_recording()
+            manifest = build_command_manifest(self.config, self._targets[label], self.index)
+            for directory in self.index.stop_recording():
+                self._dependents.setdefault(directory, set()).add(label)
+            self.manifests[label] = manifest
+
+    def rebuild(self):
+        """重新加载配置并全量计算所有清单"""
+        self.config = load_knowledge_config(self.repo_root)
+        self.index = PathIndex()
+        self._dependents = {}
+        self.manifests = {}
+        self._targets = dict(self.config.targets)
+        self._compute(set(self._targets))
+        self._take_snapshot()
+        self.write()
+
+    def poll(self) -> Set[str]:
+        """检查一轮变化，返回被重算的命令"""
+        config_files = set(self._config_files())
+        changed = [path for path, before in self._snapshot.items() if self._stat(path) != before]
+        if not changed:
+            return set()
+
+        if config_files.intersection(changed):
+            self.rebuild()
+            return set(self._targets)
+
+        affected: Set[str] = set()
+        for path in changed:
+            # 文件变化（大小/内容）体现在其父目录的缓存列表中
+            directory = path if path in self._dependents else os.path.dirname(path)
+            self.index.invalidate(directory)
+            affected.update(self._dependents.get(directory, ()))
+
+        # glob 缓存已清空，依赖 glob 的命令在重算时会重新匹配
+        self._compute(affected)
+        self._take_snapshot()
+        self.write()
+        return affected
+
+    def manifest(self, command: str) -> Optional[Dict[str, Any]]:
+        """按命令名读取预计算清单"""
+        return self.manifests.get(command)
+
+    def write(self):
+        """原子写入清单文件"""
+        payload = {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repo_root": str(self.repo_root),
+            "commands": self.manifests,
+        }
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.output_path.with_name(self.output_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.output_path)
+
+    def run(
+        self,
+        interval: float = 0.5,
+        max_interval: float = 5.0,
+        on_change: Optional[Callable[[Set[str]], None]] = None
+    ):
+        """轮询循环：无变化时间隔逐步加倍（退避），有变化时恢复到初始间隔"""
+        delay = interval
+        while True:
+            time.sleep(delay)
+            affected = self.poll()
+            if affected:
+                if on_change:
+                    on_change(affected)
+                delay = interval
+            else:
+                delay = min(delay * 2, max_interval)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Feature scaffolding from .specify/templates
+
+Instantiates the spec, plan, tasks and checklist templates of a feature in one
+pass, with the feature variables ([###-feature-name], [FEATURE NAME],
+[FEATURE], [DATE], $ARGUMENTS) substituted. Files placed under
+.specify/templates/scaffold/ are instantiated as well, at the same relative
+path inside the feature directory.
+
+Templates are read and compiled once per process and re-read only when their
+size or mtime changes, so creating many features renders from memory.
+
+With link_static, a file whose content does not depend on the feature (no
+slot is filled) is hard-linked to a read-only, content-addressed copy in
+.specify/.cache/scaffold/ instead of being written again. Editors that save by
+replacing the file break the link; in-place writes fail instead of changing
+every linked copy.
+
+A feature file that is still unedited scaffold output is a stub: readers that
+judge a feature by its files (feature_status.py, spec_archive.py) treat it as
+missing. stub_patterns() matches the rendered templates whatever the feature
+values were; is_template_stub() also catches empty files and templates that
+were copied without being rendered.
+
+Usage: python scaffold.py <feature-dir> [--description TEXT] [--spec-only]
+                          [--link-static] [--force] [--json]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+from common import (
+    CompiledTemplate,
+    compile_template_bytes,
+    get_repo_root,
+    log_info,
+    log_warn,
+)
+
+
+class ScaffoldFile(NamedTuple):
+    """A template and where it goes inside the feature directory."""
+    template: str
+    target: str
+    values: Dict[str, str] = {}
+
+
+SPEC_SCAFFOLD: Tuple[ScaffoldFile, ...] = (
+    ScaffoldFile('spec-template.md', 'spec.md'),
+)
+
+FULL_SCAFFOLD: Tuple[ScaffoldFile, ...] = SPEC_SCAFFOLD + (
+    ScaffoldFile('plan-template.md', 'plan.md'),
+    ScaffoldFile('tasks-template.md', 'tasks.md'),
+    ScaffoldFile('checklist-template.md', 'checklists/requirements.md',
+                 {'[CHECKLIST TYPE]': 'Requirements',
+                  '[Link to spec.md or relevant documentation]': '[spec.md](../spec.md)'}),
+)
+
+# Extra files instantiated with FULL_SCAFFOLD, relative to the templates dir
+SCAFFOLD_EXTRAS_DIR = 'scaffold'
+
+
+class FeatureScaffolder:
+    """Renders feature templates from an in-process template cache."""
+
+    def __init__(self, repo_root: Path, link_static: bool = False):
+        self.repo_root = repo_root
+        self.templates_dir = repo_root / '.specify' / 'templates'
+        self.store_dir = repo_root / '.specify' / '.cache' / 'scaffold'
+        self.link_static = link_static
+        self._templates: Dict[Path, Tuple[Tuple[int, int], bytes, CompiledTemplate]] = {}
+        self._stored: Dict[str, Path] = {}
+
+    def _template(self, path: Path) -> Optional[Tuple[bytes, CompiledTemplate]]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._templates.get(path)
+        if cached is None or cached[0] != key:
+            try:
+                data = path.read_bytes()
+            except OSError:
+                return None
+            cached = (key, data, compile_template_bytes(data))
+            self._templates[path] = cached
+        return cached[1], cached[2]
+
+    def _extras(self) -> List[ScaffoldFile]:
+        extras_dir = self.templates_dir / SCAFFOLD_EXTRAS_DIR
+        files: List[ScaffoldFile] = []
+        for dirpath, _, filenames in os.walk(extras_dir):
+            for name in sorted(filenames):
+                relative = (Path(dirpath) / name).relative_to(self.templates_dir)
+                files.append(ScaffoldFile(relative.as_posix(), relative.relative_to(SCAFFOLD_EXTRAS_DIR).as_posix()))
+        return files
+
+    @staticmethod
+    def feature_values(branch_name: str, description: str = "") -> Dict[str, str]:
+        """Slot values shared by every template of a feature."""
+        title = description or branch_name
+        return {
+            '[###-feature-name]': branch_name,
+            '[FEATURE NAME]': title,
+            '[FEATURE]': title,
+            '[DATE]': date.today().isoformat(),
+            '$ARGUMENTS': description,
+        }
+
+    def stub_patterns(self) -> Dict[str, Pattern[str]]:
+        """
+        Patterns matching each FULL_SCAFFOLD target while it is unedited
+        template output, keyed by target path.
+
+        Only the feature slots may differ from the template text; they are
+        matched up to the end of their line.
+        """
+        patterns: Dict[str, Pattern[str]] = {}
+        for item in FULL_SCAFFOLD + tuple(self._extras()):
+            template = self._template(self.templates_dir / item.template)
+            if template is None:
+                continue
+            _, compiled = template
+            # Trailing whitespace is left to the editor
+            segments = compiled.segments[:-1] + [compiled.segments[-1].rstrip()]
+            parts = []
+            for i, segment in enumerate(segments):
+                if i & 1 and segment in FEATURE_SLOTS:
+                    parts.append(r'[^\n]*?')
+                else:
+                    parts.append(re.escape(item.values.get(segment, segment) if i & 1 else segment))
+            patterns[item.target] = re.compile(''.join(parts) + r'\s*')
+        return patterns
+
+    def _store(self, data: bytes) -> Path:
+        digest = hashlib.sha256(data).hexdigest()
+        stored = self._stored.get(digest)
+        if stored is not None:
+            return stored
+        stored = self.store_dir / digest
+        if not stored.exists():
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = self.store_dir / f".{digest}.{os.getpid()}.tmp"
+            temp_path.write_bytes(data)
+            os.chmod(temp_path, 0o444)
+            os.replace(temp_path, stored)
+        self._stored[digest] = stored
+        return stored
+
+    def _link(self, data: bytes, target: Path) -> bool:
+        try:
+            os.link(self._store(data), target)
+        except OSError:
+            return False
+        return True
+
+    def scaffold(self, feature_dir: Path, branch_name: str, description: str = "",
+                 files: Tuple[ScaffoldFile, ...] = FULL_SCAFFOLD, overwrite: bool = True) -> List[Path]:
+        """
+        Instantiate templates into feature_dir; returns the files written.
+
+        Templates that do not exist are skipped. Existing targets are
+        replaced unless overwrite is False.
+        """
+        scaffold_files = list(files)
+        if files is FULL_SCAFFOLD:
+            scaffold_files.extend(self._extras())
+
+        values = self.feature_values(branch_name, description)
+        written: List[Path] = []
+        for item in scaffold_files:
+            template = self._template(self.templates_dir / item.template)
+            if template is None:
+                continue
+            target = feature_dir / item.target
+            if target.exists() or target.is_symlink():
+                if not overwrite:
+                    continue
+                target.unlink()
+            target.parent.mkdir(parents=True, exist_ok=True)
+
+            data, compiled = template
+            file_values = dict(values, **item.values) if item.values else values
+            if compiled.slots.isdisjoint(file_values):
+                if self.link_static and self._link(data, target):
+                    written.append(target)
+                    continue
+                target.write_bytes(data)
+            else:
+                target.write_bytes(compiled.render(file_values).encode('utf-8'))
+            written.append(target)
+        return written
+
+
+# Slots every scaffolded file has filled; one left in a file means the template
+# was copied without being rendered
+FEATURE_SLOTS = frozenset(FeatureScaffolder.feature_values(''))
+
+
+def is_template_stub(text: str, pattern: Optional[Pattern[str]] = None) -> bool:
+    """True if text is empty, still holds a feature slot, or matches the stub pattern of its target."""
+    if not text.strip():
+        return True
+    if any(slot in text for slot in FEATURE_SLOTS):
+        return True
+    return pattern is not None and pattern.fullmatch(text) is not None
+
+
+# ═══════════════════════════════════════════════════════════════
+# Main Execution
+# ═══════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description='Instantiate feature templates into a feature directory')
+    parser.add_argument('feature_dir', help='Feature directory, e.g. specs/001-user-auth')
+    parser.add_argument('--description', '-d', default='', help='Feature description ($ARGUMENTS, [FEATURE NAME])')
+    parser.add_argument('--spec-only', action='store_true', help='Only instantiate the spec template')
+    parser.add_argument('--link-static', action='store_true',
+                        help='Hard-link files that do not depend on the feature to a shared copy')
+    parser.add_argument('--force', action='store_true', help='Replace files that already exist')
+    parser.add_argument('--json', action='store_true', help='Output in JSON format')
+    args = parser.parse_args()
+
+    feature_dir = Path(args.feature_dir).resolve()
+    scaffolder = FeatureScaffolder(get_repo_root(), link_static=args.link_static)
+    files = SPEC_SCAFFOLD if args.spec_only else FULL_SCAFFOLD
+    written = scaffolder.scaffold(feature_dir, feature_dir.name, args.description, files, overwrite=args.force)
+
+    if args.json:
+        print(json.dumps([str(path) for path in written]))
+        return
+    if not written:
+        log_warn(f"Nothing to create in {feature_dir} (files exist; use --force to replace)")
+        return
+    for path in written:
+        log_info(f"Created {path}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -2,23 +2,22 @@
 # -*- coding: utf-8 -*-
 """
 Setup plan for a feature.
-Copies the plan template to the feature directory.
+Renders the plan template into the feature directory, keeping an existing plan.
 """
 
 import argparse
 import json
-import shutil
 import sys
 from pathlib import Path
 
 # Import common functions
 from common import (
-    get_repo_root,
     get_feature_paths,
     check_feature_branch,
     log_info,
     log_warn,
 )
+from scaffold import FeatureScaffolder, ScaffoldFile
 
 
 def main():
@@ -49,13 +48,24 @@ def main():
         print(error, file=sys.stderr)
         sys.exit(1)
 
+    # An archived feature is restored explicitly, not shadowed by a new directory
+    if paths['FEATURE_ARCHIVE']:
+        print(f"ERROR: Feature {feature_dir.name} is archived in {paths['FEATURE_ARCHIVE']}", file=sys.stderr)
+        print(f"Restore it with: python .specify/scripts/python/spec_archive.py restore {feature_dir.name}",
+              file=sys.stderr)
+        sys.exit(1)
+
     # Ensure the feature directory exists
     feature_dir.mkdir(parents=True, exist_ok=True)
 
-    # Copy plan template if it exists
+    # Render the plan template with the same feature values as the scaffolder;
+    # a plan already written (or scaffolded) is kept, an empty one is replaced
     template = repo_root / '.specify' / 'templates' / 'plan-template.md'
-    if template.is_file():
-        shutil.copy2(template, impl_plan)
+    plan_file = ScaffoldFile(template.name, impl_plan.name)
+    if impl_plan.is_file() and impl_plan.stat().st_size:
+        if not args.json_mode:
+            log_info(f"Plan already exists at {impl_plan}, left unchanged")
+    elif FeatureScaffolder(repo_root).scaffold(feature_dir, current_branch, files=(plan_file,)):
         if not args.json_mode:
             log_info(f"Copied plan template to {impl_plan}")
     else:
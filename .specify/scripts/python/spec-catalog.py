@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Catalog of feature specs across all branches, read from git objects.
+
+specs/ differs per branch, so answering "which feature is NNN and what is its
+status" used to require checking branches out. This script reads
+specs/*/spec.md and plan.md straight from the trees of HEAD and every feature
+branch (local and remote-tracking) without touching the working tree.
+
+All objects go through one persistent `git cat-file --batch` process instead
+of one git invocation per file. Trees and blobs are memoized by object id, so
+a spec shared by hundreds of branches is parsed once.
+
+Usage: python spec-catalog.py [NNN ...] [--json] [--ref PATTERN ...]
+
+OPTIONS:
+  NNN                 Only show features with these number prefixes
+  --json              Output the catalog in JSON format
+  --ref PATTERN       Also scan refs matching PATTERN (git for-each-ref syntax)
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from common import (
+    FEATURE_PREFIX_RE,
+    feature_sort_key,
+    log_error,
+    log_info,
+    parse_plan_bytes,
+)
+from tech_ledger import extract_plan_technologies
+
+
+# Feature branches, local and remote-tracking
+DEFAULT_REF_PATTERNS = ['refs/heads/[0-9][0-9][0-9]*', 'refs/remotes/*/[0-9][0-9][0-9]*']
+
+_SPEC_TITLE_PREFIX = 'Feature Specification:'
+_TREE_ENTRY_RE = re.compile(rb'(\d+) ([^\0]*)\0')
+
+# Tree entry: (is_tree, object id)
+TreeEntries = Dict[str, Tuple[bool, str]]
+
+
+class GitObjectReader:
+    """A long-running `git cat-file --batch` process with per-object memoization."""
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            ['git', 'cat-file', '--batch'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        self.hash_len = len(self._object_format_hash())
+        self._trees: Dict[str, TreeEntries] = {}
+        self.requests = 0
+
+    def _object_format_hash(self) -> bytes:
+        # Empty tree id of the repository's hash algorithm (SHA-1 or SHA-256)
+        result = subprocess.run(['git', 'hash-object', '-t', 'tree', '--stdin'],
+                                input=b'', capture_output=True, check=True)
+        return bytes.fromhex(result.stdout.strip().decode())
+
+    def close(self):
+        if self.process.stdin:
+            self.process.stdin.close()
+        self.process.wait()
+
+    def read(self, name: str) -> Optional[Tuple[str, str, bytes]]:
+        """Return (object id, type, content) of a revision expression, or None if missing."""
+        self.requests += 1
+        stdin, stdout = self.process.stdin, self.process.stdout
+        stdin.write(name.encode('utf-8') + b'\n')
+        stdin.flush()
+        header = stdout.readline().split()
+        if len(header) != 3:
+            # "<name> missing" or "<name> ambiguous"
+            return None
+        oid, kind, size = header[0].decode(), header[1].decode(), int(header[2])
+        data = stdout.read(size)
+        stdout.read(1)
+        return oid, kind, data
+
+    def tree(self, name: str) -> Optional[Tuple[str, TreeEntries]]:
+        """Entries of a tree (by id or revision expression), parsed once per tree id."""
+        cached = self._trees.get(name)
+        if cached is not None:
+            return name, cached
+        obj = self.read(name)
+        if obj is None or obj[1] != 'tree':
+            return None
+        oid, _, data = obj
+        entries = self._trees.get(oid)
+        if entries is None:
+            entries = self._parse_tree(data)
+            self._trees[oid] = entries
+        return oid, entries
+
+    def _parse_tree(self, data: bytes) -> TreeEntries:
+        # Raw tree format: "<mode> <name>\0<binary object id>" repeated
+        entries: TreeEntries = {}
+        pos, hash_len, match_entry = 0, self.hash_len, _TREE_ENTRY_RE.match
+        match = match_entry(data, pos)
+        while match:
+            pos = match.end() + hash_len
+            name = match.group(2).decode('utf-8', 'surrogateescape')
+            entries[name] = (match.group(1) == b'40000', data[match.end():pos].hex())
+            match = match_entry(data, pos)
+        return entries
+
+
+def list_refs(patterns: List[str]) -> List[Tuple[str, str]]:
+    """(ref name, commit id) of HEAD and every ref matching the patterns."""
+    refs: List[Tuple[str, str]] = []
+    try:
+        head = subprocess.run(['git', 'rev-parse', '--verify', '--quiet', 'HEAD'],
+                              capture_output=True, text=True, check=True).stdout.strip()
+        refs.append(('HEAD', head))
+    except subprocess.CalledProcessError:
+        pass
+    result = subprocess.run(
+        ['git', 'for-each-ref', '--format=%(refname) %(objectname)'] + patterns,
+        capture_output=True, text=True, check=True
+    )
+    for line in result.stdout.splitlines():
+        refname, _, oid = line.rpartition(' ')
+        if refname:
+            refs.append((refname, oid))
+    return refs
+
+
+def ref_branch_name(refname: str) -> str:
+    """Branch part of a ref: refs/heads/003-x and refs/remotes/origin/003-x give 003-x."""
+    if refname.startswith('refs/heads/'):
+        return refname[len('refs/heads/'):]
+    if refname.startswith('refs/remotes/'):
+        return refname.split('/', 3)[-1]
+    return refname
+
+
+def summarize_spec(data: bytes) -> Dict[str, str]:
+    doc = parse_plan_bytes(data)
+    title = ""
+    for line in doc.lines:
+        if line.startswith('# '):
+            title = line[2:].strip()
+            if title.startswith(_SPEC_TITLE_PREFIX):
+                title = title[len(_SPEC_TITLE_PREFIX):].strip()
+            break
+    return {
+        "title": title,
+        "status": doc.field("Status"),
+        "created": doc.field("Created"),
+    }
+
+
+class SpecCatalog:
+    """Features found in the trees of a set of refs."""
+
+    def __init__(self, reader: GitObjectReader):
+        self.reader = reader
+        self.features: Dict[str, Dict] = {}
+        self._summaries: Dict[str, Dict] = {}
+        self._specs_trees: Dict[str, Optional[str]] = {}
+
+    def _blob_summary(self, oid: str, kind: str) -> Optional[Dict]:
+        key = f"{kind}:{oid}"
+        summary = self._summaries.get(key)
+        if summary is None:
+            obj = self.reader.read(oid)
+            if obj is None:
+                return None
+            data = obj[2]
+            summary = summarize_spec(data) if kind == 'spec' else extract_plan_technologies(data)
+            self._summaries[key] = summary
+        return summary
+
+    def _feature(self, name: str) -> Dict:
+        feature = self.features.get(name)
+        if feature is None:
+            match = FEATURE_PREFIX_RE.match(name)
+            # "branches" is an insertion-ordered dict used as a set until records()
+            feature = {"feature": name, "number": int(match.group(1)), "branches": {},
+                       "source": None, "spec": None, "plan": None, "artifacts": [],
+                       "_spec_ids": set(), "_rank": 3}
+            self.features[name] = feature
+        return feature
+
+    def add_ref(self, refname: str, commit: str):
+        branch = ref_branch_name(refname)
+        if FEATURE_PREFIX_RE.match(branch):
+            self._feature(branch)["branches"][refname] = None
+
+        # Refs pointing at the same commit reuse its specs tree without a request
+        if commit in self._specs_trees:
+            specs_tree = self._specs_trees[commit]
+            specs = self.reader.tree(specs_tree) if specs_tree else None
+        else:
+            specs = self.reader.tree(f"{commit}:specs")
+            self._specs_trees[commit] = specs[0] if specs else None
+        if specs is None:
+            return
+
+        # The feature's own branch is the authoritative version, then HEAD,
+        # then whichever ref was seen first
+        other_rank = 1 if refname == 'HEAD' else 2
+        for name, (is_tree, oid) in specs[1].items():
+            if not is_tree or not FEATURE_PREFIX_RE.match(name):
+                continue
+            feature_tree = self.reader.tree(oid)
+            if feature_tree is None:
+                continue
+            entries = feature_tree[1]
+            feature = self._feature(name)
+            feature["branches"][refname] = None
+
+            spec_entry = entries.get('spec.md')
+            if spec_entry:
+                feature["_spec_ids"].add(spec_entry[1])
+
+            rank = 0 if branch == name else other_rank
+            if rank >= feature["_rank"]:
+                continue
+            feature["source"], feature["_rank"] = refname, rank
+            feature["artifacts"] = sorted(entry for entry, (sub_tree, _) in entries.items()
+                                          if not sub_tree or entry in ('contracts', 'checklists'))
+            feature["spec"] = self._blob_summary(spec_entry[1], 'spec') if spec_entry else None
+            plan_entry = entries.get('plan.md')
+            feature["plan"] = self._blob_summary(plan_entry[1], 'plan') if plan_entry else None
+
+    def records(self, prefixes: Optional[List[str]] = None) -> List[Dict]:
+        records = []
+        for name in sorted(self.features, key=feature_sort_key):
+            feature = self.features[name]
+            if prefixes and not any(name.startswith(f"{prefix}-") for prefix in prefixes):
+                continue
+            record = {key: value for key, value in feature.items() if not key.startswith('_')}
+            record["branches"] = list(feature["branches"])
+            record["variants"] = len(feature["_spec_ids"])
+            records.append(record)
+        return records
+
+
+# ═══════════════════════════════════════════════════════════════
+# Main Execution
+# ═══════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Catalog feature specs across all branches without checking them out'
+    )
+    parser.add_argument('numbers', nargs='*', help='Only show features with these number prefixes (e.g. 003)')
+    parser.add_argument('--json', action='store_true', help='Output in JSON format')
+    parser.add_argument('--ref', action='append', default=[], metavar='PATTERN',
+                        help='Also scan refs matching PATTERN (e.g. refs/heads/release/*)')
+    args = parser.parse_args()
+
+    prefixes = [number.zfill(3) if number.isdigit() else number for number in args.numbers]
+
+    try:
+        refs = list_refs(DEFAULT_REF_PATTERNS + args.ref)
+        reader = GitObjectReader()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        log_error("Not a git repository (or git is not installed)")
+        sys.exit(1)
+
+    try:
+        catalog = SpecCatalog(reader)
+        for refname, commit in refs:
+            catalog.add_ref(refname, commit)
+    finally:
+        reader.close()
+    records = catalog.records(prefixes)
+
+    if args.json:
+        print(json.dumps({"refs": len(refs), "features": records}, ensure_ascii=False))
+        return
+
+    if not records:
+        log_info("No features found")
+        return
+    for record in records:
+        spec = record["spec"] or {}
+        status = spec.get("status") or ("no spec" if record["spec"] is None else "-")
+        title = spec.get("title") or ""
+        print(f"{record['feature']:<40} {status:<10} {record['source'] or '-':<32} "
+              f"{len(record['branches'])} refs  {title}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cold storage for completed features
+
+Completed features are moved out of specs/ into one zip file each under
+specs/.archive/, so the directory scans of the scripts only see active
+features. specs/.archive/index.json lists the archived features:
+
+    {"version": 1, "highest": 412,
+     "features": {"001-user-auth": {"number": 1, "archived": "2025-01-19",
+                                    "files": 7, "size": 18342}}}
+
+"highest" is the largest number ever archived. The feature number allocator
+treats it as used, so archived numbers are never handed out again. Feature
+lookup by prefix only reports an archived feature (FEATURE_ARCHIVE in the
+feature paths); it is brought back with `restore`.
+
+A feature is completed when its tasks.md has checkboxes and all of them are
+checked.
+
+Usage: python spec_archive.py list [--json]
+       python spec_archive.py archive [FEATURE ...] [--completed] [--dry-run]
+       python spec_archive.py restore FEATURE
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import zipfile
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Pattern
+
+from common import (
+    FEATURE_PREFIX_RE,
+    SPECS_ARCHIVE_DIR,
+    count_task_boxes,
+    feature_sort_key,
+    get_repo_root,
+    log_error,
+    log_info,
+    log_success,
+    log_warn,
+)
+from scaffold import FeatureScaffolder, is_template_stub
+
+
+INDEX_VERSION = 1
+
+
+def is_feature_completed(feature_dir: Path, tasks_stub: Optional[Pattern[str]] = None) -> bool:
+    """
+    True if tasks.md has at least one checkbox and none is open.
+
+    A tasks.md that is still template output (see scaffold.is_template_stub)
+    does not count. tasks_stub is the stub pattern of tasks.md; it is taken
+    from the repository templates when not given.
+    """
+    try:
+        text = (feature_dir / 'tasks.md').read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        return False
+    if tasks_stub is None:
+        tasks_stub = FeatureScaffolder(feature_dir.parent.parent).stub_patterns().get('tasks.md')
+    if is_template_stub(text, tasks_stub):
+        return False
+    done, total = count_task_boxes(text)
+    return total > 0 and done == total
+
+
+class SpecArchive:
+    """Per-feature zip files plus an index under specs/.archive/."""
+
+    def __init__(self, specs_dir: Path):
+        self.specs_dir = specs_dir
+        self.dir = specs_dir / SPECS_ARCHIVE_DIR
+        self.index_path = self.dir / 'index.json'
+        self._index: Optional[Dict] = None
+
+    # ── index ──
+
+    def _load_index(self) -> Dict:
+        if self._index is None:
+            index = {"version": INDEX_VERSION, "highest": 0, "features": {}}
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION:
+                    index.update(data)
+            except (OSError, ValueError, AttributeError):
+                pass
+            self._index = index
+        return self._index
+
+    def _save_index(self):
+        index = self._load_index()
+        index["features"] = dict(sorted(index["features"].items(), key=lambda item: feature_sort_key(item[0])))
+        self.dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.dir / f".index.json.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=1)
+            f.write('\n')
+        os.replace(temp_path, self.index_path)
+
+    def zip_path(self, feature: str) -> Path:
+        return self.dir / f"{feature}.zip"
+
+    # ── queries ──
+
+    def features(self) -> Dict[str, Dict]:
+        """Archived features and their index records."""
+        return dict(self._load_index()["features"])
+
+    def highest(self) -> int:
+        return int(self._load_index().get("highest", 0))
+
+    def find(self, prefix: str) -> List[str]:
+        """Archived features whose name starts with "<prefix>-"."""
+        return [name for name in self._load_index()["features"] if name.startswith(f"{prefix}-")]
+
+    def completed_features(self) -> List[str]:
+        """Active features whose tasks are all checked."""
+        names = []
+        tasks_stub = FeatureScaffolder(self.specs_dir.parent).stub_patterns().get('tasks.md')
+        with os.scandir(self.specs_dir) as entries:
+            for entry in entries:
+                if (entry.is_dir() and not entry.name.startswith('.')
+                        and is_feature_completed(Path(entry.path), tasks_stub)):
+                    names.append(entry.name)
+        return sorted(names, key=feature_sort_key)
+
+    # ── archive / restore ──
+
+    def archive(self, feature: str) -> Dict:
+        """
+        Move specs/<feature> into specs/.archive/<feature>.zip.
+
+        The zip is complete and the index updated before the directory is
+        removed, so an interrupted run leaves the feature in place.
+        """
+        feature_dir = self.specs_dir / feature
+        if not feature_dir.is_dir():
+            raise ValueError(f"Feature directory not found: {feature_dir}")
+        match = FEATURE_PREFIX_RE.match(feature)
+        if not match:
+            raise ValueError(f"Not a numbered feature: {feature}")
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        zip_path = self.zip_path(feature)
+        temp_path = self.dir / f".{feature}.zip.{os.getpid()}.tmp"
+        files = size = 0
+        with zipfile.ZipFile(temp_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            for dirpath, dirnames, filenames in os.walk(feature_dir):
+                dirnames.sort()
+                relative_dir = Path(dirpath).relative_to(self.specs_dir)
+                if not filenames and not dirnames:
+                    zf.writestr(f"{relative_dir.as_posix()}/", b'')
+                for name in sorted(filenames):
+                    path = Path(dirpath) / name
+                    zf.write(path, (relative_dir / name).as_posix())
+                    files += 1
+                    size += path.stat().st_size
+        os.replace(temp_path, zip_path)
+
+        index = self._load_index()
+        record = {"number": int(match.group(1)), "archived": date.today().isoformat(),
+                  "files": files, "size": size}
+        index["features"][feature] = record
+        index["highest"] = max(int(index.get("highest", 0)), record["number"])
+        self._save_index()
+
+        shutil.rmtree(feature_dir)
+        return record
+
+    def restore(self, feature: str) -> Path:
+        """Extract an archived feature back into specs/ and drop it from the archive."""
+        zip_path = self.zip_path(feature)
+        if feature not in self._load_index()["features"] or not zip_path.is_file():
+            raise ValueError(f"Feature is not archived: {feature}")
+
+        try:
+            with zipfile.ZipFile(zip_path) as zf:
+                for member in zf.namelist():
+                    # Only the feature's own directory may be written
+                    if not member.startswith(f"{feature}/") or '..' in Path(member).parts:
+                        raise ValueError(f"Unexpected path in {zip_path.name}: {member}")
+                zf.extractall(self.specs_dir)
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"Corrupt archive {zip_path.name}: {e}")
+
+        # "highest" is kept, the number stays reserved either way
+        del self._load_index()["features"][feature]
+        self._save_index()
+        zip_path.unlink()
+        return self.specs_dir / feature
+
+
+# ═══════════════════════════════════════════════════════════════
+# Main Execution
+# ═══════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description='Archive completed features out of specs/')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = subparsers.add_parser('list', help='List archived features')
+    list_parser.add_argument('--json', action='store_true', help='Output in JSON format')
+
+    archive_parser = subparsers.add_parser('archive', help='Move features into the archive')
+    archive_parser.add_argument('features', nargs='*', help='Feature directory names or number prefixes')
+    archive_parser.add_argument('--completed', action='store_true',
+                                help='Archive every feature whose tasks are all checked')
+    archive_parser.add_argument('--dry-run', action='store_true', help='Only show what would be archived')
+
+    restore_parser = subparsers.add_parser('restore', help='Move a feature back into specs/')
+    restore_parser.add_argument('feature', help='Feature directory name or number prefix')
+
+    args = parser.parse_args()
+
+    specs_dir = get_repo_root() / 'specs'
+    archive = SpecArchive(specs_dir)
+
+    if args.command == 'list':
+        features = archive.features()
+        if args.json:
+            print(json.dumps({"highest": archive.highest(), "features": features}, ensure_ascii=False))
+            return
+        if not features:
+            log_info("No archived features")
+            return
+        for name, record in features.items():
+            print(f"{name}  {record.get('archived', '')}  {record.get('files', 0)} files")
+        return
+
+    if args.command == 'restore':
+        names = [args.feature] if args.feature in archive.features() else archive.find(args.feature)
+        if len(names) != 1:
+            log_warn(f"No single archived feature matches: {args.feature}")
+            sys.exit(1)
+        try:
+            log_success(f"Restored {archive.restore(names[0])}")
+        except (OSError, ValueError) as e:
+            log_error(str(e))
+            sys.exit(1)
+        return
+
+    names: List[str] = []
+    for requested in args.features:
+        if (specs_dir / requested).is_dir():
+            names.append(requested)
+        else:
+            matches = [p.name for p in specs_dir.glob(f"{requested}-*") if p.is_dir()]
+            if len(matches) != 1:
+                log_warn(f"No single feature directory matches: {requested}")
+                sys.exit(1)
+            names.append(matches[0])
+    if args.completed:
+        names.extend(name for name in archive.completed_features() if name not in names)
+    if not names:
+        log_info("Nothing to archive")
+        return
+
+    for name in names:
+        if args.dry_run:
+            print(f"would archive {name}")
+            continue
+        try:
+            record = archive.archive(name)
+        except (OSError, ValueError) as e:
+            log_error(f"Cannot archive {name}: {e}")
+            sys.exit(1)
+        log_success(f"Archived {name} ({record['files']} files)")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
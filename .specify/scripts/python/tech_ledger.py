@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tech-stack ledger built from every feature plan
+
+The ledger records the language, frameworks, storage and project type of each
+specs/*/plan.md in .specify/.cache/tech-ledger.json. It is refreshed
+incrementally: plans whose size and mtime are unchanged are skipped, and a
+changed plan is only re-parsed when its content hash differs.
+
+Values are normalized (known technology names get a canonical spelling,
+placeholders such as "N/A" are dropped, comma/plus separated lists are split
+and de-duplicated), so the Active Technologies section of the agent files can
+be generated from the ledger instead of accumulating one line per feature.
+
+Usage: python tech_ledger.py [--rebuild] [--json] [--workers N]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from common import (
+    PLAN_PLACEHOLDER_VALUES,
+    feature_sort_key,
+    get_repo_root,
+    log_info,
+    log_success,
+    log_warn,
+    parse_plan_bytes,
+)
+
+
+LEDGER_VERSION = 2
+
+# Values that mean "nothing declared" in a plan field
+_EMPTY_VALUES = frozenset(v.lower() for v in PLAN_PLACEHOLDER_VALUES) | {"", "none", "n/a", "-", "tbd"}
+
+# Canonical spelling of well-known technology names (keyed by lowercase name)
+CANONICAL_NAMES: Dict[str, str] = {
+    "python": "Python",
+    "py": "Python",
+    "typescript": "TypeScript",
+    "ts": "TypeScript",
+    "javascript": "JavaScript",
+    "js": "JavaScript",
+    "node": "Node.js",
+    "nodejs": "Node.js",
+    "node.js": "Node.js",
+    "go": "Go",
+    "golang": "Go",
+    "rust": "Rust",
+    "java": "Java",
+    "kotlin": "Kotlin",
+    "swift": "Swift",
+    "c#": "C#",
+    "csharp": "C#",
+    "c++": "C++",
+    "cpp": "C++",
+    "ruby": "Ruby",
+    "php": "PHP",
+    "dart": "Dart",
+    "elixir": "Elixir",
+    "scala": "Scala",
+    "fastapi": "FastAPI",
+    "django": "Django",
+    "flask": "Flask",
+    "sqlalchemy": "SQLAlchemy",
+    "pydantic": "Pydantic",
+    "pytest": "pytest",
+    "react": "React",
+    "vue": "Vue",
+    "angular": "Angular",
+    "next.js": "Next.js",
+    "nextjs": "Next.js",
+    "express": "Express",
+    "spring": "Spring",
+    "gin": "Gin",
+    "axum": "Axum",
+    "postgres": "PostgreSQL",
+    "postgresql": "PostgreSQL",
+    "mysql": "MySQL",
+    "mariadb": "MariaDB",
+    "sqlite": "SQLite",
+    "mongodb": "MongoDB",
+    "mongo": "MongoDB",
+    "redis": "Redis",
+    "elasticsearch": "Elasticsearch",
+    "kafka": "Kafka",
+    "s3": "S3",
+}
+
+# Plans parsed in a process pool once at least this many need parsing
+PARALLEL_PARSE_THRESHOLD = 64
+
+_LIST_SEPARATOR_RE = re.compile(r'\s*(?:,|;|\s\+\s|\band\b)\s*')
+_WHITESPACE_RE = re.compile(r'\s+')
+_VERSION_PREFIX_RE = re.compile(r'^[vV](?=\d)')
+
+
+def get_ledger_path(repo_root: Path) -> Path:
+    """Location of the ledger file."""
+    return repo_root / ".specify" / ".cache" / "tech-ledger.json"
+
+
+# ═══════════════════════════════════════════════════════════════
+# Normalization
+# ═══════════════════════════════════════════════════════════════
+
+def normalize_term(value: str) -> str:
+    """
+    Normalize a single technology term, e.g. "python  v3.11" -> "Python 3.11".
+
+    The first word is mapped to its canonical spelling when known, a "v"
+    prefix is dropped from version numbers and whitespace is collapsed.
+    Returns "" for placeholders.
+    """
+    value = _WHITESPACE_RE.sub(" ", value).strip().strip(".")
+    if value.lower() in _EMPTY_VALUES:
+        return ""
+
+    words = value.split(" ")
+    words[0] = CANONICAL_NAMES.get(words[0].lower(), words[0])
+    if len(words) > 1:
+        words[1] = _VERSION_PREFIX_RE.sub("", words[1])
+    return " ".join(words)
+
+
+def normalize_list(value: str) -> List[str]:
+    """Split a comma/plus separated field into normalized, de-duplicated terms."""
+    terms: List[str] = []
+    seen = set()
+    # Separators inside parentheses (e.g. "FastAPI (with uvicorn, gunicorn)") are kept
+    for part in _split_outside_parens(value):
+        term = normalize_term(part)
+        if term and term.lower() not in seen:
+            seen.add(term.lower())
+            terms.append(term)
+    return terms
+
+
+def _split_outside_parens(value: str) -> List[str]:
+    parts: List[str] = []
+    depth = 0
+    start = 0
+    masked = []
+    for ch in value:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth = max(0, depth - 1)
+        # Hide separators inside parentheses from the split regex
+        masked.append("\0" if depth and ch in ",;+" else ch)
+    masked_value = "".join(masked)
+
+    for match in _LIST_SEPARATOR_RE.finditer(masked_value):
+        parts.append(value[start:match.start()])
+        start = match.end()
+    parts.append(value[start:])
+    return parts
+
+
+def _plan_value(plan, name: str) -> str:
+    """A plan field, or "" while it still holds the template's [e.g., ...] placeholder."""
+    value = plan.field(name)
+    if value.startswith("[") and value.endswith("]"):
+        return ""
+    return value
+
+
+def extract_plan_technologies(data: bytes) -> Dict[str, object]:
+    """Parse plan.md content into a normalized ledger record."""
+    plan = parse_plan_bytes(data)
+    return {
+        "language": normalize_term(_plan_value(plan, "Language/Version")),
+        "frameworks": normalize_list(_plan_value(plan, "Primary Dependencies")),
+        "storage": normalize_list(_plan_value(plan, "Storage")),
+        "project_type": normalize_term(_plan_value(plan, "Project Type")),
+    }
+
+
+# ═══════════════════════════════════════════════════════════════
+# Ledger
+# ═══════════════════════════════════════════════════════════════
+
+class TechLedger:
+    """Normalized technology records of every feature plan, keyed by feature directory name."""
+
+    def __init__(self, repo_root: Path, features: Optional[Dict[str, Dict]] = None):
+        self.repo_root = repo_root
+        self.path = get_ledger_path(repo_root)
+        self.features: Dict[str, Dict] = features or {}
+        self.parsed = 0
+        self.changed = False
+
+    @classmethod
+    def load(cls, repo_root: Path) -> "TechLedger":
+        """Load the ledger file; a missing, corrupt or outdated file gives an empty ledger."""
+        path = get_ledger_path(repo_root)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == LEDGER_VERSION and isinstance(data.get("features"), dict):
+                return cls(repo_root, data["features"])
+        except (OSError, ValueError, AttributeError):
+            pass
+        return cls(repo_root)
+
+    def refresh(self, workers: Optional[int] = None) -> bool:
+        """
+        Bring the ledger up to date with specs/*/plan.md.
+
+        Plans are stat'ed and hashed in this process; when at least
+        PARALLEL_PARSE_THRESHOLD of them need parsing they are parsed in a
+        process pool of the given size (default: CPU count).
+
+        Returns True if any record was added, changed or removed.
+        """
+        specs_dir = self.repo_root / "specs"
+        seen = set()
+        pending: List[Tuple[str, Dict, bytes]] = []
+
+        try:
+            entries = sorted(
+                (entry for entry in os.scandir(specs_dir) if entry.is_dir() and not entry.name.startswith(".")),
+                key=lambda entry: feature_sort_key(entry.name),
+            )
+        except OSError:
+            entries = []
+
+        for entry in entries:
+            plan_file = os.path.join(entry.path, "plan.md")
+            try:
+                st = os.stat(plan_file)
+            except OSError:
+                continue
+            seen.add(entry.name)
+            item = self._check_feature(entry.name, plan_file, st)
+            if item:
+                pending.append(item)
+
+        if pending:
+            for (name, record, _), technologies in zip(pending, _parse_plans([data for _, _, data in pending], workers)):
+                record.update(technologies)
+                self.features[name] = record
+            self.parsed += len(pending)
+            self.changed = True
+
+        for name in [name for name in self.features if name not in seen]:
+            del self.features[name]
+            self.changed = True
+
+        return self.changed
+
+    def _check_feature(self, name: str, plan_file: str,
+                       st: os.stat_result) -> Optional[Tuple[str, Dict, bytes]]:
+        """Return (name, new record, content) if the plan needs parsing."""
+        record = self.features.get(name)
+        if record and record.get("mtime_ns") == st.st_mtime_ns and record.get("size") == st.st_size:
+            return None
+
+        try:
+            with open(plan_file, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        digest = hashlib.sha256(data).hexdigest()
+        if record and record.get("sha256") == digest:
+            # Touched but unchanged: remember the new stat so it is skipped next time
+            record["mtime_ns"] = st.st_mtime_ns
+            record["size"] = st.st_size
+            self.changed = True
+            return None
+
+        return name, {"sha256": digest, "mtime_ns": st.st_mtime_ns, "size": st.st_size}, data
+
+    def feature_names(self) -> List[str]:
+        """Feature names in feature-number order."""
+        return sorted(self.features, key=feature_sort_key)
+
+    def save(self) -> bool:
+        """Write the ledger atomically if it changed; returns True if written."""
+        if not self.changed and self.path.is_file():
+            return False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": LEDGER_VERSION, "features": {name: self.features[name] for name in self.feature_names()}}
+
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".tech-ledger.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        self.changed = False
+        return True
+
+    def technologies(self) -> List[Tuple[str, List[str]]]:
+        """
+        Distinct technologies and the features using them, in feature order.
+
+        The language and frameworks of a plan form one stack entry
+        (e.g. "Python 3.11 + FastAPI, SQLAlchemy"); every storage value is an
+        entry of its own.
+        """
+        users: Dict[str, List[str]] = {}
+        for name in self.feature_names():
+            record = self.features[name]
+            stack = format_stack(record.get("language", ""), record.get("frameworks", []))
+            for tech in ([stack] if stack else []) + list(record.get("storage", [])):
+                users.setdefault(tech, []).append(name)
+        return list(users.items())
+
+    def active_technology_lines(self) -> List[str]:
+        """Active Technologies entries for the agent files."""
+        return [f"- {tech} ({', '.join(features)})" for tech, features in self.technologies()]
+
+    def change_entries(self, limit: int) -> List[str]:
+        """Recent Changes entries for the last features that declare a technology, newest first."""
+        entries: List[str] = []
+        for name in reversed(self.feature_names()):
+            record = self.features[name]
+            entry = format_change_entry(name, record.get("language", ""),
+                                        record.get("frameworks", []), record.get("storage", []))
+            if entry:
+                entries.append(entry)
+                if len(entries) >= limit:
+                    break
+        return entries
+
+
+def _parse_plans(contents: List[bytes], workers: Optional[int]) -> List[Dict[str, object]]:
+    """Parse plan contents, in a process pool when there are many of them."""
+    if len(contents) >= PARALLEL_PARSE_THRESHOLD and workers != 1:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(contents) // (workers * 4))
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(extract_plan_technologies, contents, chunksize=chunksize))
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            # No usable multiprocessing support (e.g. sandboxed /dev/shm): parse serially
+            pass
+    return [extract_plan_technologies(data) for data in contents]
+
+
+def format_stack(language: str, frameworks: List[str]) -> str:
+    """Join a language and its frameworks the way agent files list them."""
+    framework = ", ".join(frameworks)
+    if language and framework:
+        return f"{language} + {framework}"
+    return language or framework
+
+
+def format_change_entry(feature: str, language: str, frameworks: List[str], storage: List[str]) -> str:
+    """
+    Recent Changes entry of a feature, e.g. "- 001-user-auth: Added Python 3.11 + FastAPI".
+
+    Takes normalized values; the storage is listed only when there is no
+    language or framework. Returns "" when the feature declares nothing.
+    """
+    added = format_stack(language, frameworks) or ", ".join(storage)
+    return f"- {feature}: Added {added}" if added else ""
+
+
+def load_tech_ledger(repo_root: Path, workers: Optional[int] = None) -> TechLedger:
+    """Load, refresh and persist the ledger of a repository."""
+    ledger = TechLedger.load(repo_root)
+    ledger.refresh(workers)
+    try:
+        ledger.save()
+    except OSError as e:
+        # The ledger is a cache; a read-only checkout still gets the refreshed data
+        log_warn(f"Failed to write tech ledger {ledger.path}: {e}")
+    return ledger
+
+
+# ═══════════════════════════════════════════════════════════════
+# Main Execution
+# ═══════════════════════════════════════════════════════════════
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the tech-stack ledger from all feature plans')
+    parser.add_argument('--rebuild', action='store_true', help='Discard the ledger and re-parse every plan')
+    parser.add_argument('--json', action='store_true', help='Output the technologies in JSON format')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes used to parse plans (default: CPU count, 1 disables the pool)')
+    args = parser.parse_args()
+
+    repo_root = get_repo_root()
+    if args.rebuild:
+        ledger = TechLedger(repo_root)
+        ledger.refresh(args.workers)
+        ledger.save()
+    else:
+        ledger = load_tech_ledger(repo_root, args.workers)
+
+    if args.json:
+        print(json.dumps({tech: features for tech, features in ledger.technologies()}, ensure_ascii=False))
+        return
+
+    log_info(f"Tech ledger: {len(ledger.features)} plans, {ledger.parsed} parsed")
+    for line in ledger.active_technology_lines():
+        print(line)
+    log_success(f"Ledger written to {ledger.path}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(130)
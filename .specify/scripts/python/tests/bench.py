@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks for the scripts
+
+Not collected by the test runners; run by hand from .specify/scripts/python:
+
+    python tests/bench.py              # every benchmark
+    python tests/bench.py knowledge    # only the named ones
+
+Each benchmark prints one line per measurement: the best of several rounds,
+so the numbers reflect the code rather than a noisy neighbour.
+"""
+
+import argparse
+import sys
+import time
+from typing import Callable, Dict, List
+
+import support
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {}
+
+
+def benchmark(name: str):
+    def register(func: Callable[[], None]) -> Callable[[], None]:
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def best_of(func: Callable[[], object], rounds: int = 5) -> float:
+    """Fastest wall time of func over rounds runs, in seconds."""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(label: str, seconds: float, per: int = 0):
+    line = f"  {label:<48} {seconds * 1000:9.2f} ms"
+    if per:
+        line += f"  ({seconds / per * 1e6:.1f} us each)"
+    print(line)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Benchmarks
+# ═══════════════════════════════════════════════════════════════
+
+@benchmark('knowledge')
+def bench_knowledge():
+    """Command -> document resolution for every command in knowledge-config."""
+    from knowledge_loader import KnowledgeConfig, PathIndex, load_json_config, resolve_command_knowledge
+
+    data = load_json_config(support.REPO_ROOT)
+    config = KnowledgeConfig(support.REPO_ROOT, data)
+    commands = [name.split(' --type ') if ' --type ' in name else [name, ""] for name, _ in config.targets]
+    print(f"knowledge: {len(commands)} commands")
+
+    def lookups(cfg: KnowledgeConfig):
+        for command, checklist_type in commands:
+            for doc in cfg.command(command, checklist_type).get('documents', []):
+                cfg.full_path(doc.get('level', 'L2'), doc.get('path', ''))
+
+    rounds = 200
+    report("accessors, fresh KnowledgeConfig each pass",
+           best_of(lambda: [lookups(KnowledgeConfig(support.REPO_ROOT, data)) for _ in range(rounds)]) / rounds)
+    report("accessors, memoized",
+           best_of(lambda: [lookups(config) for _ in range(rounds)]) / rounds)
+
+    def resolve_all(index: PathIndex):
+        for command, checklist_type in commands:
+            resolve_command_knowledge(config, command, checklist_type, index)
+
+    report("full resolution, fresh PathIndex", best_of(lambda: resolve_all(PathIndex())), len(commands))
+    shared = PathIndex()
+    report("full resolution, shared PathIndex", best_of(lambda: resolve_all(shared)), len(commands))
+
+
+PLAN_FIELDS = ("Language/Version", "Primary Dependencies", "Storage", "Project Type")
+
+
+def make_plan(size: int) -> str:
+    """A plan.md of about size bytes: the template's header and context, then many sections."""
+    head = (
+        "# Implementation Plan: Bench\n\n"
+        "## Technical Context\n\n"
+        "**Language/Version**: Python 3.11\n"
+        "**Primary Dependencies**: FastAPI, SQLAlchemy\n"
+        "**Storage**: PostgreSQL\n"
+        "**Project Type**: web\n\n"
+    )
+    section = (
+        "## Phase {n}\n\n"
+        "Some prose about the phase, long enough to look like a real plan paragraph.\n\n"
+        "```python\n**Storage**: not a field inside code\nprint({n})\n```\n\n"
+        "- [ ] T{n:04d} task line\n\n"
+    )
+    parts = [head]
+    n = total = 0
+    while total < size:
+        chunk = section.format(n=n)
+        parts.append(chunk)
+        total += len(chunk)
+        n += 1
+    return "".join(parts)
+
+
+@benchmark('plan')
+def bench_plan():
+    """plan.md parsing: per-field regex re-reads vs PlanDocument (fields, then sections) vs the hash cache."""
+    import re
+    import tempfile
+    from pathlib import Path
+    import common
+    from common import PlanDocument, load_plan_document
+
+    def per_field_regex(plan_file: Path):
+        # What parse_plan_data did before PlanDocument: read and search once per field
+        for name in PLAN_FIELDS:
+            content = plan_file.read_text(encoding='utf-8')
+            re.search(rf'^\*\*{re.escape(name)}\*\*:\s*(.+)$', content, re.MULTILINE)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (100_000, 300_000, 800_000):
+            plan_file = Path(tmp) / f"plan-{size}.md"
+            text = make_plan(size)
+            plan_file.write_text(text, encoding='utf-8')
+            print(f"plan: {len(text) // 1024} KB")
+            report("per-field regex, 4 fields", best_of(lambda: per_field_regex(plan_file)))
+            report("PlanDocument fields", best_of(lambda: PlanDocument(text)))
+            report("PlanDocument fields + sections", best_of(lambda: PlanDocument(text).sections))
+
+            def cold_load():
+                common._plan_cache.clear()
+                load_plan_document(plan_file)
+            report("load_plan_document, cold", best_of(cold_load))
+            load_plan_document(plan_file)
+            report("load_plan_document, cached", best_of(lambda: load_plan_document(plan_file)))
+
+
+def git_branch_scan() -> int:
+    """What create-new-feature.py did before reading refs directly: parse `git branch -a`."""
+    import re
+    import subprocess
+    highest = 0
+    result = subprocess.run(['git', 'branch', '-a'], capture_output=True, text=True, check=True)
+    for line in result.stdout.strip().split('\n'):
+        branch = re.sub(r'^remotes/[^/]+/', '', re.sub(r'^[* ]+', '', line))
+        match = re.match(r'^(\d{3,})-', branch)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest
+
+
+@benchmark('refs')
+def bench_refs():
+    """Highest feature number over 100k branches: `git branch -a` vs packed-refs / loose refs scans."""
+    import os
+    import subprocess
+    import tempfile
+    from pathlib import Path
+    import common
+
+    count = 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = support.make_repo(Path(tmp) / 'repo')
+        head = support.git(repo, 'rev-parse', 'HEAD')
+        # Half local feature branches, half remote-tracking ones, plus non-feature noise
+        commands = []
+        for n in range(count):
+            ref = f"refs/heads/{n + 1:03d}-feature" if n % 2 else f"refs/remotes/origin/{n + 1:03d}-feature"
+            commands.append(f"create {ref} {head}\n")
+            if n % 10 == 0:
+                commands.append(f"create refs/heads/topic/{n}-not-a-feature {head}\n")
+        subprocess.run(['git', 'update-ref', '--stdin'], cwd=repo, env=support.GIT_ENV,
+                       input=''.join(commands), text=True, check=True)
+
+        cwd = os.getcwd()
+        os.chdir(repo)
+        try:
+            for layout in ('loose', 'packed'):
+                if layout == 'packed':
+                    support.git(repo, 'pack-refs', '--all')
+                print(f"refs: {len(commands)} {layout} refs")
+                assert common.get_highest_feature_number_from_refs() == git_branch_scan() == count
+                report("git branch -a + regex per line", best_of(git_branch_scan, rounds=3))
+                report("git for-each-ref with feature pattern",
+                       best_of(common._highest_from_for_each_ref, rounds=3))
+                report("get_highest_feature_number_from_refs",
+                       best_of(common.get_highest_feature_number_from_refs, rounds=3))
+        finally:
+            os.chdir(cwd)
+
+
+@benchmark('agent-writer')
+def bench_agent_writer():
+    """Agent file writes: in-place write_text vs one AgentFileTransaction over every target."""
+    import tempfile
+    from pathlib import Path
+
+    agent_context = support.load_script('update-agent-context.py')
+    content = ("# Agent context\n\n" + "- line of generated guidance\n" * 400).encode('utf-8')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (16, 64, 256):
+            targets = [Path(tmp) / f"agents-{count}" / f"AGENT-{n:03d}.md" for n in range(count)]
+            targets[0].parent.mkdir()
+            for target in targets:
+                target.write_bytes(content)
+            print(f"agent-writer: {count} targets, {len(content) // 1024} KB each")
+
+            def in_place():
+                for target in targets:
+                    target.write_bytes(content)
+
+            def transaction():
+                with agent_context.AgentFileTransaction() as txn:
+                    for target in targets:
+                        txn.stage(target, content)
+                    txn.commit()
+
+            report("write_bytes in place (not crash-safe)", best_of(in_place), count)
+            report("AgentFileTransaction stage + commit", best_of(transaction), count)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Main Execution
+# ═══════════════════════════════════════════════════════════════
+
+def main(argv: List[str]):
+    parser = argparse.ArgumentParser(description='Run script micro-benchmarks')
+    parser.add_argument('names', nargs='*', help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+
+if __name__ == '__main__':
+    try:
+        main(sys.argv[1:])
+    except KeyboardInterrupt:
+        sys.exit(130)
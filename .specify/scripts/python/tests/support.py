@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Shared helpers for the script tests
+
+Puts the scripts directory on sys.path so the tests import modules the same
+way the scripts do (`from common import ...`), and loads the hyphenated
+scripts (create-new-feature.py, update-agent-context.py, ...) by path.
+
+Run from .specify/scripts/python:
+
+    python -m unittest discover -s tests
+    python -m pytest -q tests
+"""
+
+import importlib.util
+import os
+import subprocess
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import List
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+SPECIFY_DIR = SCRIPTS_DIR.parent.parent
+REPO_ROOT = SPECIFY_DIR.parent
+
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+# Commits made by the tests must not depend on the user's git identity
+GIT_ENV = dict(os.environ,
+               GIT_AUTHOR_NAME="test", GIT_AUTHOR_EMAIL="test@example.com",
+               GIT_COMMITTER_NAME="test", GIT_COMMITTER_EMAIL="test@example.com")
+
+
+def load_script(filename: str) -> ModuleType:
+    """Import a script whose file name is not a valid module name."""
+    module_name = filename[:-3].replace('-', '_')
+    spec = importlib.util.spec_from_file_location(module_name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def git(cwd: Path, *args: str) -> str:
+    """Run git in cwd and return its stripped stdout."""
+    result = subprocess.run(['git', *args], cwd=cwd, env=GIT_ENV,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def make_repo(path: Path, branches: List[str] = ()) -> Path:
+    """A git repository with one commit on master and the given extra branches."""
+    path.mkdir(parents=True, exist_ok=True)
+    git(path, 'init', '-q', '-b', 'master')
+    (path / 'README.md').write_text("test\n", encoding='utf-8')
+    git(path, 'add', 'README.md')
+    git(path, 'commit', '-q', '-m', 'init')
+    for branch in branches:
+        git(path, 'branch', branch)
+    return path
+
+
+def install_scripts(repo: Path) -> Path:
+    """Copy the scripts (and the data files they read) into repo/.specify; returns the scripts dir."""
+    target = repo / '.specify' / 'scripts' / 'python'
+    target.mkdir(parents=True, exist_ok=True)
+    for source in SCRIPTS_DIR.glob('*.py'):
+        (target / source.name).write_bytes(source.read_bytes())
+    for name in ('pinyin-initials.txt',):
+        source = SPECIFY_DIR / name
+        if source.is_file():
+            (repo / '.specify' / name).write_bytes(source.read_bytes())
+    return target
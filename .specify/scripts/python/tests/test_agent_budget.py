@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Token budget compaction: feature ranges and the shared overflow file."""
+
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from support import load_script
+
+agent_context = load_script('update-agent-context.py')
+
+
+def agent_file(technologies) -> str:
+    lines = ["# Project Development Guidelines", "", "## Active Technologies"]
+    lines += [f"- {tech} with a fairly long description ({n:03d}-feature-{n})"
+              for n, tech in enumerate(technologies, 1)]
+    lines += ["", "## Recent Changes", "- 001-feature-1: Added Python", ""]
+    return "\n".join(lines)
+
+
+class CollapseFeaturesTest(unittest.TestCase):
+
+    def test_ranges(self):
+        self.assertEqual(agent_context.collapse_features(
+            ["001-user-auth", "002-payments", "003-search", "007-admin", "main"]), "001..003, 007, main")
+
+    def test_each_endpoint_keeps_its_width(self):
+        self.assertEqual(agent_context.collapse_features(["998-a", "999-b", "1000-c", "1001-d"]), "998..1001")
+        self.assertEqual(agent_context.collapse_features(["999-b", "1002-c"]), "999, 1002")
+        self.assertEqual(agent_context.collapse_features(["01-x", "002-y", "1000-z"]), "002, 1000, 01-x")
+
+
+class OverflowFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        agent_context.config = agent_context.AgentConfig(
+            self.root, {'CURRENT_BRANCH': '001-feature-1', 'HAS_GIT': 'false', 'IMPL_PLAN': ''})
+
+    def tearDown(self):
+        agent_context.config = None
+        self._tmp.cleanup()
+
+    def test_parallel_agents_share_one_overflow_file(self):
+        # Each agent file overflows with its own technologies
+        contents = {
+            self.root / f"AGENT{i}.md": agent_file([f"Tech{i}x{n}" for n in range(40)])
+            for i in range(4)
+        }
+
+        with agent_context.AgentFileTransaction() as transaction:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(
+                    lambda item: agent_context.enforce_token_budget(item[0], "Agent", item[1], 120),
+                    contents.items()))
+            for target, content in zip(contents, results):
+                self.assertIn("more: see [.specify/memory/active-technologies.md]", content)
+                transaction.stage(target, content.encode('utf-8'))
+            self.assertTrue(agent_context.commit_agent_files(transaction))
+
+        overflow = (self.root / agent_context.OVERFLOW_FILE).read_text(encoding='utf-8')
+        for i in range(4):
+            for n in range(40):
+                self.assertIn(f"- Tech{i}x{n} with a fairly long description", overflow)
+
+    def test_unchanged_overflow_file_is_not_restaged(self):
+        content = agent_file([f"Tech{n}" for n in range(40)])
+        target = self.root / "AGENT.md"
+        for _ in range(2):
+            with agent_context.AgentFileTransaction() as transaction:
+                agent_context.enforce_token_budget(target, "Agent", content, 120)
+                self.assertTrue(agent_context.stage_overflow_file(transaction))
+                staged = len(transaction)
+                transaction.commit()
+        self.assertEqual(staged, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""AgentFileTransaction: all-or-nothing agent file writes under injected failures."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from support import SCRIPTS_DIR, load_script
+
+agent_context = load_script('update-agent-context.py')
+AgentFileTransaction = agent_context.AgentFileTransaction
+
+TARGETS = ('CLAUDE.md', 'GEMINI.md', '.github/copilot-instructions.md', 'AGENTS.md', 'NEW.md')
+
+
+class TransactionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.targets = [self.root / name for name in TARGETS]
+        # Every target but the last exists before the transaction
+        for target in self.targets[:-1]:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(self.old(target))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    @staticmethod
+    def old(target: Path) -> bytes:
+        return f"old {target.name}\n".encode()
+
+    @staticmethod
+    def new(target: Path) -> bytes:
+        return f"new {target.name}\n".encode() * 100
+
+    def stage_all(self, transaction: AgentFileTransaction):
+        for target in self.targets:
+            transaction.stage(target, self.new(target), f"updated {target.name}")
+
+    def assert_unchanged(self):
+        for target in self.targets[:-1]:
+            self.assertEqual(target.read_bytes(), self.old(target), target.name)
+        self.assertFalse(self.targets[-1].exists())
+
+    def assert_no_leftovers(self):
+        expected = {target.relative_to(self.root) for target in self.targets if target.exists()}
+        actual = {path.relative_to(self.root) for path in self.root.rglob('*') if path.is_file()}
+        self.assertEqual(actual, expected)
+
+
+class CommitTest(TransactionTestCase):
+
+    def test_commit_replaces_every_target(self):
+        with AgentFileTransaction() as transaction:
+            self.stage_all(transaction)
+            messages = transaction.commit()
+        self.assertEqual(len(messages), len(self.targets))
+        for target in self.targets:
+            self.assertEqual(target.read_bytes(), self.new(target))
+        self.assert_no_leftovers()
+
+    def test_restaging_keeps_last_content(self):
+        with AgentFileTransaction() as transaction:
+            transaction.stage(self.targets[0], b"first\n")
+            transaction.stage(self.targets[0], b"second\n")
+            self.assertEqual(len(transaction), 1)
+            transaction.commit()
+        self.assertEqual(self.targets[0].read_bytes(), b"second\n")
+        self.assert_no_leftovers()
+
+    def test_exit_without_commit_discards(self):
+        with AgentFileTransaction() as transaction:
+            self.stage_all(transaction)
+        self.assert_unchanged()
+        self.assert_no_leftovers()
+
+
+class CrashInjectionTest(TransactionTestCase):
+
+    def test_replace_failure_rolls_back_every_target(self):
+        real_replace = os.replace
+        for fail_at in range(1, len(self.targets) + 1):
+            with self.subTest(fail_at=fail_at):
+                calls = []
+
+                def failing_replace(src, dst):
+                    # Only the staged -> target renames count; rollback renames pass
+                    if str(src).endswith('.tmp'):
+                        calls.append(dst)
+                        if len(calls) == fail_at:
+                            raise OSError("injected replace failure")
+                    return real_replace(src, dst)
+
+                with AgentFileTransaction() as transaction:
+                    self.stage_all(transaction)
+                    with mock.patch.object(agent_context.os, 'replace', failing_replace):
+                        with self.assertRaises(OSError):
+                            transaction.commit()
+                self.assert_unchanged()
+                self.assert_no_leftovers()
+
+    def test_fsync_failure_touches_nothing(self):
+        with AgentFileTransaction() as transaction:
+            self.stage_all(transaction)
+            with mock.patch.object(agent_context, '_fsync_path', side_effect=OSError("injected fsync failure")):
+                with self.assertRaises(OSError):
+                    transaction.commit()
+        self.assert_unchanged()
+        self.assert_no_leftovers()
+
+    def test_interrupt_during_commit_rolls_back(self):
+        real_replace = os.replace
+        calls = []
+
+        def interrupted_replace(src, dst):
+            if str(src).endswith('.tmp'):
+                calls.append(dst)
+                if len(calls) == 3:
+                    raise KeyboardInterrupt
+            return real_replace(src, dst)
+
+        with AgentFileTransaction() as transaction:
+            self.stage_all(transaction)
+            with mock.patch.object(agent_context.os, 'replace', interrupted_replace):
+                with self.assertRaises(KeyboardInterrupt):
+                    transaction.commit()
+        self.assert_unchanged()
+        self.assert_no_leftovers()
+
+    def test_process_killed_mid_commit_leaves_whole_files(self):
+        # A hard kill cannot be rolled back, but no target may be torn:
+        # each one holds either its complete old or complete new content
+        script = textwrap.dedent(f"""
+            import os, sys
+            from pathlib import Path
+            sys.path.insert(0, {str(SCRIPTS_DIR)!r})
+            sys.path.insert(0, {str(Path(__file__).resolve().parent)!r})
+            from support import load_script
+            module = load_script('update-agent-context.py')
+            real_replace = os.replace
+            calls = []
+            def dying_replace(src, dst):
+                if str(src).endswith('.tmp'):
+                    calls.append(dst)
+                    if len(calls) == 3:
+                        os._exit(9)
+                return real_replace(src, dst)
+            module.os.replace = dying_replace
+            transaction = module.AgentFileTransaction()
+            for name in {list(TARGETS)!r}:
+                target = Path({str(self.root)!r}) / name
+                transaction.stage(target, f"new {{target.name}}\\n".encode() * 100)
+            transaction.commit()
+        """)
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True)
+        self.assertEqual(result.returncode, 9, result.stderr.decode())
+
+        updated = 0
+        for target in self.targets:
+            if target.exists():
+                content = target.read_bytes()
+                self.assertIn(content, (self.old(target), self.new(target)), target.name)
+                updated += content == self.new(target)
+        self.assertEqual(updated, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""--batch: one number range, one JSON array, and nothing left behind when the manifest or a ref fails."""
+
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import GIT_ENV, git, install_scripts, make_repo
+
+MANIFEST = [json.dumps(entry) for entry in (
+    {"description": "Add user authentication", "short_name": "alpha"},
+    {"description": "Export invoices", "short_name": "beta"},
+    "Audit log for admins",
+)]
+
+
+class BatchFeaturesTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo = make_repo(Path(self._tmp.name) / 'repo')
+        self.scripts = install_scripts(self.repo)
+        self.manifest = Path(self._tmp.name) / 'features.jsonl'
+        self.reservations = self.repo / '.specify' / '.cache' / 'feature-numbers'
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write_manifest(self, lines):
+        self.manifest.write_text(''.join(line + "\n" for line in lines), encoding='utf-8')
+
+    def run_batch(self, script: str, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, str(self.scripts / script), '--batch', str(self.manifest),
+                               '--json', *args], cwd=self.repo, env=GIT_ENV, capture_output=True, text=True)
+
+    def branches(self):
+        return git(self.repo, 'branch', '--format=%(refname:short)').split()
+
+    def feature_dirs(self):
+        specs = self.repo / 'specs'
+        return sorted(p.name for p in specs.iterdir()) if specs.is_dir() else []
+
+    def reserved(self):
+        if not self.reservations.is_dir():
+            return []
+        return sorted(p.name for p in self.reservations.iterdir() if p.name.isdigit())
+
+    def test_manifest_gets_one_number_range(self):
+        git(self.repo, 'branch', '004-existing')
+        self.write_manifest(MANIFEST)
+        result = self.run_batch('create-new-feature.py', '--no-checkout')
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        # A single JSON array on stdout
+        features = json.loads(result.stdout)
+        self.assertEqual([f['FEATURE_NUM'] for f in features], ['005', '006', '007'])
+        self.assertEqual([f['BRANCH_NAME'] for f in features][:2], ['005-alpha', '006-beta'])
+        for feature in features:
+            self.assertIn(feature['BRANCH_NAME'], self.branches())
+            self.assertTrue(Path(feature['SPEC_FILE']).is_file())
+        self.assertEqual(git(self.repo, 'branch', '--show-current'), 'master')
+
+    def test_simple_creator_manifest_gets_one_number_range(self):
+        (self.repo / 'specs' / '002-existing').mkdir(parents=True)
+        self.write_manifest(MANIFEST)
+        result = self.run_batch('create-simple-feature.py')
+        self.assertEqual(result.returncode, 0, result.stderr)
+        features = json.loads(result.stdout)
+        self.assertEqual([Path(f['FEATURE_DIR']).name.split('-', 1)[0] for f in features], ['003', '004', '005'])
+
+    def test_bad_manifest_line_creates_nothing(self):
+        self.write_manifest([MANIFEST[0], '{"description":', MANIFEST[1]])
+        for script in ('create-new-feature.py', 'create-simple-feature.py'):
+            result = self.run_batch(script, *(['--no-checkout'] if script == 'create-new-feature.py' else []))
+            self.assertEqual(result.returncode, 1, script)
+            self.assertIn(f"{self.manifest}:2:", result.stdout + result.stderr)
+            self.assertEqual(self.feature_dirs(), [])
+            self.assertEqual(self.branches(), ['master'])
+            self.assertEqual(self.reserved(), [])
+
+    def test_ref_clash_creates_no_branches_and_releases_numbers(self):
+        # "002-beta/wip" is not a feature branch, so numbering ignores it, but
+        # it keeps the transaction from creating refs/heads/002-beta
+        git(self.repo, 'branch', '002-beta/wip')
+        self.write_manifest(MANIFEST)
+        result = self.run_batch('create-new-feature.py', '--no-checkout')
+        self.assertEqual(result.returncode, 1)
+        self.assertIn('Error creating branches', result.stderr)
+        self.assertEqual(json.loads(result.stdout), [])
+        self.assertEqual(sorted(self.branches()), ['002-beta/wip', 'master'])
+        self.assertEqual(self.feature_dirs(), [])
+        self.assertEqual(self.reserved(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""create-new-feature.py against a local bare repository standing in for the remote."""
+
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from support import GIT_ENV, git, install_scripts, make_repo
+
+
+class RemoteRefsTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        tmp = Path(self._tmp.name)
+        upstream = make_repo(tmp / 'upstream')
+        git(tmp, 'clone', '-q', '--bare', str(upstream), str(tmp / 'remote.git'))
+
+        self.local = tmp / 'local'
+        git(tmp, 'clone', '-q', str(tmp / 'remote.git'), str(self.local))
+
+        # "other" then pushes a feature branch that "local" has not fetched yet
+        other = tmp / 'other'
+        git(tmp, 'clone', '-q', str(tmp / 'remote.git'), str(other))
+        git(other, 'push', '-q', 'origin', 'HEAD:refs/heads/005-pushed-elsewhere')
+
+        self.script = install_scripts(self.local) / 'create-new-feature.py'
+        self.stamp = self.local / '.specify' / '.cache' / 'last-fetch-attempt'
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def create(self, *args: str, ttl: int = 3600) -> dict:
+        env = dict(GIT_ENV, SPECIFY_FETCH_TTL=str(ttl))
+        result = subprocess.run([sys.executable, str(self.script), '--json', '--no-checkout', *args],
+                                cwd=self.local, env=env, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def remote_branches(self):
+        return git(self.local, 'branch', '-r', '--format=%(refname:short)').split()
+
+    def mark_fetched(self):
+        self.stamp.parent.mkdir(parents=True, exist_ok=True)
+        self.stamp.touch()
+
+    def test_fresh_refs_are_used_without_fetching(self):
+        self.mark_fetched()
+        self.assertEqual(self.create('first feature')['FEATURE_NUM'], '001')
+        self.assertNotIn('origin/005-pushed-elsewhere', self.remote_branches())
+
+    def test_fetch_flag_fetches_before_numbering(self):
+        self.mark_fetched()
+        self.assertEqual(self.create('--fetch', 'first feature')['FEATURE_NUM'], '006')
+        self.assertIn('origin/005-pushed-elsewhere', self.remote_branches())
+
+    def test_stale_refs_start_a_background_fetch(self):
+        # The run itself does not wait for the network
+        self.assertEqual(self.create('first feature', ttl=0)['FEATURE_NUM'], '001')
+        self.assertTrue(self.stamp.is_file())
+
+        deadline = time.time() + 30
+        while 'origin/005-pushed-elsewhere' not in self.remote_branches():
+            self.assertLess(time.time(), deadline, "background fetch did not finish")
+            time.sleep(0.1)
+
+        # The next run numbers above the fetched branch
+        self.assertEqual(self.create('second feature')['FEATURE_NUM'], '006')
+
+    def test_no_fetch_never_touches_the_remote(self):
+        self.assertEqual(self.create('--no-fetch', 'first feature', ttl=0)['FEATURE_NUM'], '001')
+        self.assertFalse(self.stamp.exists())
+        self.assertFalse((self.local / '.git' / 'FETCH_HEAD').exists())
+        time.sleep(0.5)
+        self.assertNotIn('origin/005-pushed-elsewhere', self.remote_branches())
+
+    def test_repo_without_remotes_never_fetches(self):
+        git(self.local, 'remote', 'remove', 'origin')
+        self.assertEqual(self.create('first feature', ttl=0)['FEATURE_NUM'], '001')
+        self.assertFalse(self.stamp.exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""create-new-feature.py --no-checkout / --worktree: the current checkout is left alone."""
+
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import GIT_ENV, git, install_scripts, make_repo
+
+
+class FeatureCheckoutTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo = make_repo(Path(self._tmp.name) / 'repo')
+        self.script = install_scripts(self.repo) / 'create-new-feature.py'
+        self.reservations = self.repo / '.specify' / '.cache' / 'feature-numbers'
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def create(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, str(self.script), '--json', '--short-name', 'demo', *args,
+                               'Demo feature'], cwd=self.repo, env=GIT_ENV, capture_output=True, text=True)
+
+    def test_no_checkout_keeps_head_and_index(self):
+        (self.repo / 'README.md').write_text("staged change\n", encoding='utf-8')
+        git(self.repo, 'add', 'README.md')
+        head = git(self.repo, 'rev-parse', 'HEAD')
+        index = git(self.repo, 'diff', '--cached')
+
+        result = self.create('--no-checkout')
+        self.assertEqual(result.returncode, 0, result.stderr)
+        feature = json.loads(result.stdout)
+
+        self.assertEqual(git(self.repo, 'symbolic-ref', 'HEAD'), 'refs/heads/master')
+        self.assertEqual(git(self.repo, 'rev-parse', 'HEAD'), head)
+        self.assertEqual(git(self.repo, 'diff', '--cached'), index)
+        self.assertEqual(git(self.repo, 'rev-parse', feature['BRANCH_NAME']), head)
+        self.assertEqual(Path(feature['SPEC_FILE']), self.repo / 'specs' / '001-demo' / 'spec.md')
+        self.assertNotIn('WORKTREE', feature)
+
+    def test_worktree_holds_the_spec(self):
+        result = self.create('--worktree')
+        self.assertEqual(result.returncode, 0, result.stderr)
+        feature = json.loads(result.stdout)
+
+        worktree = self.repo.parent / 'repo.worktrees' / '001-demo'
+        self.assertEqual(Path(feature['WORKTREE']), worktree)
+        self.assertEqual(Path(feature['SPEC_FILE']), worktree / 'specs' / '001-demo' / 'spec.md')
+        self.assertTrue(Path(feature['SPEC_FILE']).is_file())
+        self.assertFalse((self.repo / 'specs' / '001-demo').exists())
+        self.assertEqual(git(worktree, 'branch', '--show-current'), '001-demo')
+        self.assertEqual(git(self.repo, 'branch', '--show-current'), 'master')
+
+    def test_clashing_branch_releases_its_number(self):
+        # The counter skips released numbers, so each mode gets the next one
+        for number, mode in (('001', '--no-checkout'), ('002', '--worktree')):
+            # Not a feature branch, so numbering ignores it, but refs/heads/NNN-demo cannot be created
+            git(self.repo, 'branch', f"{number}-demo/wip")
+            result = self.create(mode)
+            self.assertEqual(result.returncode, 1, mode)
+            self.assertIn('Error creating branches', result.stderr)
+            self.assertEqual([p.name for p in self.reservations.iterdir() if p.name.isdigit()], [], mode)
+            self.assertFalse((self.repo / 'specs' / f"{number}-demo").exists())
+        self.assertFalse((self.repo.parent / 'repo.worktrees').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""FeatureNumberAllocator under contention: 64 concurrent creators, every number unique."""
+
+import json
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+from support import SCRIPTS_DIR, install_scripts
+
+CREATORS = 64
+
+
+def run_all(commands, cwd: Path):
+    """Start every command at once and return their stdout, failing on any error."""
+    processes = [subprocess.Popen(command, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+                 for command in commands]
+    outputs = []
+    for process in processes:
+        stdout, stderr = process.communicate(timeout=120)
+        if process.returncode != 0:
+            raise AssertionError(f"creator failed ({process.returncode}): {stderr}")
+        outputs.append(stdout)
+    return outputs
+
+
+class ConcurrentCreatorsTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        (self.root / 'specs' / '003-existing').mkdir(parents=True)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_concurrent_reservations_are_unique(self):
+        # Every process waits for the go file, so the reservations really overlap
+        go = self.root / 'go'
+        script = textwrap.dedent(f"""
+            import sys, time
+            from pathlib import Path
+            sys.path.insert(0, {str(SCRIPTS_DIR)!r})
+            from feature_numbers import FeatureNumberAllocator
+            allocator = FeatureNumberAllocator(Path({str(self.root)!r}))
+            while not Path({str(go)!r}).exists():
+                time.sleep(0.001)
+            print(allocator.reserve(3, sys.argv[1]))
+        """)
+        commands = [[sys.executable, '-c', script, f"creator-{i}"] for i in range(CREATORS)]
+        processes = [subprocess.Popen(command, cwd=self.root, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                      text=True) for command in commands]
+        go.touch()
+        numbers = []
+        for process in processes:
+            stdout, stderr = process.communicate(timeout=120)
+            self.assertEqual(process.returncode, 0, stderr)
+            numbers.append(int(stdout))
+
+        self.assertEqual(sorted(numbers), list(range(4, 4 + CREATORS)))
+        reserved = sorted(int(p.name) for p in (self.root / '.specify' / '.cache' / 'feature-numbers').iterdir()
+                          if p.name.isdigit())
+        self.assertEqual(reserved, sorted(numbers))
+
+    def test_concurrent_feature_creators_get_unique_directories(self):
+        script = install_scripts(self.root) / 'create-simple-feature.py'
+        outputs = run_all([[sys.executable, str(script), '--json', '--short-name', f"feature-{i}", f"Feature {i}"]
+                           for i in range(CREATORS)], self.root)
+
+        numbers = [int(json.loads(output)['FEATURE_NUM']) for output in outputs]
+        self.assertEqual(sorted(numbers), list(range(4, 4 + CREATORS)))
+        created = [p.name for p in (self.root / 'specs').iterdir() if p.name != '003-existing']
+        self.assertEqual(len(created), CREATORS)
+        self.assertEqual(len({name.split('-', 1)[0] for name in created}), CREATORS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Feature numbers past 999: numbered, accepted as branches and found as spec directories."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import git, load_script, make_repo
+
+import common
+
+create_new_feature = load_script('create-new-feature.py')
+update_agent_context = load_script('update-agent-context.py')
+
+
+class FeaturePrefixTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo = make_repo(Path(self._tmp.name) / 'repo', ['999-last-three-digit', 'topic/2000-not-a-feature'])
+        cwd = os.getcwd()
+        os.chdir(self.repo)
+        self.addCleanup(os.chdir, cwd)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_highest_from_loose_and_packed_refs(self):
+        git(self.repo, 'branch', '1000-foo')
+        self.assertEqual(common.get_highest_feature_number_from_refs(), 1000)
+        git(self.repo, 'pack-refs', '--all')
+        git(self.repo, 'update-ref', 'refs/remotes/origin/1001-bar', 'HEAD')
+        self.assertEqual(common.get_highest_feature_number_from_refs(), 1001)
+        git(self.repo, 'pack-refs', '--all')
+        self.assertEqual(common.get_highest_feature_number_from_refs(), 1001)
+        self.assertEqual(common._highest_from_for_each_ref(), 1001)
+
+    def test_four_digit_branch_is_a_feature_branch(self):
+        self.assertEqual(common.check_feature_branch('1000-foo', True), (True, None))
+        self.assertEqual(common.check_feature_branch('999-bar', True), (True, None))
+        self.assertFalse(common.check_feature_branch('99-bar', True)[0])
+        self.assertFalse(common.check_feature_branch('main', True)[0])
+
+    def test_four_digit_branch_finds_its_spec_directory(self):
+        specs = self.repo / 'specs'
+        (specs / '1000-foo').mkdir(parents=True)
+        (specs / '100-other').mkdir()
+        self.assertEqual(common.find_feature_dir_by_prefix(self.repo, '1000-fix-typo'), specs / '1000-foo')
+        self.assertEqual(create_new_feature.get_highest_from_specs(specs), 1000)
+
+    def test_short_prefix_is_not_a_feature_number(self):
+        self.assertEqual(common.feature_sort_key('1000-foo'), (1000, '1000-foo'))
+        self.assertEqual(common.feature_sort_key('12-foo'), (-1, '12-foo'))
+        self.assertEqual(update_agent_context.collapse_features(['001-a', '002-b', '12-foo']), "001..002, 12-foo")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""feature_status / spec_archive: scaffolded template output counts as missing, real content does not."""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import SPECIFY_DIR
+
+from feature_status import FeatureStatusIndex, load_feature_status
+from scaffold import FeatureScaffolder
+from spec_archive import SpecArchive, is_feature_completed
+
+
+class TemplateStubTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo = Path(self._tmp.name)
+        shutil.copytree(SPECIFY_DIR / 'templates', self.repo / '.specify' / 'templates')
+        self.feature = self.repo / 'specs' / '001-login'
+        FeatureScaffolder(self.repo).scaffold(self.feature, '001-login', 'Add a login page')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def status(self) -> dict:
+        [record] = load_feature_status(self.repo, workers=1).records()
+        return record
+
+    def test_scaffolded_feature_is_new(self):
+        record = self.status()
+        self.assertEqual(record["stage"], "new")
+        self.assertEqual(record["tasks"], {"done": 0, "total": 0})
+        for artifact in ('spec.md', 'plan.md', 'tasks.md'):
+            self.assertIn(artifact, record["missing"])
+        self.assertFalse(is_feature_completed(self.feature))
+        self.assertEqual(SpecArchive(self.repo / 'specs').completed_features(), [])
+
+    def test_edited_files_count(self):
+        spec = self.feature / 'spec.md'
+        spec.write_text(spec.read_text(encoding='utf-8').replace('[Brief Title]', 'Sign in'), encoding='utf-8')
+        self.assertEqual(self.status()["stage"], "specified")
+
+        (self.feature / 'plan.md').write_text("# Plan\n\nServer-rendered form.\n", encoding='utf-8')
+        (self.feature / 'tasks.md').write_text("- [x] T001 Form\n- [x] T002 Session\n", encoding='utf-8')
+        record = self.status()
+        self.assertEqual(record["stage"], "completed")
+        self.assertEqual(record["tasks"], {"done": 2, "total": 2})
+        self.assertTrue(is_feature_completed(self.feature))
+        self.assertEqual(SpecArchive(self.repo / 'specs').completed_features(), ['001-login'])
+
+    def test_unrendered_copy_and_empty_file_are_stubs(self):
+        templates = self.repo / '.specify' / 'templates'
+        shutil.copyfile(templates / 'spec-template.md', self.feature / 'spec.md')
+        (self.feature / 'plan.md').write_text("", encoding='utf-8')
+        self.assertEqual(self.status()["stage"], "new")
+
+        (self.feature / 'spec.md').write_text("# Login\n", encoding='utf-8')
+        record = self.status()
+        self.assertEqual(record["stage"], "specified")
+        self.assertIn('plan.md', record["missing"])
+
+    def test_template_change_rebuilds_index(self):
+        load_feature_status(self.repo, workers=1)
+        tasks_template = self.repo / '.specify' / 'templates' / 'tasks-template.md'
+        tasks_template.write_text("# Tasks\n\n- [ ] T001 Sample\n", encoding='utf-8')
+        # The old scaffold output no longer matches: it is real content now
+        self.assertEqual(FeatureStatusIndex.load(self.repo).refresh(workers=1), True)
+        self.assertEqual(self.status()["tasks"], {"done": 0, "total": 34})
+
+
+if __name__ == '__main__':
+    unittest.main()
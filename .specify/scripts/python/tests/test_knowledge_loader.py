@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""knowledge_loader.PathIndex：glob 与标准库一致，递归模式记录经过的每个目录"""
+
+import glob
+import tempfile
+import unittest
+from pathlib import Path
+
+import support  # noqa: F401  (把脚本目录加入 sys.path)
+
+from knowledge_loader import PathIndex
+
+
+def _touch(path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("x" * 40, encoding='utf-8')
+
+
+class PathIndexGlobTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.base = Path(self._tmp.name)
+        for name in ('a.md', 'b.txt', '.hidden.md', 'docs/c.md', 'docs/api/d.md',
+                     'docs/api/v2/e.md', 'docs/.private/f.md', 'other/g.md'):
+            _touch(self.base / name)
+        (self.base / 'docs' / 'empty').mkdir()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_matches_stdlib_glob(self):
+        for pattern in ('*.md', 'docs/*.md', '*/*.md', '**/*.md', 'docs/**/*.md',
+                        'docs/**', '**/api/*.md', 'docs/**/v2/*.md', 'missing/**/*.md'):
+            expected = sorted(Path(p) for p in glob.glob(str(self.base / pattern), recursive=True)
+                              if Path(p).is_file())
+            self.assertEqual(PathIndex().glob(self.base, pattern), expected, pattern)
+
+    def test_recursive_glob_records_every_walked_directory(self):
+        index = PathIndex()
+        index.start_recording()
+        index.glob(self.base, 'docs/**/*.md')
+        recorded = index.stop_recording()
+        for directory in ('docs', 'docs/api', 'docs/api/v2', 'docs/empty'):
+            self.assertIn(str(self.base / directory), recorded, directory)
+        # 隐藏目录和 pattern 之外的目录不会被访问
+        self.assertNotIn(str(self.base / 'docs' / '.private'), recorded)
+        self.assertNotIn(str(self.base / 'other'), recorded)
+
+    def test_new_subdirectory_found_after_invalidate(self):
+        index = PathIndex()
+        before = index.glob(self.base, 'docs/**/*.md')
+
+        # watch 轮询时，docs/empty 的 mtime 变化会使其列表失效
+        _touch(self.base / 'docs' / 'empty' / 'new' / 'h.md')
+        index.invalidate(str(self.base / 'docs' / 'empty'))
+
+        after = index.glob(self.base, 'docs/**/*.md')
+        self.assertEqual(sorted(set(after) - set(before)), [self.base / 'docs' / 'empty' / 'new' / 'h.md'])
+
+
+if __name__ == '__main__':
+    unittest.main()
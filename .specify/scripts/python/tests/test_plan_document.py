@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""PlanDocument: fields of plan.md up front, sections and code blocks on first access."""
+
+import re
+import unittest
+
+from support import SPECIFY_DIR
+
+from common import PlanDocument, parse_plan_bytes
+
+PLAN = """# Implementation Plan: Demo
+
+## Summary
+
+Short summary.
+
+## Technical Context
+
+**Language/Version**: Python 3.11
+**Primary Dependencies**: FastAPI, SQLAlchemy
+**Storage**: N/A
+**Project Type**: web
+
+```text
+**Language/Version**: not a field
+# not a heading
+```
+
+### Notes
+
+**Storage**: PostgreSQL
+"""
+
+
+class PlanDocumentTest(unittest.TestCase):
+
+    def test_fields_match_per_field_regex(self):
+        # The regex each field lookup used before PlanDocument
+        plan = PlanDocument(PLAN)
+        for name in ("Language/Version", "Primary Dependencies", "Project Type"):
+            match = re.search(rf'^\*\*{re.escape(name)}\*\*:\s*(.+)$', PLAN, re.MULTILINE)
+            self.assertEqual(plan.field(name), match.group(1).strip(), name)
+
+    def test_placeholders_and_first_occurrence(self):
+        plan = PlanDocument(PLAN)
+        # First occurrence wins, and N/A reads as empty
+        self.assertEqual(plan.field("Storage"), "")
+        self.assertEqual(plan.section_fields["Notes"]["Storage"], "PostgreSQL")
+        self.assertEqual(plan.technical_context["Project Type"], "web")
+
+    def test_sections_and_code_blocks(self):
+        plan = PlanDocument(PLAN)
+        self.assertEqual([s.title for s in plan.sections],
+                         ["Implementation Plan: Demo", "Summary", "Technical Context", "Notes"])
+        self.assertEqual(plan.section_text("Summary"), "Short summary.")
+        self.assertEqual(len(plan.code_blocks), 1)
+        self.assertEqual(plan.code_blocks[0].language, "text")
+        self.assertEqual(plan.code_blocks[0].section, "Technical Context")
+        self.assertNotIn("not a heading", [s.title for s in plan.sections])
+
+    def test_fields_do_not_build_sections(self):
+        text = PLAN + "\n  ```\n**Storage**: inside an indented fence\n  ```\n**Testing**: pytest\n"
+        plan = PlanDocument(text)
+        self.assertEqual(plan.field("Testing"), "pytest")
+        self.assertIsNone(plan._sections)
+        self.assertIsNone(plan._section_fields)
+        self.assertEqual(plan.section_fields["Notes"], {"Storage": "PostgreSQL", "Testing": "pytest"})
+        self.assertEqual(plan.sections[-1].title, "Notes")
+        self.assertEqual(plan.sections[-1].end, len(text.split('\n')))
+
+    def test_parse_cache_by_content(self):
+        data = PLAN.encode('utf-8')
+        self.assertIs(parse_plan_bytes(data), parse_plan_bytes(bytes(data)))
+        self.assertIsNot(parse_plan_bytes(data), parse_plan_bytes(data + b"\n"))
+
+    def test_template_parses(self):
+        template = SPECIFY_DIR / 'templates' / 'plan-template.md'
+        plan = PlanDocument(template.read_text(encoding='utf-8'))
+        self.assertIsNotNone(plan.section("Technical Context"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Recent Changes: one entry format for both update modes, one entry per feature."""
+
+import unittest
+
+from support import load_script
+
+from tech_ledger import extract_plan_technologies, format_change_entry
+
+agent_context = load_script('update-agent-context.py')
+
+PLAN = b"""# Implementation Plan
+
+## Technical Context
+
+**Language/Version**: python v3.11
+**Primary Dependencies**: fastapi, sqlalchemy
+**Storage**: postgresql
+**Project Type**: web
+"""
+
+AGENT_FILE = """# Project Development Guidelines
+
+Last updated: 2025-01-01
+
+## Recent Changes
+- 003-search: Added Go 1.22
+- 002-billing: Added Node.js 20
+- 001-user-auth: Added Python 3.10
+
+<!-- MANUAL ADDITIONS START -->
+"""
+
+
+def single_update(branch: str, lang: str, framework: str, db: str):
+    return agent_context.AgentUpdate(branch, lang, framework, db, "web", "demo", "2025-02-02")
+
+
+class RecentChangesTest(unittest.TestCase):
+
+    def test_single_and_bulk_mode_format_the_same_entry(self):
+        # Single mode gets the raw plan values, bulk mode the normalized ledger record
+        record = extract_plan_technologies(PLAN)
+        bulk = format_change_entry("004-orders", record["language"], record["frameworks"], record["storage"])
+        single = single_update("004-orders", "python v3.11", "fastapi, sqlalchemy", "postgresql")
+        self.assertEqual(single.change_entries, [bulk])
+        self.assertEqual(single.template_values["[LAST 3 FEATURES AND WHAT THEY ADDED]"], bulk)
+
+    def test_storage_only_and_empty_features(self):
+        self.assertEqual(format_change_entry("005-cache", "", [], ["Redis"]), "- 005-cache: Added Redis")
+        self.assertEqual(single_update("006-docs", "N/A", "", "N/A").change_entries, [])
+
+    def test_new_entry_replaces_the_feature_entry_without_archiving_it(self):
+        update = single_update("001-user-auth", "Python 3.11", "", "")
+        patched, trimmed = agent_context.patch_agent_content(AGENT_FILE, update)
+        self.assertIn("- 001-user-auth: Added Python 3.11\n- 003-search: Added Go 1.22\n"
+                      "- 002-billing: Added Node.js 20\n", patched)
+        self.assertNotIn("Python 3.10", patched)
+        self.assertEqual(trimmed, [])
+
+    def test_only_features_that_fall_off_are_trimmed(self):
+        update = single_update("004-orders", "Python 3.11", "", "")
+        patched, trimmed = agent_context.patch_agent_content(AGENT_FILE, update)
+        self.assertEqual(trimmed, ["- 001-user-auth: Added Python 3.10"])
+        self.assertIn("- 004-orders: Added Python 3.11\n- 003-search: Added Go 1.22\n", patched)
+
+    def test_rerun_is_unchanged(self):
+        update = single_update("003-search", "Go 1.22", "", "")
+        self.assertEqual(agent_context.patch_agent_content(AGENT_FILE, update), (AGENT_FILE, []))
+
+
+if __name__ == '__main__':
+    unittest.main()
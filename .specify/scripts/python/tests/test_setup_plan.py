@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""setup-plan.py: renders plan.md with the scaffolder's values and keeps an existing plan."""
+
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+from support import GIT_ENV, SPECIFY_DIR, git, install_scripts, make_repo
+
+
+class SetupPlanTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo = make_repo(Path(self._tmp.name) / 'repo')
+        git(self.repo, 'checkout', '-q', '-b', '001-demo')
+        self.script = install_scripts(self.repo) / 'setup-plan.py'
+        templates = self.repo / '.specify' / 'templates'
+        templates.mkdir()
+        (templates / 'plan-template.md').write_bytes((SPECIFY_DIR / 'templates' / 'plan-template.md').read_bytes())
+        self.plan = self.repo / 'specs' / '001-demo' / 'plan.md'
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def setup_plan(self) -> dict:
+        result = subprocess.run([sys.executable, str(self.script), '--json'], cwd=self.repo, env=GIT_ENV,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return json.loads(result.stdout)
+
+    def test_renders_feature_values(self):
+        self.assertEqual(self.setup_plan()['IMPL_PLAN'], str(self.plan))
+        content = self.plan.read_text(encoding='utf-8')
+        for slot in ('[###-feature-name]', '[DATE]', '[FEATURE]'):
+            self.assertNotIn(slot, content)
+        self.assertIn('001-demo', content)
+        self.assertIn(date.today().isoformat(), content)
+
+    def test_existing_plan_is_kept(self):
+        self.plan.parent.mkdir(parents=True)
+        self.plan.write_text("# My plan\n", encoding='utf-8')
+        self.setup_plan()
+        self.assertEqual(self.plan.read_text(encoding='utf-8'), "# My plan\n")
+
+    def test_empty_plan_is_rendered(self):
+        # create-simple-feature.py leaves an empty plan.md behind
+        self.plan.parent.mkdir(parents=True)
+        self.plan.touch()
+        self.setup_plan()
+        self.assertIn('001-demo', self.plan.read_text(encoding='utf-8'))
+
+
+if __name__ == '__main__':
+    unittest.main()
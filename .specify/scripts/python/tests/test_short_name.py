@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""ShortNameEngine: CJK transliteration, accent folding, the fallback, and English parity with the old naming."""
+
+import re
+import unittest
+
+from common import (
+    SHORT_NAME_STOP_WORDS,
+    ShortNameEngine,
+    clean_short_name,
+    generate_short_name,
+)
+
+ENGLISH = [
+    "Add user authentication system",
+    "Implement OAuth2 integration for API",
+    "I want to create a dashboard for the analytics team",
+    "Fix bug in the payment processing flow",
+    "Support CSV and JSON export of reports",
+    "We need an S3 backed file upload",
+    "Real-time chat with typing indicators",
+    "Audit log for admins",
+    "Refactor caching layer to use Redis cluster mode",
+    "UI for 2FA setup",
+    "  leading and trailing   spaces  ",
+    "x",
+]
+
+
+def old_short_name(description: str, allow_four: bool) -> str:
+    """The [a-z0-9] naming both creators used before ShortNameEngine, with the shared stop words."""
+    words = [word for word in re.sub(r'[^a-z0-9]', ' ', description.lower()).split()
+             if word not in SHORT_NAME_STOP_WORDS and (len(word) >= 3 or word.upper() in description)]
+    if words:
+        return '-'.join(words[:4 if allow_four and len(words) == 4 else 3])
+    cleaned = re.sub(r'-+', '-', re.sub(r'[^a-z0-9]', '-', description.lower())).strip('-')
+    return '-'.join([p for p in cleaned.split('-') if p][:3])
+
+
+class ShortNameTest(unittest.TestCase):
+
+    def test_chinese_descriptions(self):
+        self.assertEqual(generate_short_name("添加用户认证系统"), "yhrzxt")
+        self.assertEqual(generate_short_name("支持 OAuth2 登录"), "oauth2-dl")
+
+    def test_accents_are_folded(self):
+        # The old [a-z0-9] filter split the word: "k-che"
+        self.assertEqual(clean_short_name("Küche"), "kuche")
+        self.assertEqual(generate_short_name("Küche Café planner"), "kuche-cafe-planner")
+
+    def test_fallback_to_feature(self):
+        for description in ("!!!", "???  ---"):
+            self.assertEqual(generate_short_name(description), "feature", description)
+
+    def test_pluggable_transliteration(self):
+        engine = ShortNameEngine({'用': 'yong', '户': 'hu'})
+        self.assertEqual(engine.generate("添加用户"), "yonghu")
+        # Characters missing from the table are dropped
+        self.assertEqual(engine.generate("用户 login 系统"), "yonghu-login")
+
+    def test_english_matches_old_naming(self):
+        for description in ENGLISH:
+            for allow_four in (False, True):
+                with self.subTest(description=description, allow_four=allow_four):
+                    self.assertEqual(generate_short_name(description, allow_four=allow_four),
+                                     old_short_name(description, allow_four))
+
+    def test_stop_word_union(self):
+        # "make" and "use" used to be stop words only in create-simple-feature.py
+        self.assertEqual(generate_short_name("Make the API use JWT tokens", allow_four=True), "api-jwt-tokens")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""spec_archive: feature lookup reports archived features and never restores them."""
+
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import GIT_ENV, git, install_scripts, make_repo
+
+from spec_archive import SpecArchive
+
+
+class ArchivedLookupTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo = make_repo(Path(self._tmp.name) / 'repo')
+        self.scripts = install_scripts(self.repo)
+        self.specs = self.repo / 'specs'
+        feature = self.specs / '004-done'
+        feature.mkdir(parents=True)
+        (feature / 'spec.md').write_text("# Done\n", encoding='utf-8')
+        (feature / 'plan.md').write_text("# Plan\n", encoding='utf-8')
+        (feature / 'tasks.md').write_text("- [x] T001 done\n", encoding='utf-8')
+        SpecArchive(self.specs).archive('004-done')
+        self.zip = self.specs / '.archive' / '004-done.zip'
+        git(self.repo, 'checkout', '-q', '-b', '004-follow-up')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def run_script(self, name: str, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run([sys.executable, str(self.scripts / name), *args], cwd=self.repo, env=GIT_ENV,
+                              capture_output=True, text=True)
+
+    def assert_still_archived(self):
+        self.assertTrue(self.zip.is_file())
+        self.assertFalse((self.specs / '004-done').exists())
+        self.assertIn('004-done', SpecArchive(self.specs).features())
+
+    def test_paths_only_reports_the_archive(self):
+        result = self.run_script('check-prerequisites.py', '--paths-only', '--json')
+        self.assertEqual(result.returncode, 0, result.stderr)
+        paths = json.loads(result.stdout)
+        self.assertEqual(paths['FEATURE_DIR'], str(self.specs / '004-done'))
+        self.assertEqual(paths['FEATURE_ARCHIVE'], str(self.zip))
+        self.assertIn('archived', result.stderr)
+        self.assert_still_archived()
+
+    def test_validation_and_setup_plan_point_to_restore(self):
+        for name, args in (('check-prerequisites.py', ['--json']), ('setup-plan.py', ['--json'])):
+            result = self.run_script(name, *args)
+            self.assertEqual(result.returncode, 1, name)
+            self.assertIn('spec_archive.py restore 004-done', result.stderr)
+            self.assert_still_archived()
+
+    def test_explicit_restore(self):
+        result = self.run_script('spec_archive.py', 'restore', '004')
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertFalse(self.zip.exists())
+        self.assertEqual((self.specs / '004-done' / 'plan.md').read_text(encoding='utf-8'), "# Plan\n")
+
+        result = self.run_script('check-prerequisites.py', '--json')
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout)['FEATURE_DIR'], str(self.specs / '004-done'))
+
+
+if __name__ == '__main__':
+    unittest.main()
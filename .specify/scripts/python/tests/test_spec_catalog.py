@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""spec-catalog.py: features read from branch trees, ranked by source, with spec variants counted."""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import GIT_ENV, git, install_scripts, load_script, make_repo
+
+spec_catalog = load_script('spec-catalog.py')
+
+
+def spec(title: str, status: str) -> str:
+    return f"# Feature Specification: {title}\n\n**Created**: 2026-01-05\n**Status**: {status}\n"
+
+
+def commit_files(repo: Path, files: dict, message: str):
+    for relative, content in files.items():
+        path = repo / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+    git(repo, 'add', *files)
+    git(repo, 'commit', '-q', '-m', message)
+
+
+class SpecCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.repo = make_repo(Path(self._tmp.name) / 'repo')
+        cwd = os.getcwd()
+        os.chdir(self.repo)
+        self.addCleanup(os.chdir, cwd)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def make_features(self, repo: Path):
+        """master has 001 (draft) and 003; 001-auth approves 001; 002-search adds 002 on top of master."""
+        commit_files(repo, {
+            'specs/001-auth/spec.md': spec("Auth", "Draft"),
+            'specs/001-auth/plan.md': "**Language/Version**: Python 3.11\n**Storage**: PostgreSQL\n",
+            'specs/003-billing/spec.md': spec("Billing", "Draft"),
+        }, "specs")
+        git(repo, 'checkout', '-q', '-b', '001-auth')
+        commit_files(repo, {'specs/001-auth/spec.md': spec("Auth", "Approved")}, "approve auth")
+        git(repo, 'checkout', '-q', '-b', '002-search', 'master')
+        commit_files(repo, {'specs/002-search/spec.md': spec("Search", "Draft")}, "search")
+        git(repo, 'checkout', '-q', 'master')
+
+    def catalog(self, order) -> dict:
+        reader = spec_catalog.GitObjectReader()
+        self.addCleanup(reader.close)
+        catalog = spec_catalog.SpecCatalog(reader)
+        refs = dict(spec_catalog.list_refs(spec_catalog.DEFAULT_REF_PATTERNS))
+        for refname in order:
+            catalog.add_ref(refname, refs[refname])
+        return {record["feature"]: record for record in catalog.records()}
+
+    def test_own_branch_then_head_then_first_ref(self):
+        self.make_features(self.repo)
+        # Other refs first, so the ranking (not the order) has to pick the source
+        records = self.catalog(['refs/heads/002-search', 'HEAD', 'refs/heads/001-auth'])
+
+        auth = records['001-auth']
+        self.assertEqual(auth["source"], 'refs/heads/001-auth')
+        self.assertEqual(auth["spec"]["status"], "Approved")
+        self.assertEqual(auth["variants"], 2)
+        self.assertEqual(auth["branches"], ['refs/heads/002-search', 'HEAD', 'refs/heads/001-auth'])
+        self.assertEqual(auth["artifacts"], ['plan.md', 'spec.md'])
+        self.assertEqual(auth["plan"]["storage"], ["PostgreSQL"])
+
+        billing = records['003-billing']
+        self.assertEqual(billing["source"], 'HEAD')
+        self.assertEqual(billing["variants"], 1)
+
+        search = records['002-search']
+        self.assertEqual(search["source"], 'refs/heads/002-search')
+        self.assertEqual(search["spec"]["title"], "Search")
+        self.assertEqual(search["branches"], ['refs/heads/002-search'])
+
+    def test_sha256_repository(self):
+        repo = Path(self._tmp.name) / 'sha256'
+        git(Path(self._tmp.name), 'init', '-q', '--object-format=sha256', '-b', 'master', str(repo))
+        commit_files(repo, {'README.md': "test\n"}, "init")
+        self.make_features(repo)
+        os.chdir(repo)
+        records = self.catalog(['HEAD', 'refs/heads/001-auth', 'refs/heads/002-search'])
+        self.assertEqual(sorted(records), ['001-auth', '002-search', '003-billing'])
+        self.assertEqual(records['001-auth']["spec"]["status"], "Approved")
+        self.assertEqual(records['001-auth']["variants"], 2)
+
+    def test_cli_json(self):
+        self.make_features(self.repo)
+        script = install_scripts(self.repo) / 'spec-catalog.py'
+        result = subprocess.run([sys.executable, str(script), '--json', '1'], cwd=self.repo, env=GIT_ENV,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        data = json.loads(result.stdout)
+        self.assertEqual(data["refs"], 3)
+        [auth] = data["features"]
+        self.assertEqual((auth["feature"], auth["source"], auth["variants"]), ('001-auth', 'refs/heads/001-auth', 2))
+
+    def test_empty_repository(self):
+        repo = Path(self._tmp.name) / 'empty'
+        git(Path(self._tmp.name), 'init', '-q', str(repo))
+        script = install_scripts(repo) / 'spec-catalog.py'
+        result = subprocess.run([sys.executable, str(script), '--json'], cwd=repo, env=GIT_ENV,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout), {"refs": 0, "features": []})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""yaml_lite：knowledge-config.yaml 与 knowledge-config.json 一致性，以及编译缓存"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from support import SPECIFY_DIR
+
+from yaml_lite import YamlSubsetError, _strip_meta, load_yaml_file, parse_yaml
+
+
+class ConfigParityTest(unittest.TestCase):
+
+    def test_yaml_matches_json(self):
+        yaml_file = SPECIFY_DIR / 'knowledge-config.yaml'
+        json_file = SPECIFY_DIR / 'knowledge-config.json'
+        with open(json_file, 'r', encoding='utf-8') as f:
+            expected = _strip_meta(json.load(f))
+        self.assertEqual(_strip_meta(load_yaml_file(yaml_file)), expected)
+
+
+class ParserTest(unittest.TestCase):
+
+    def test_subset(self):
+        text = (
+            "name: \"demo\"  # 注释\n"
+            "enabled: true\n"
+            "count: 3\n"
+            "ratio: 0.5\n"
+            "empty: ~\n"
+            "tags: [a, \"b c\"]\n"
+            "items:\n"
+            "  - path: docs/a.md\n"
+            "    level: L0\n"
+            "  - plain\n"
+            "nested:\n"
+            "  inner: {}\n"
+        )
+        self.assertEqual(parse_yaml(text), {
+            "name": "demo", "enabled": True, "count": 3, "ratio": 0.5, "empty": None,
+            "tags": ["a", "b c"],
+            "items": [{"path": "docs/a.md", "level": "L0"}, "plain"],
+            "nested": {"inner": {}},
+        })
+
+    def test_unsupported_syntax_raises(self):
+        with self.assertRaises(YamlSubsetError):
+            parse_yaml("text: |\n  block\n")
+
+
+class CompiledCacheTest(unittest.TestCase):
+
+    def test_cache_follows_content_hash(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            yaml_file = tmp / 'config.yaml'
+            cache_dir = tmp / 'cache'
+            yaml_file.write_text("value: 1\n", encoding='utf-8')
+            self.assertEqual(load_yaml_file(yaml_file, cache_dir), {"value": 1})
+
+            cache_files = list(cache_dir.glob('*.compiled.json'))
+            self.assertEqual(len(cache_files), 1)
+
+            # 内容不变时直接使用缓存：篡改缓存数据即可观察到
+            cached = json.loads(cache_files[0].read_text(encoding='utf-8'))
+            cached['data'] = {"value": "cached"}
+            cache_files[0].write_text(json.dumps(cached), encoding='utf-8')
+            self.assertEqual(load_yaml_file(yaml_file, cache_dir), {"value": "cached"})
+
+            # 内容变化后重新解析
+            yaml_file.write_text("value: 2\n", encoding='utf-8')
+            self.assertEqual(load_yaml_file(yaml_file, cache_dir), {"value": 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -30,38 +30,53 @@ MAIN FUNCTIONS:
    - Maintains consistent formatting and timestamps
 
 5. Multi-Agent Support
-   - Handles agent-specific file paths and naming conventions
+   - Reads agent file paths and names from .specify/agent-registry.json
    - Supports: Claude, Gemini, Copilot, Cursor, Qwen, opencode, Codex, Windsurf,
      Kilo Code, Auggie CLI, Roo Code, CodeBuddy CLI, Qoder CLI, Amp, SHAI,
      or Amazon Q Developer CLI
    - Can update single agents or all existing agent files
-   - Creates default Claude file if no agent files exist
+   - Creates the default agent file (Claude) if no agent files exist
 
-Usage: python update-agent-context.py [agent_type]
+Usage: python update-agent-context.py [agent_type] [--all-features]
 Agent types: claude|gemini|copilot|cursor-agent|qwen|opencode|codex|windsurf|
              kilocode|auggie|shai|q|bob|qoder
 Leave empty to update all existing agent files
+--all-features regenerates the files from every specs/*/plan.md in one pass
 """
 
 import argparse
 import atexit
+import json
 import os
 import re
 import shutil
 import sys
-import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 from common import (
+    FEATURE_PREFIX_RE,
     get_repo_root,
     get_feature_paths,
+    load_plan_document,
+    estimate_text_tokens,
+    load_template,
     log_info,
     log_success,
     log_warn,
     log_error,
 )
+from change_archive import ChangeArchive, entry_feature
+from tech_ledger import (
+    TechLedger,
+    format_change_entry,
+    load_tech_ledger,
+    normalize_list,
+    normalize_term,
+)
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -77,23 +92,15 @@ class AgentConfig:
         self.has_git = paths['HAS_GIT'] == 'true'
         self.new_plan = Path(paths['IMPL_PLAN'])
 
-        # Agent-specific file paths
-        self.claude_file = repo_root / "CLAUDE.md"
-        self.gemini_file = repo_root / "GEMINI.md"
-        self.copilot_file = repo_root / ".github" / "agents" / "copilot-instructions.md"
-        self.cursor_file = repo_root / ".cursor" / "rules" / "specify-rules.mdc"
-        self.qwen_file = repo_root / "QWEN.md"
-        self.agents_file = repo_root / "AGENTS.md"
-        self.windsurf_file = repo_root / ".windsurf" / "rules" / "specify-rules.md"
-        self.kilocode_file = repo_root / ".kilocode" / "rules" / "specify-rules.md"
-        self.auggie_file = repo_root / ".augment" / "rules" / "specify-rules.md"
-        self.roo_file = repo_root / ".roo" / "rules" / "specify-rules.md"
-        self.codebuddy_file = repo_root / "CODEBUDDY.md"
-        self.qoder_file = repo_root / "QODER.md"
-        self.amp_file = repo_root / "AGENTS.md"
-        self.shai_file = repo_root / "SHAI.md"
-        self.q_file = repo_root / "AGENTS.md"
-        self.bob_file = repo_root / "AGENTS.md"
+        # Agent targets, loaded from the registry file (see load_agent_registry)
+        self.registry_file = repo_root / ".specify" / "agent-registry.json"
+        self.registry: Optional["AgentRegistry"] = None
+
+        # Recent Changes entries trimmed from agent files are kept here
+        self.archive = ChangeArchive(repo_root)
+
+        # Active Technologies moved out of over-budget agent files (see enforce_token_budget)
+        self.overflow = TechOverflow()
 
         # Template file
         self.template_file = repo_root / ".specify" / "templates" / "agent-file-template.md"
@@ -104,6 +111,12 @@ class AgentConfig:
         self.new_db = ""
         self.new_project_type = ""
 
+        # Changes derived from the plan data (see prepare_agent_update)
+        self.update: Optional["AgentUpdate"] = None
+
+
+# Maximum number of agent files updated concurrently
+MAX_UPDATE_WORKERS = 4
 
 # Global config instance (set during initialization)
 config: Optional[AgentConfig] = None
@@ -163,25 +176,6 @@ def validate_environment() -> bool:
 # Plan Parsing Functions
 # ═══════════════════════════════════════════════════════════════
 
-def extract_plan_field(field_pattern: str, plan_file: Path) -> str:
-    """Extract a field from the plan file."""
-    try:
-        content = plan_file.read_text(encoding='utf-8')
-        pattern = rf'^\*\*{re.escape(field_pattern)}\*\*:\s*(.+)$'
-        match = re.search(pattern, content, re.MULTILINE)
-
-        if match:
-            value = match.group(1).strip()
-            # Filter out placeholder values
-            if value in ["NEEDS CLARIFICATION", "N/A"]:
-                return ""
-            return value
-    except Exception:
-        pass
-
-    return ""
-
-
 def parse_plan_data() -> bool:
     """Parse the plan file to extract project information."""
     global config
@@ -192,10 +186,15 @@ def parse_plan_data() -> bool:
 
     log_info(f"Parsing plan data from {config.new_plan}")
 
-    config.new_lang = extract_plan_field("Language/Version", config.new_plan)
-    config.new_framework = extract_plan_field("Primary Dependencies", config.new_plan)
-    config.new_db = extract_plan_field("Storage", config.new_plan)
-    config.new_project_type = extract_plan_field("Project Type", config.new_plan)
+    plan = load_plan_document(config.new_plan)
+    if plan is None:
+        log_error(f"Unable to read plan file: {config.new_plan}")
+        return False
+
+    config.new_lang = plan.field("Language/Version")
+    config.new_framework = plan.field("Primary Dependencies")
+    config.new_db = plan.field("Storage")
+    config.new_project_type = plan.field("Project Type")
 
     # Log what we found
     if config.new_lang:
@@ -215,23 +214,6 @@ def parse_plan_data() -> bool:
     return True
 
 
-def format_technology_stack(lang: str, framework: str) -> str:
-    """Format technology stack string."""
-    parts = []
-
-    if lang and lang != "NEEDS CLARIFICATION":
-        parts.append(lang)
-    if framework and framework not in ["NEEDS CLARIFICATION", "N/A"]:
-        parts.append(framework)
-
-    if not parts:
-        return ""
-    elif len(parts) == 1:
-        return parts[0]
-    else:
-        return " + ".join(parts)
-
-
 # ═══════════════════════════════════════════════════════════════
 # Template and Content Generation Functions
 # ═══════════════════════════════════════════════════════════════
@@ -267,208 +249,645 @@ def get_language_conventions(lang: str) -> str:
     return "Follow standard conventions"
 
 
-def create_new_agent_file(target_file: Path, project_name: str, current_date: str) -> Optional[Path]:
-    """Create a new agent file from template."""
+class AgentUpdate:
+    """
+    Agent file changes derived from the plan, computed once per run.
+
+    The same instance is applied to every target file, so the tech stack and
+    change entries are formatted only once no matter how many agents are updated.
+    """
+
+    def __init__(self, branch: str, lang: str, framework: str, db: str,
+                 project_type: str, project_name: str, current_date: str):
+        self.current_date = current_date
+
+        # Formatted like the ledger's entries, so both modes write the same line per feature
+        change_entry = format_change_entry(branch, normalize_term(lang), normalize_list(framework),
+                                           normalize_list(db))
+        # Recent Changes entries to put first, newest first
+        self.change_entries: List[str] = [change_entry] if change_entry else []
+
+        # Values for files created from the template
+        if lang and framework:
+            new_tech_stack = f"- {lang} + {framework} ({branch})"
+        elif lang:
+            new_tech_stack = f"- {lang} ({branch})"
+        elif framework:
+            new_tech_stack = f"- {framework} ({branch})"
+        else:
+            new_tech_stack = f"- ({branch})"
+        new_recent_change = change_entry or f"- {branch}: Added"
+
+        self.template_values: Dict[str, str] = {
+            "[PROJECT NAME]": project_name,
+            "[DATE]": current_date,
+            "[EXTRACTED FROM ALL PLAN.MD FILES]": new_tech_stack,
+            "[ACTUAL STRUCTURE FROM PLANS]": get_project_structure(project_type),
+            "[ONLY COMMANDS FOR ACTIVE TECHNOLOGIES]": get_commands_for_language(lang),
+            "[LANGUAGE-SPECIFIC, ONLY FOR LANGUAGES IN USE]": get_language_conventions(lang),
+            "[LAST 3 FEATURES AND WHAT THEY ADDED]": new_recent_change,
+        }
+
+        # Full Active Technologies list generated from the tech ledger (see use_tech_ledger);
+        # None leaves the section of existing files alone
+        self.tech_lines: Optional[List[str]] = None
+
+    def use_tech_ledger(self, tech_lines: List[str]):
+        """Generate the Active Technologies entries from the ledger."""
+        self.tech_lines = tech_lines
+        if tech_lines:
+            self.template_values["[EXTRACTED FROM ALL PLAN.MD FILES]"] = '\n'.join(tech_lines)
+
+    def use_change_entries(self, entries: List[str]):
+        """Put the given entries (newest first) at the top of Recent Changes."""
+        self.change_entries = entries
+        if entries:
+            self.template_values["[LAST 3 FEATURES AND WHAT THEY ADDED]"] = '\n'.join(entries)
+
+
+def prepare_agent_update() -> AgentUpdate:
+    """Compute the agent file changes for the current plan."""
     global config
 
-    if not config.template_file.is_file():
+    config.update = AgentUpdate(
+        branch=config.current_branch or "",
+        lang=config.new_lang or "",
+        framework=config.new_framework or "",
+        db=config.new_db or "",
+        project_type=config.new_project_type,
+        project_name=config.repo_root.name,
+        current_date=date.today().strftime("%Y-%m-%d"),
+    )
+    return config.update
+
+
+def prepare_bulk_agent_update(ledger: TechLedger) -> AgentUpdate:
+    """
+    Compute the agent file changes for all feature plans at once.
+
+    Active Technologies and Recent Changes come from the ledger; the values
+    that only new files use (structure, commands, conventions) come from the
+    newest feature that declares a language.
+    """
+    global config
+
+    names = ledger.feature_names()
+    latest = next((name for name in reversed(names) if ledger.features[name].get("language")),
+                  names[-1] if names else "")
+    record = ledger.features.get(latest, {})
+
+    config.update = AgentUpdate(
+        branch=latest,
+        lang=record.get("language", ""),
+        framework=", ".join(record.get("frameworks", [])),
+        db=", ".join(record.get("storage", [])),
+        project_type=record.get("project_type", ""),
+        project_name=config.repo_root.name,
+        current_date=date.today().strftime("%Y-%m-%d"),
+    )
+    config.update.use_tech_ledger(ledger.active_technology_lines())
+    config.update.use_change_entries(ledger.change_entries(RECENT_CHANGES_LIMIT))
+    return config.update
+
+
+def create_new_agent_file(update: AgentUpdate) -> Optional[str]:
+    """Render the content of a new agent file from the template."""
+    global config
+
+    # Compiled once per template content and shared by every agent file of the run
+    template = load_template(config.template_file)
+    if template is None:
         log_error(f"Template not found at {config.template_file}")
         return None
 
     log_info("Creating new agent context file from template...")
 
-    # Create temp file
-    fd, temp_path = tempfile.mkstemp(suffix='.md')
-    os.close(fd)
-    temp_files.append(temp_path)
+    return template.render(update.template_values)
+
+
+# ═══════════════════════════════════════════════════════════════
+# Section Patching
+# ═══════════════════════════════════════════════════════════════
+
+ACTIVE_TECH_HEADING = "## Active Technologies"
+RECENT_CHANGES_HEADING = "## Recent Changes"
+
+# Number of entries kept under Recent Changes (matches the template's "LAST 3 FEATURES")
+RECENT_CHANGES_LIMIT = 3
+
+_LAST_UPDATED_RE = re.compile(r'(Last updated\**:\s*)\d{4}-\d{2}-\d{2}')
+
+
+def find_sections(lines: List[str]) -> Dict[str, Tuple[int, int]]:
+    """
+    Locate the level-2 sections of an agent file.
+
+    Returns a mapping of heading line -> (heading index, end index), where the
+    end index is the next level-1/2 heading or the end of the file. Headings
+    inside fenced code blocks are ignored; the first occurrence of a heading wins.
+    """
+    sections: Dict[str, Tuple[int, int]] = {}
+    open_heading = ""
+    open_start = 0
+    in_fence = False
+
+    for i, line in enumerate(lines):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+            continue
+        if in_fence or not line.startswith("#"):
+            continue
+        if line.startswith("## ") or line.startswith("# "):
+            if open_heading and open_heading not in sections:
+                sections[open_heading] = (open_start, i)
+            open_heading = line.strip() if line.startswith("## ") else ""
+            open_start = i
+
+    if open_heading and open_heading not in sections:
+        sections[open_heading] = (open_start, len(lines))
+    return sections
+
+
+def _replace_active_technologies(lines: List[str], bounds: Tuple[int, int], entries: List[str]) -> List[str]:
+    """Replace the entries of the section, keeping any other lines in place."""
+    start, end = bounds
+    body = lines[start + 1:end]
+    first_entry = next((i for i, line in enumerate(body) if line.startswith("- ")), None)
+    others = [line for line in body if not line.startswith("- ")]
+    if first_entry is None:
+        # No entries yet: put them after the blank line following the heading
+        first_entry = 1 if others and not others[0].strip() else 0
+    return lines[:start + 1] + others[:first_entry] + entries + others[first_entry:] + lines[end:]
+
+
+def _patch_recent_changes(lines: List[str], bounds: Tuple[int, int],
+                          new_entries: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Put the new entries first and keep the most recent RECENT_CHANGES_LIMIT entries.
+
+    Returns the patched lines and the entries that were trimmed from the section.
+    """
+    start, end = bounds
+    body = lines[start + 1:end]
+    existing = [line for line in body if line.startswith("- ")]
+
+    # One entry per feature: a new entry replaces the feature's older wording,
+    # which is dropped rather than archived since the feature is still listed
+    entries: List[str] = []
+    seen = set()
+    for line in new_entries + existing:
+        key = entry_feature(line) or line
+        if key not in seen:
+            seen.add(key)
+            entries.append(line)
+    entries, trimmed = entries[:RECENT_CHANGES_LIMIT], entries[RECENT_CHANGES_LIMIT:]
+
+    # Splice the entries where the first existing entry was (or right after the heading)
+    first_entry = next((i for i, line in enumerate(body) if line.startswith("- ")), 0)
+    others = [line for line in body if not line.startswith("- ")]
+    new_body = others[:first_entry] + entries + others[first_entry:]
+    return lines[:start + 1] + new_body + lines[end:], trimmed
+
+
+def patch_agent_content(content: str, update: AgentUpdate) -> Tuple[str, List[str]]:
+    """
+    Apply an AgentUpdate to agent file content.
+
+    Only the Active Technologies and Recent Changes sections and the
+    "Last updated" date are touched. The Active Technologies entries are
+    replaced by the ledger-generated tech lines of the update; everything else
+    is kept verbatim. The date
+    is bumped only when one of the sections actually changed, so re-running the
+    update on an up-to-date file returns the content unchanged.
+
+    Returns the patched content and the Recent Changes entries trimmed from it.
+    """
+    lines = content.split('\n')
+
+    if update.tech_lines is not None:
+        sections = find_sections(lines)
+        if ACTIVE_TECH_HEADING in sections:
+            lines = _replace_active_technologies(lines, sections[ACTIVE_TECH_HEADING], update.tech_lines)
+        elif update.tech_lines:
+            lines.extend(["", ACTIVE_TECH_HEADING] + update.tech_lines)
+
+    trimmed: List[str] = []
+    sections = find_sections(lines)
+    if RECENT_CHANGES_HEADING in sections:
+        lines, trimmed = _patch_recent_changes(lines, sections[RECENT_CHANGES_HEADING], update.change_entries)
+    elif update.change_entries:
+        lines.extend(["", RECENT_CHANGES_HEADING] + update.change_entries)
+
+    patched = '\n'.join(lines)
+    if patched == content:
+        return content, trimmed
+
+    return _LAST_UPDATED_RE.sub(lambda m: m.group(1) + update.current_date, patched), trimmed
+
+
+def update_existing_agent_file(target_file: Path,
+                               update: AgentUpdate) -> Tuple[bool, bytes, str, List[str]]:
+    """
+    Compute the updated content of an existing agent context file.
+
+    Returns (success, original bytes, patched content, trimmed), where trimmed
+    holds the Recent Changes entries dropped from the file.
+    """
+    log_info("Updating existing agent context file...")
 
     try:
-        # Copy template
-        shutil.copy2(config.template_file, temp_path)
-
-        # Read template content
-        content = Path(temp_path).read_text(encoding='utf-8')
-
-        # Get replacement values
-        project_structure = get_project_structure(config.new_project_type)
-        commands = get_commands_for_language(config.new_lang)
-        language_conventions = get_language_conventions(config.new_lang)
-
-        # Build technology stack and recent change strings
-        escaped_lang = config.new_lang or ""
-        escaped_framework = config.new_framework or ""
-        escaped_branch = config.current_branch or ""
-
-        if escaped_lang and escaped_framework:
-            tech_stack = f"- {escaped_lang} + {escaped_framework} ({escaped_branch})"
-            recent_change = f"- {escaped_branch}: Added {escaped_lang} + {escaped_framework}"
-        elif escaped_lang:
-            tech_stack = f"- {escaped_lang} ({escaped_branch})"
-            recent_change = f"- {escaped_branch}: Added {escaped_lang}"
-        elif escaped_framework:
-            tech_stack = f"- {escaped_framework} ({escaped_branch})"
-            recent_change = f"- {escaped_branch}: Added {escaped_framework}"
-        else:
-            tech_stack = f"- ({escaped_branch})"
-            recent_change = f"- {escaped_branch}: Added"
+        original = target_file.read_bytes()
+        patched, trimmed = patch_agent_content(original.decode('utf-8'), update)
+        return True, original, patched, trimmed
 
-        # Perform substitutions
-        substitutions = [
-            ("[PROJECT NAME]", project_name),
-            ("[DATE]", current_date),
-            ("[EXTRACTED FROM ALL PLAN.MD FILES]", tech_stack),
-            ("[ACTUAL STRUCTURE FROM PLANS]", project_structure),
-            ("[ONLY COMMANDS FOR ACTIVE TECHNOLOGIES]", commands),
-            ("[LANGUAGE-SPECIFIC, ONLY FOR LANGUAGES IN USE]", language_conventions),
-            ("[LAST 3 FEATURES AND WHAT THEY ADDED]", recent_change),
-        ]
+    except Exception as e:
+        log_error(f"Failed to update agent file: {e}")
+        return False, b"", "", []
 
-        for old, new in substitutions:
-            content = content.replace(old, new)
 
-        # Write back
-        Path(temp_path).write_text(content, encoding='utf-8')
+# ═══════════════════════════════════════════════════════════════
+# Context Size Budget
+# ═══════════════════════════════════════════════════════════════
 
-        return Path(temp_path)
+# Token budget of agent files that do not set one in the registry (0 = unlimited)
+DEFAULT_TOKEN_BUDGET = 2000
 
-    except Exception as e:
-        log_error(f"Failed to create new agent file: {e}")
-        return None
+# Full Active Technologies list, linked from agent files that overflow their budget
+OVERFLOW_FILE = Path(".specify") / "memory" / "active-technologies.md"
 
+_TECH_LINE_RE = re.compile(r'^- (.+?)(?: \(([^()]*)\))?$')
 
-def update_existing_agent_file(target_file: Path, current_date: str) -> bool:
-    """Update an existing agent context file."""
-    global config
 
-    log_info("Updating existing agent context file...")
+class Compaction(NamedTuple):
+    """Result of fitting agent file content into a token budget."""
+    content: str
+    before: int
+    after: int
+    overflow: Optional[List[str]]
 
-    # Create temp file
-    fd, temp_path = tempfile.mkstemp(suffix='.md')
-    os.close(fd)
-    temp_files.append(temp_path)
 
-    try:
-        # Prepare new entries
-        tech_stack = format_technology_stack(config.new_lang, config.new_framework)
-        new_tech_entries = []
-        new_change_entry = ""
-
-        content = target_file.read_text(encoding='utf-8')
-
-        if tech_stack and tech_stack not in content:
-            new_tech_entries.append(f"- {tech_stack} ({config.current_branch})")
-
-        if (config.new_db and
-            config.new_db != "N/A" and
-            config.new_db != "NEEDS CLARIFICATION" and
-            config.new_db not in content):
-            new_tech_entries.append(f"- {config.new_db} ({config.current_branch})")
-
-        # Prepare new change entry
-        if tech_stack:
-            new_change_entry = f"- {config.current_branch}: Added {tech_stack}"
-        elif config.new_db and config.new_db not in ["N/A", "NEEDS CLARIFICATION"]:
-            new_change_entry = f"- {config.current_branch}: Added {config.new_db}"
-
-        # Check if sections exist
-        has_active_technologies = "## Active Technologies" in content
-        has_recent_changes = "## Recent Changes" in content
-
-        # Process file
-        lines = content.split('\n')
-        new_lines = []
-        in_tech_section = False
-        in_changes_section = False
-        tech_entries_added = False
-        existing_changes_count = 0
-
-        for line in lines:
-            # Handle Active Technologies section
-            if line.strip() == "## Active Technologies":
-                new_lines.append(line)
-                in_tech_section = True
-                continue
-            elif in_tech_section and line.startswith("## "):
-                # Add new tech entries before closing the section
-                if not tech_entries_added and new_tech_entries:
-                    new_lines.extend(new_tech_entries)
-                    tech_entries_added = True
-                new_lines.append(line)
-                in_tech_section = False
-                continue
-            elif in_tech_section and not line.strip():
-                # Add new tech entries before empty line in tech section
-                if not tech_entries_added and new_tech_entries:
-                    new_lines.extend(new_tech_entries)
-                    tech_entries_added = True
-                new_lines.append(line)
-                continue
+def _split_tech_line(entry: str) -> Tuple[str, List[str]]:
+    match = _TECH_LINE_RE.match(entry)
+    if not match:
+        return entry[2:].strip(), []
+    features = [f.strip() for f in (match.group(2) or "").split(",") if f.strip()]
+    return match.group(1).strip(), features
 
-            # Handle Recent Changes section
-            if line.strip() == "## Recent Changes":
-                new_lines.append(line)
-                # Add new change entry right after the heading
-                if new_change_entry:
-                    new_lines.append(new_change_entry)
-                in_changes_section = True
-                continue
-            elif in_changes_section and line.startswith("## "):
-                new_lines.append(line)
-                in_changes_section = False
-                continue
-            elif in_changes_section and line.startswith("- "):
-                # Keep only first 2 existing changes
-                if existing_changes_count < 2:
-                    new_lines.append(line)
-                    existing_changes_count += 1
-                continue
 
-            # Update timestamp
-            if "**Last updated**:" in line and re.search(r'\d{4}-\d{2}-\d{2}', line):
-                line = re.sub(r'\d{4}-\d{2}-\d{2}', current_date, line)
+def _format_tech_line(tech: str, features_text: str) -> str:
+    return f"- {tech} ({features_text})" if features_text else f"- {tech}"
+
+
+def merge_tech_lines(entries: List[str]) -> List[Tuple[str, List[str]]]:
+    """Merge entries naming the same technology (case-insensitively) into one."""
+    merged: Dict[str, Tuple[str, List[str]]] = {}
+    for entry in entries:
+        tech, features = _split_tech_line(entry)
+        _, known = merged.setdefault(tech.lower(), (tech, []))
+        known.extend(feature for feature in features if feature not in known)
+    return list(merged.values())
+
+
+def collapse_features(features: List[str]) -> str:
+    """
+    Collapse branch names to their feature numbers, with ranges.
+
+    ["001-user-auth", "002-payments", "003-search", "007-admin"] -> "001..003, 007"
+
+    Each number keeps its own spelling, so "999-a" and "1000-b" give "999..1000".
+    """
+    # Feature number -> its digits as written in the branch name
+    numbers: Dict[int, str] = {}
+    others: List[str] = []
+    for feature in features:
+        match = FEATURE_PREFIX_RE.match(feature)
+        if match:
+            numbers.setdefault(int(match.group(1)), match.group(1))
+        else:
+            others.append(feature)
+
+    parts: List[str] = []
+    ordered = sorted(numbers)
+    i = 0
+    while i < len(ordered):
+        j = i
+        while j + 1 < len(ordered) and ordered[j + 1] == ordered[j] + 1:
+            j += 1
+        first, last = numbers[ordered[i]], numbers[ordered[j]]
+        parts.append(first if i == j else f"{first}..{last}")
+        i = j + 1
+    return ", ".join(parts + others)
+
+
+def compact_agent_content(content: str, budget: int, overflow_link: str) -> Compaction:
+    """
+    Fit agent file content into a token budget by compacting Active Technologies.
+
+    Steps, stopping as soon as the content fits:
+    1. merge entries naming the same technology;
+    2. collapse branch suffixes to feature numbers ("001..003, 007");
+    3. keep the technologies used by the most features and replace the rest
+       with a link to the overflow file, which gets the full merged list.
+
+    Other sections are never touched; if they alone exceed the budget the
+    result stays over budget.
+    """
+    before = estimate_text_tokens(content)
+    if before <= budget:
+        return Compaction(content, before, before, None)
+
+    lines = content.split('\n')
+    sections = find_sections(lines)
+    if ACTIVE_TECH_HEADING not in sections:
+        return Compaction(content, before, before, None)
+    bounds = sections[ACTIVE_TECH_HEADING]
+
+    def with_entries(entries: List[str]) -> str:
+        return '\n'.join(_replace_active_technologies(lines, bounds, entries))
+
+    entries = [line for line in lines[bounds[0] + 1:bounds[1]] if line.startswith("- ")]
+    merged = merge_tech_lines(entries)
+
+    full = [_format_tech_line(tech, ", ".join(features)) for tech, features in merged]
+    compacted = with_entries(full)
+    tokens = estimate_text_tokens(compacted)
+    if tokens <= budget:
+        return Compaction(compacted, before, tokens, None)
+
+    collapsed = [_format_tech_line(tech, collapse_features(features)) for tech, features in merged]
+    compacted = with_entries(collapsed)
+    tokens = estimate_text_tokens(compacted)
+    if tokens <= budget:
+        return Compaction(compacted, before, tokens, None)
+
+    # Keep the most widely used technologies that fit next to the overflow link
+    def pointer(hidden: int) -> str:
+        return f"- {hidden} more: see [{overflow_link}]({overflow_link})"
+
+    available = budget - estimate_text_tokens(with_entries([pointer(len(collapsed))]))
+    ranked = sorted(range(len(merged)), key=lambda i: -len(merged[i][1]))
+    kept = set()
+    for i in ranked:
+        cost = estimate_text_tokens(collapsed[i]) + 1
+        if cost > available:
+            break
+        kept.add(i)
+        available -= cost
+
+    remaining = [collapsed[i] for i in range(len(collapsed)) if i in kept]
+    compacted = with_entries(remaining + [pointer(len(collapsed) - len(kept))])
+    return Compaction(compacted, before, estimate_text_tokens(compacted), full)
+
+
+class TechOverflow:
+    """
+    Active Technologies entries moved out of agent files during a run.
+
+    Agent files are compacted in parallel and each one may move out its own
+    entries; they are merged here so the overflow file is written once, with
+    every technology, instead of by whichever update finishes last.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: List[str] = []
+
+    def add(self, entries: List[str]) -> None:
+        with self._lock:
+            self._entries.extend(entries)
+
+    def take(self) -> List[str]:
+        """The merged entries collected so far; the collector is emptied."""
+        with self._lock:
+            entries, self._entries = self._entries, []
+        return [_format_tech_line(tech, ", ".join(features)) for tech, features in merge_tech_lines(entries)]
+
+
+def enforce_token_budget(target_file: Path, agent_name: str, content: str, budget: int) -> str:
+    """
+    Compact content that exceeds the agent's token budget and report the result.
+
+    Entries moved out are collected in config.overflow; stage_overflow_file
+    writes them when the agent files are committed.
+    """
+    global config
 
-            new_lines.append(line)
+    overflow_file = config.repo_root / OVERFLOW_FILE
+    overflow_link = Path(os.path.relpath(overflow_file, target_file.parent)).as_posix()
 
-        # Post-loop: if still in tech section
-        if in_tech_section and not tech_entries_added and new_tech_entries:
-            new_lines.extend(new_tech_entries)
+    result = compact_agent_content(content, budget, overflow_link)
+    if result.before <= budget:
+        return content
 
-        # If sections don't exist, add them at the end
-        if not has_active_technologies and new_tech_entries:
-            new_lines.append("")
-            new_lines.append("## Active Technologies")
-            new_lines.extend(new_tech_entries)
+    if result.after <= budget:
+        log_info(f"{agent_name} context was {result.before} tokens (budget {budget}), "
+                 f"compacted to {result.after} tokens")
+    else:
+        log_warn(f"{agent_name} context is {result.after} tokens after compaction "
+                 f"(was {result.before}, budget {budget})")
+
+    if result.overflow is not None:
+        config.overflow.add(result.overflow)
 
-        if not has_recent_changes and new_change_entry:
-            new_lines.append("")
-            new_lines.append("## Recent Changes")
-            new_lines.append(new_change_entry)
+    return result.content
 
-        # Write to temp file
-        Path(temp_path).write_text('\n'.join(new_lines), encoding='utf-8')
 
-        # Move temp file to target atomically
-        shutil.move(temp_path, target_file)
+def stage_overflow_file(transaction: "AgentFileTransaction") -> bool:
+    """Stage the overflow file with the entries collected from every agent file of the run."""
+    global config
 
+    entries = config.overflow.take()
+    if not entries:
         return True
 
-    except Exception as e:
-        log_error(f"Failed to update agent file: {e}")
+    overflow_file = config.repo_root / OVERFLOW_FILE
+    data = ('# Active Technologies\n\n'
+            'Full list of technologies in the feature plans. Agent context files that exceed\n'
+            'their token budget link here (generated by update-agent-context.py).\n\n'
+            + '\n'.join(entries) + '\n').encode('utf-8')
+    try:
+        if overflow_file.read_bytes() == data:
+            return True
+    except OSError:
+        pass
+
+    try:
+        overflow_file.parent.mkdir(parents=True, exist_ok=True)
+        transaction.stage(overflow_file, data)
+    except OSError as e:
+        log_error(f"Failed to stage {overflow_file}: {e}")
         return False
+    return True
+
+
+# ═══════════════════════════════════════════════════════════════
+# Transactional Writer
+# ═══════════════════════════════════════════════════════════════
+
+class AgentFileTransaction:
+    """
+    Write a set of agent files all-or-nothing.
+
+    Each new content is staged in a hidden file next to its target, so the
+    final os.replace is a same-directory rename rather than a cross-filesystem
+    copy. commit() fsyncs every staged file, keeps a hard-link backup of each
+    existing target, replaces the targets and fsyncs their directories. If any
+    step fails, already replaced targets are restored from their backups (new
+    files are removed) and the error is re-raised.
+
+    Used as a context manager, staged files are discarded when the block exits
+    without a commit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # target -> (staged path, success message)
+        self._staged: Dict[Path, Tuple[Path, str]] = {}
+        self._counter = 0
+
+    def __enter__(self) -> "AgentFileTransaction":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.discard()
+
+    def __len__(self) -> int:
+        return len(self._staged)
+
+    def stage(self, target_file: Path, data: bytes, message: str = "") -> None:
+        """Write data to a staging file in the target's directory; restaging a target replaces it."""
+        with self._lock:
+            self._counter += 1
+            staged = target_file.with_name(f".{target_file.name}.{os.getpid()}.{self._counter}.tmp")
+        temp_files.append(str(staged))
+
+        # A buffered write retries short writes until every byte is on disk
+        with open(staged, 'wb') as f:
+            f.write(data)
+
+        if target_file.exists():
+            shutil.copymode(target_file, staged)
+
+        with self._lock:
+            previous = self._staged.get(target_file)
+            self._staged[target_file] = (staged, message)
+        if previous:
+            _remove_quietly(previous[0])
+
+    def discard(self) -> None:
+        """Remove staged files that were not committed."""
+        with self._lock:
+            staged, self._staged = self._staged, {}
+        for staged_path, _ in staged.values():
+            _remove_quietly(staged_path)
+
+    def commit(self) -> List[str]:
+        """Replace all targets with their staged content; returns the staged messages."""
+        with self._lock:
+            staged, self._staged = self._staged, {}
+
+        # (target, backup or None) for every target already replaced
+        applied: List[Tuple[Path, Optional[Path]]] = []
+        backups: List[Path] = []
+        try:
+            # Batch fsync before any target is touched
+            for staged_path, _ in staged.values():
+                _fsync_path(staged_path)
+
+            for target_file, (staged_path, _) in staged.items():
+                backup = None
+                if target_file.exists():
+                    backup = target_file.with_name(f".{target_file.name}.{os.getpid()}.bak")
+                    temp_files.append(str(backup))
+                    _remove_quietly(backup)
+                    try:
+                        os.link(target_file, backup)
+                    except OSError:
+                        shutil.copy2(target_file, backup)
+                    backups.append(backup)
+
+                os.replace(staged_path, target_file)
+                applied.append((target_file, backup))
+
+            for directory in {target.parent for target in staged}:
+                _fsync_directory(directory)
+
+        except BaseException:
+            for target_file, backup in reversed(applied):
+                try:
+                    if backup is not None:
+                        os.replace(backup, target_file)
+                    else:
+                        os.remove(target_file)
+                except OSError as e:
+                    log_error(f"Failed to roll back {target_file}: {e}")
+            for staged_path, _ in staged.values():
+                _remove_quietly(staged_path)
+            raise
+
+        finally:
+            for backup in backups:
+                _remove_quietly(backup)
+
+        return [message for _, message in staged.values() if message]
+
+
+def _remove_quietly(path: Path) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _fsync_path(path: Path) -> None:
+    fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist renames in a directory (not supported on Windows)."""
+    if os.name == 'nt':
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 
 # ═══════════════════════════════════════════════════════════════
 # Main Agent File Update Function
 # ═══════════════════════════════════════════════════════════════
 
-def update_agent_file(target_file: Path, agent_name: str) -> bool:
-    """Update or create an agent context file."""
+def update_agent_file(target_file: Path, agent_name: str,
+                      transaction: Optional[AgentFileTransaction] = None,
+                      token_budget: int = 0) -> bool:
+    """
+    Update or create an agent context file.
+
+    With a transaction, the new content is only staged and is written when the
+    caller commits it; otherwise the file is written immediately. A non-zero
+    token_budget compacts the file when it would exceed that many tokens.
+    """
     global config
 
+    if transaction is None:
+        with AgentFileTransaction() as transaction:
+            if not update_agent_file(target_file, agent_name, transaction, token_budget):
+                return False
+            return commit_agent_files(transaction)
+
     log_info(f"Updating {agent_name} context file: {target_file}")
 
-    project_name = config.repo_root.name
-    current_date = date.today().strftime("%Y-%m-%d")
+    update = config.update or prepare_agent_update()
 
     # Create directory if it doesn't exist
     target_dir = target_file.parent
@@ -479,20 +898,14 @@ def update_agent_file(target_file: Path, agent_name: str) -> bool:
             log_error(f"Failed to create directory: {target_dir}: {e}")
             return False
 
+    original: Optional[bytes] = None
     if not target_file.is_file():
         # Create new file from template
-        temp_file = create_new_agent_file(target_file, project_name, current_date)
-        if temp_file:
-            try:
-                shutil.move(str(temp_file), target_file)
-                log_success(f"Created new {agent_name} context file")
-                return True
-            except OSError as e:
-                log_error(f"Failed to move temporary file to {target_file}: {e}")
-                return False
-        else:
+        content = create_new_agent_file(update)
+        if content is None:
             log_error("Failed to create new agent file")
             return False
+        message = f"Created new {agent_name} context file"
     else:
         # Update existing file
         if not os.access(target_file, os.R_OK):
@@ -503,96 +916,230 @@ def update_agent_file(target_file: Path, agent_name: str) -> bool:
             log_error(f"Cannot write to existing file: {target_file}")
             return False
 
-        if update_existing_agent_file(target_file, current_date):
-            log_success(f"Updated existing {agent_name} context file")
-            return True
-        else:
+        success, original, content, trimmed = update_existing_agent_file(target_file, update)
+        if not success:
             log_error("Failed to update existing agent file")
             return False
 
+        # Archive trimmed history before the file loses it; re-archiving is a no-op
+        if trimmed and not archive_trimmed_changes(target_file, trimmed):
+            return False
+        message = f"Updated existing {agent_name} context file"
+
+    if token_budget:
+        content = enforce_token_budget(target_file, agent_name, content, token_budget)
+
+    data = content.encode('utf-8')
+    if data == original:
+        log_success(f"{agent_name} context file already up to date, skipped write")
+        return True
+
+    try:
+        transaction.stage(target_file, data, message)
+    except OSError as e:
+        log_error(f"Failed to stage {target_file}: {e}")
+        return False
+    return True
+
+
+def archive_trimmed_changes(target_file: Path, trimmed: List[str]) -> bool:
+    """Append Recent Changes entries trimmed from an agent file to the change archive."""
+    global config
+
+    try:
+        source = target_file.relative_to(config.repo_root).as_posix()
+    except ValueError:
+        source = str(target_file)
+
+    try:
+        archived = config.archive.append(trimmed, source)
+    except OSError as e:
+        log_error(f"Failed to archive trimmed Recent Changes of {target_file}: {e}")
+        return False
+
+    if archived:
+        log_info(f"Archived {archived} Recent Changes entries to {config.archive.path}")
+    return True
+
+
+def commit_agent_files(transaction: AgentFileTransaction) -> bool:
+    """Write all staged agent files, rolling every one back on failure."""
+    # Staged here, after the parallel updates, so the overflow file is written once
+    if not stage_overflow_file(transaction):
+        return False
+
+    try:
+        messages = transaction.commit()
+    except OSError as e:
+        log_error(f"Failed to write agent files, all changes rolled back: {e}")
+        return False
+
+    for message in messages:
+        log_success(message)
+    return True
+
 
 # ═══════════════════════════════════════════════════════════════
 # Agent Selection and Processing
 # ═══════════════════════════════════════════════════════════════
 
-AGENT_TYPES = {
-    "claude": ("claude_file", "Claude Code"),
-    "gemini": ("gemini_file", "Gemini CLI"),
-    "copilot": ("copilot_file", "GitHub Copilot"),
-    "cursor-agent": ("cursor_file", "Cursor IDE"),
-    "qwen": ("qwen_file", "Qwen Code"),
-    "opencode": ("agents_file", "opencode"),
-    "codex": ("agents_file", "Codex CLI"),
-    "windsurf": ("windsurf_file", "Windsurf"),
-    "kilocode": ("kilocode_file", "Kilo Code"),
-    "auggie": ("auggie_file", "Auggie CLI"),
-    "roo": ("roo_file", "Roo Code"),
-    "codebuddy": ("codebuddy_file", "CodeBuddy CLI"),
-    "qoder": ("qoder_file", "Qoder CLI"),
-    "amp": ("amp_file", "Amp"),
-    "shai": ("shai_file", "SHAI"),
-    "q": ("q_file", "Amazon Q Developer CLI"),
-    "bob": ("bob_file", "IBM Bob"),
-}
+AGENT_FORMATS = frozenset({"markdown", "mdc"})
+
+
+class AgentTarget(NamedTuple):
+    """An agent context file declared in the registry."""
+    type: str
+    name: str
+    path: str
+    format: str
+    group: str
+    token_budget: int
+
+
+class AgentRegistry:
+    """
+    Agent targets declared in .specify/agent-registry.json.
+
+    Agents that share a file (e.g. AGENTS.md) belong to a group; discovery
+    reports a shared file once, under the group's display name.
+    """
+
+    def __init__(self, targets: List[AgentTarget], group_names: Dict[str, str], default_type: str):
+        self.targets = targets
+        self.by_type: Dict[str, AgentTarget] = {target.type: target for target in targets}
+        self.group_names = group_names
+        self.default = self.by_type[default_type]
+
+    @property
+    def types(self) -> List[str]:
+        return [target.type for target in self.targets]
+
+    def display_name(self, target: AgentTarget) -> str:
+        return self.group_names.get(target.group, target.name)
+
+    def discover(self, repo_root: Path) -> List[Tuple[Path, AgentTarget]]:
+        """
+        Return (path, target) for every agent file that exists.
+
+        Each distinct parent directory is listed once with os.scandir instead
+        of stat'ing every candidate path, so the cost depends on the number of
+        directories, not on the number of registered agents.
+        """
+        listings: Dict[Path, set] = {}
+        found: List[Tuple[Path, str]] = []
+        seen_paths = set()
+
+        for target in self.targets:
+            if target.path in seen_paths:
+                continue
+            seen_paths.add(target.path)
+
+            file_path = repo_root / target.path
+            parent = file_path.parent
+            if parent not in listings:
+                try:
+                    with os.scandir(parent) as entries:
+                        listings[parent] = {entry.name for entry in entries if entry.is_file()}
+                except OSError:
+                    listings[parent] = set()
+
+            if file_path.name in listings[parent]:
+                found.append((file_path, target))
+
+        return found
+
+
+def load_agent_registry(registry_file: Path) -> AgentRegistry:
+    """Load and validate the agent registry; raises ValueError on invalid content."""
+    try:
+        with open(registry_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except OSError as e:
+        raise ValueError(f"Cannot read agent registry {registry_file}: {e}")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in agent registry {registry_file}: {e}")
+
+    groups = data.get("groups", {})
+    default_budget = data.get("token_budget", DEFAULT_TOKEN_BUDGET)
+    group_names = {key: group.get("name", key) for key, group in groups.items()}
+
+    targets: List[AgentTarget] = []
+    for i, agent in enumerate(data.get("agents", [])):
+        missing = [key for key in ("type", "name", "path") if not agent.get(key)]
+        if missing:
+            raise ValueError(f"Agent entry {i} in {registry_file} is missing: {', '.join(missing)}")
+        fmt = agent.get("format", "markdown")
+        if fmt not in AGENT_FORMATS:
+            raise ValueError(f"Agent '{agent['type']}' has unknown format '{fmt}'")
+        group = agent.get("group", "")
+        if group and group not in groups:
+            raise ValueError(f"Agent '{agent['type']}' refers to unknown group '{group}'")
+        budget = agent.get("token_budget", groups.get(group, {}).get("token_budget", default_budget))
+        if not isinstance(budget, int) or budget < 0:
+            raise ValueError(f"Agent '{agent['type']}' has an invalid token_budget: {budget!r}")
+        targets.append(AgentTarget(agent["type"], agent["name"], agent["path"], fmt, group, budget))
+
+    if not targets:
+        raise ValueError(f"No agents declared in {registry_file}")
+
+    default_type = data.get("default_agent", targets[0].type)
+    if default_type not in {target.type for target in targets}:
+        raise ValueError(f"Default agent '{default_type}' is not declared in {registry_file}")
+
+    return AgentRegistry(targets, group_names, default_type)
 
 
 def update_specific_agent(agent_type: str) -> bool:
     """Update a specific agent type."""
     global config
 
-    if agent_type not in AGENT_TYPES:
+    target = config.registry.by_type.get(agent_type)
+    if target is None:
         log_error(f"Unknown agent type '{agent_type}'")
-        log_error("Expected: " + "|".join(AGENT_TYPES.keys()))
+        log_error("Expected: " + "|".join(config.registry.types))
         return False
 
-    file_attr, agent_name = AGENT_TYPES[agent_type]
-    target_file = getattr(config, file_attr)
-    return update_agent_file(target_file, agent_name)
+    return update_agent_file(config.repo_root / target.path, target.name, token_budget=target.token_budget)
 
 
 def update_all_existing_agents() -> bool:
     """Update all existing agent files."""
     global config
 
-    found_agent = False
     success = True
 
-    # Check each possible agent file and update if it exists
-    agent_files = [
-        (config.claude_file, "Claude Code"),
-        (config.gemini_file, "Gemini CLI"),
-        (config.copilot_file, "GitHub Copilot"),
-        (config.cursor_file, "Cursor IDE"),
-        (config.qwen_file, "Qwen Code"),
-        (config.agents_file, "Codex/opencode"),
-        (config.windsurf_file, "Windsurf"),
-        (config.kilocode_file, "Kilo Code"),
-        (config.auggie_file, "Auggie CLI"),
-        (config.roo_file, "Roo Code"),
-        (config.codebuddy_file, "CodeBuddy CLI"),
-        (config.shai_file, "SHAI"),
-        (config.qoder_file, "Qoder CLI"),
-        (config.q_file, "Amazon Q Developer CLI"),
-        (config.bob_file, "IBM Bob"),
-    ]
-
-    # Track already processed files (some agents share the same file)
-    processed = set()
-
-    for file_path, agent_name in agent_files:
-        if file_path.is_file() and str(file_path) not in processed:
-            if not update_agent_file(file_path, agent_name):
+    # Existing agent files, one directory listing per parent directory; shared
+    # files (e.g. AGENTS.md) and symlinks to the same file are updated once
+    targets: Dict[Path, AgentTarget] = {}
+    for file_path, target in config.registry.discover(config.repo_root):
+        targets.setdefault(file_path.resolve(), target)
+
+    found_agent = bool(targets)
+    with AgentFileTransaction() as transaction:
+        if targets:
+            workers = min(MAX_UPDATE_WORKERS, len(targets))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    lambda item: update_agent_file(item[0], config.registry.display_name(item[1]),
+                                                   transaction, item[1].token_budget),
+                    targets.items()))
+            success = all(results)
+
+        # If no agent files exist, create the default agent's file
+        if not found_agent:
+            default = config.registry.default
+            log_info(f"No existing agent files found, creating default {default.name} file...")
+            if not update_agent_file(config.repo_root / default.path, default.name, transaction,
+                                     default.token_budget):
                 success = False
-            found_agent = True
-            processed.add(str(file_path))
 
-    # If no agent files exist, create a default Claude file
-    if not found_agent:
-        log_info("No existing agent files found, creating default Claude file...")
-        if not update_agent_file(config.claude_file, "Claude Code"):
-            success = False
+        # Write all agent files together, or none of them if any update failed
+        if not success:
+            if len(transaction):
+                log_warn("Not writing any agent files because of the errors above")
+            return False
 
-    return success
+        return commit_agent_files(transaction)
 
 
 def print_summary():
@@ -612,7 +1159,33 @@ def print_summary():
         print(f"  - Added database: {config.new_db}")
 
     print()
-    log_info("Usage: python update-agent-context.py [" + "|".join(AGENT_TYPES.keys()) + "]")
+    log_info("Usage: python update-agent-context.py [" + "|".join(config.registry.types) + "]")
+
+
+def run_all_features(agent_type: str, workers: Optional[int]) -> bool:
+    """Update agent files from all feature plans, without checking out any branch."""
+    global config
+
+    log_info("=== Updating agent context files for all features ===")
+
+    ledger = load_tech_ledger(config.repo_root, workers)
+    if not ledger.features:
+        log_error(f"No plan.md found under {config.repo_root / 'specs'}")
+        return False
+    log_info(f"Tech ledger: {len(ledger.features)} plans ({ledger.parsed} parsed)")
+
+    prepare_bulk_agent_update(ledger)
+
+    if agent_type:
+        success = update_specific_agent(agent_type)
+    else:
+        success = update_all_existing_agents()
+
+    print()
+    log_info("Summary of changes:")
+    print(f"  - Feature plans: {len(ledger.features)}")
+    print(f"  - Active technologies: {len(config.update.tech_lines or [])}")
+    return success
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -634,10 +1207,15 @@ Examples:
   python update-agent-context.py                  # Update all existing agent files
   python update-agent-context.py claude           # Update only Claude file
   python update-agent-context.py cursor-agent    # Update only Cursor file
+  python update-agent-context.py --all-features   # Regenerate from every feature plan
 '''
     )
     parser.add_argument('agent_type', nargs='?', default='',
                         help='Specific agent type to update (optional)')
+    parser.add_argument('--all-features', action='store_true',
+                        help='Regenerate from every specs/*/plan.md instead of the current branch')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes used to parse plans with --all-features (default: CPU count)')
 
     args = parser.parse_args()
 
@@ -646,6 +1224,20 @@ Examples:
     paths = get_feature_paths()
     config = AgentConfig(repo_root, paths)
 
+    try:
+        config.registry = load_agent_registry(config.registry_file)
+    except ValueError as e:
+        log_error(str(e))
+        sys.exit(1)
+
+    if args.all_features:
+        success = run_all_features(args.agent_type, args.workers)
+        if success:
+            log_success("Agent context update completed successfully")
+            sys.exit(0)
+        log_error("Agent context update completed with errors")
+        sys.exit(1)
+
     # Validate environment before proceeding
     if not validate_environment():
         sys.exit(1)
@@ -657,6 +1249,14 @@ Examples:
         log_error("Failed to parse plan data")
         sys.exit(1)
 
+    # Compute the changes once; they are applied to every agent file
+    update = prepare_agent_update()
+
+    # Active Technologies is generated from the ledger of all feature plans
+    ledger = load_tech_ledger(repo_root)
+    log_info(f"Tech ledger: {len(ledger.features)} plans ({ledger.parsed} parsed)")
+    update.use_tech_ledger(ledger.active_technology_lines())
+
     # Process based on agent type argument
     if not args.agent_type:
         # No specific agent provided - update all existing agent files
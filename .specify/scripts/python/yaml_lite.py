@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+═══════════════════════════════════════════════════════════════
+YAML 子集解析器
+仅使用 Python 标准库，解析 knowledge-config.yaml 使用的 YAML 子集
+═══════════════════════════════════════════════════════════════
+
+支持的语法：
+1. 块映射 (key: value) 与块序列 (- item)，包括序列中的映射 (- key: value)
+2. 双引号 / 单引号 / 普通标量，行尾注释 (# ...)
+3. true/false/null/~、整数和浮点数
+4. 流式空集合与简单流式序列：[]、{}、[a, "b"]
+
+不支持锚点、别名、标签、多行块标量 (| 和 >) 和多文档。
+遇到不支持的语法时抛出 YamlSubsetError，而不是静默给出错误结果。
+
+编译缓存：
+load_yaml_file 会把解析结果以 JSON 形式缓存到 cache_dir，
+以 YAML 内容的 SHA-256 为键，YAML 不变时只需一次 json.load。
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class YamlSubsetError(ValueError):
+    """YAML 内容超出支持的子集或格式错误"""
+
+    def __init__(self, message: str, line_no: int = 0):
+        if line_no:
+            message = f"第 {line_no} 行: {message}"
+        super().__init__(message)
+        self.line_no = line_no
+
+
+_INT_RE = re.compile(r'^[-+]?(0|[1-9][0-9]*)$')
+_FLOAT_RE = re.compile(r'^[-+]?([0-9]+\.[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?$')
+_ESCAPES = {
+    '"': '"', '\\': '\\', '/': '/', 'n': '\n', 't': '\t',
+    'r': '\r', '0': '\0', 'b': '\b', 'f': '\f',
+}
+_BOOL_NULL = {
+    'true': True, 'True': True, 'TRUE': True,
+    'false': False, 'False': False, 'FALSE': False,
+    'null': None, 'Null': None, 'NULL': None, '~': None,
+}
+
+
+def _strip_comment(text: str) -> str:
+    """去掉引号外的行尾注释"""
+    if '#' not in text:
+        return text.rstrip()
+
+    quote = ''
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            if ch == '\\' and quote == '"':
+                i += 2
+                continue
+            if ch == quote:
+                quote = ''
+        elif ch in ('"', "'") and (i == 0 or text[i - 1] in ' \t:-[{,'):
+            quote = ch
+        elif ch == '#' and (i == 0 or text[i - 1] in ' \t'):
+            return text[:i].rstrip()
+        i += 1
+    return text.rstrip()
+
+
+def _find_key_separator(text: str) -> int:
+    """返回引号外第一个 ': ' 或行尾 ':' 的位置，不是映射条目时返回 -1"""
+    quote = ''
+    start = 0
+    if text[:1] in ('"', "'"):
+        quote = text[0]
+        start = 1
+    i = start
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            if ch == '\\' and quote == '"':
+                i += 2
+                continue
+            if ch == quote:
+                quote = ''
+        elif ch == ':' and (i + 1 == len(text) or text[i + 1] in ' \t'):
+            return i
+        elif ch in '[{' and i == 0:
+            return -1
+        i += 1
+    return -1
+
+
+def _parse_double_quoted(text: str, line_no: int) -> str:
+    out: List[str] = []
+    i = 1
+    end = len(text) - 1
+    while i < end:
+        ch = text[i]
+        if ch == '\\':
+            nxt = text[i + 1] if i + 1 < end else ''
+            if nxt in _ESCAPES:
+                out.append(_ESCAPES[nxt])
+                i += 2
+            elif nxt in ('u', 'x', 'U'):
+                width = {'x': 2, 'u': 4, 'U': 8}[nxt]
+                code = text[i + 2:i + 2 + width]
+                try:
+                    out.append(chr(int(code, 16)))
+                except ValueError:
+                    raise YamlSubsetError(f"无效的转义序列: \\{nxt}{code}", line_no)
+                i += 2 + width
+            else:
+                raise YamlSubsetError(f"无效的转义序列: \\{nxt}", line_no)
+        else:
+            out.append(ch)
+            i += 1
+    return ''.join(out)
+
+
+def _split_flow_items(body: str, line_no: int) -> List[str]:
+    items: List[str] = []
+    quote = ''
+    current: List[str] = []
+    for ch in body:
+        if quote:
+            current.append(ch)
+            if ch == quote:
+                quote = ''
+        elif ch in ('"', "'"):
+            quote = ch
+            current.append(ch)
+        elif ch in '[]{}':
+            raise YamlSubsetError("不支持嵌套的流式集合", line_no)
+        elif ch == ',':
+            items.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if quote:
+        raise YamlSubsetError("引号未闭合", line_no)
+    tail = ''.join(current).strip()
+    if tail:
+        items.append(tail)
+    return items
+
+
+def parse_scalar(text: str, line_no: int = 0) -> Any:
+    """解析单个标量（或简单的流式集合）"""
+    if not text:
+        return None
+
+    first = text[0]
+    if first == '"':
+        if len(text) < 2 or text[-1] != '"':
+            raise YamlSubsetError("双引号字符串未闭合", line_no)
+        return _parse_double_quoted(text, line_no)
+    if first == "'":
+        if len(text) < 2 or text[-1] != "'":
+            raise YamlSubsetError("单引号字符串未闭合", line_no)
+        return text[1:-1].replace("''", "'")
+    if first == '[':
+        if text[-1] != ']':
+            raise YamlSubsetError("流式序列未闭合", line_no)
+        return [parse_scalar(item, line_no) for item in _split_flow_items(text[1:-1], line_no)]
+    if first == '{':
+        if text.replace(' ', '') != '{}':
+            raise YamlSubsetError("仅支持空的流式映射 {}", line_no)
+        return {}
+    if first in '&*!|>' or text.startswith('%'):
+        raise YamlSubsetError(f"不支持的 YAML 语法: {text[:20]}", line_no)
+
+    if text in _BOOL_NULL:
+        return _BOOL_NULL[text]
+    if _INT_RE.match(text):
+        return int(text)
+    if _FLOAT_RE.match(text):
+        return float(text)
+    return text
+
+
+class _Parser:
+    """基于缩进的递归下降解析器"""
+
+    def __init__(self, text: str):
+        # 预处理：(缩进, 内容, 行号)，跳过空行和注释
+        self.lines: List[Tuple[int, str, int]] = []
+        for line_no, raw in enumerate(text.splitlines(), 1):
+            if '\t' in raw[:len(raw) - len(raw.lstrip())]:
+                raise YamlSubsetError("缩进中不允许使用制表符", line_no)
+            stripped = raw.lstrip(' ')
+            if not stripped or stripped.startswith('#'):
+                continue
+            if stripped in ('---', '...') and len(raw) == len(stripped):
+                if self.lines:
+                    raise YamlSubsetError("不支持多文档", line_no)
+                continue
+            content = _strip_comment(stripped)
+            if content:
+                self.lines.append((len(raw) - len(stripped), content, line_no))
+        self.pos = 0
+
+    def parse(self) -> Any:
+        if not self.lines:
+            return None
+        value = self._parse_block(self.lines[0][0])
+        if self.pos < len(self.lines):
+            _, content, line_no = self.lines[self.pos]
+            raise YamlSubsetError(f"意外的缩进: {content[:40]}", line_no)
+        return value
+
+    @staticmethod
+    def _is_sequence_item(content: str) -> bool:
+        return content == '-' or content.startswith('- ')
+
+    def _parse_block(self, indent: int) -> Any:
+        indent_here, content, line_no = self.lines[self.pos]
+        if self._is_sequence_item(content):
+            return self._parse_sequence(indent_here)
+        if _find_key_separator(content) < 0:
+            # 单独的标量（文档只有一个值的情况）
+            self.pos += 1
+            return parse_scalar(content, line_no)
+        return self._parse_mapping(indent_here)
+
+    def _parse_nested(self, parent_indent: int, allow_same_indent_sequence: bool) -> Any:
+        """解析 'key:' 或 '-' 之后的嵌套块，没有嵌套内容时返回 None"""
+        if self.pos >= len(self.lines):
+            return None
+        indent, content, _ = self.lines[self.pos]
+        if indent > parent_indent:
+            return self._parse_block(indent)
+        if (allow_same_indent_sequence and indent == parent_indent
+                and self._is_sequence_item(content)):
+            return self._parse_sequence(indent)
+        return None
+
+    def _parse_mapping(self, indent: int) -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        while self.pos < len(self.lines):
+            line_indent, content, line_no = self.lines[self.pos]
+            if line_indent < indent:
+                break
+            if line_indent > indent:
+                raise YamlSubsetError(f"意外的缩进: {content[:40]}", line_no)
+            if self._is_sequence_item(content):
+                break
+
+            sep = _find_key_separator(content)
+            if sep < 0:
+                raise YamlSubsetError(f"应为 'key: value': {content[:40]}", line_no)
+            raw_key = content[:sep].strip()
+            key = parse_scalar(raw_key, line_no) if raw_key[:1] in ('"', "'") else raw_key
+            if not isinstance(key, str) or not key:
+                raise YamlSubsetError(f"无效的键: {raw_key}", line_no)
+            if key in result:
+                raise YamlSubsetError(f"重复的键: {key}", line_no)
+            rest = content[sep + 1:].strip()
+
+            self.pos += 1
+            if rest:
+                result[key] = parse_scalar(rest, line_no)
+            else:
+                result[key] = self._parse_nested(indent, allow_same_indent_sequence=True)
+        return result
+
+    def _parse_sequence(self, indent: int) -> List[Any]:
+        result: List[Any] = []
+        while self.pos < len(self.lines):
+            line_indent, content, line_no = self.lines[self.pos]
+            if line_indent < indent:
+                break
+            if line_indent > indent:
+                raise YamlSubsetError(f"意外的缩进: {content[:40]}", line_no)
+            if not self._is_sequence_item(content):
+                break
+
+            rest = content[1:].lstrip(' ')
+            item_indent = indent + len(content) - len(rest)
+
+            if not rest:
+                self.pos += 1
+                result.append(self._parse_nested(indent, allow_same_indent_sequence=False))
+            elif self._is_sequence_item(rest) or _find_key_separator(rest) >= 0:
+                # "- key: value" / "- - item"：把剩余部分当作更深一级缩进的新行
+                self.lines[self.pos] = (item_indent, rest, line_no)
+                result.append(self._parse_block(item_indent))
+            else:
+                self.pos += 1
+                result.append(parse_scalar(rest, line_no))
+        return result
+
+
+def parse_yaml(text: str) -> Any:
+    """解析 YAML 子集文本，返回与 json.load 相同类型的结构"""
+    if text.startswith('\ufeff'):
+        text = text[1:]
+    return _Parser(text).parse()
+
+
+def _cache_file(cache_dir: Path, yaml_path: Path) -> Path:
+    path_key = hashlib.sha1(str(yaml_path.resolve()).encode('utf-8')).hexdigest()[:12]
+    return cache_dir / f"{yaml_path.stem}.{path_key}.compiled.json"
+
+
+def load_yaml_file(yaml_path: Path, cache_dir: Optional[Path] = None) -> Any:
+    """
+    加载 YAML 文件，可选使用按内容哈希缓存的编译结果
+
+    Args:
+        yaml_path: YAML 文件路径
+        cache_dir: 编译缓存目录；为 None 时不使用缓存
+
+    Raises:
+        YamlSubsetError: 内容超出支持的子集
+        OSError: 文件无法读取
+    """
+    raw = yaml_path.read_bytes()
+    if cache_dir is None:
+        return parse_yaml(raw.decode('utf-8'))
+
+    digest = hashlib.sha256(raw).hexdigest()
+    cache_path = _cache_file(cache_dir, yaml_path)
+
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('sha256') == digest:
+            return cached.get('data')
+    except (OSError, ValueError):
+        pass
+
+    data = parse_yaml(raw.decode('utf-8'))
+
+    # 缓存写入失败不影响结果
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(cache_dir), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'sha256': digest, 'source': str(yaml_path), 'data': data},
+                          f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+
+    return data
+
+
+def _strip_meta(value: Any) -> Any:
+    """去掉以 _ 开头的元数据键（仅存在于 JSON 中的注释字段）"""
+    if isinstance(value, dict):
+        return {k: _strip_meta(v) for k, v in value.items() if not k.startswith('_')}
+    if isinstance(value, list):
+        return [_strip_meta(v) for v in value]
+    return value
+
+
+if __name__ == '__main__':
+    # 一致性检查：knowledge-config.yaml 与 knowledge-config.json 的解析结果必须相同
+    specify_dir = Path(__file__).resolve().parent.parent.parent
+    yaml_file = Path(sys.argv[1]) if len(sys.argv) > 1 else specify_dir / 'knowledge-config.yaml'
+    json_file = Path(sys.argv[2]) if len(sys.argv) > 2 else yaml_file.with_suffix('.json')
+
+    print("Testing yaml_lite.py parity:")
+    print(f"  YAML: {yaml_file}")
+    print(f"  JSON: {json_file}")
+
+    yaml_data = _strip_meta(load_yaml_file(yaml_file))
+    with open(json_file, 'r', encoding='utf-8') as f:
+        json_data = _strip_meta(json.load(f))
+
+    if yaml_data == json_data:
+        print("  OK: YAML and JSON configs are identical")
+        sys.exit(0)
+
+    print("  MISMATCH: YAML and JSON configs differ", file=sys.stderr)
+    sys.exit(1)